@@ -0,0 +1,26 @@
+import subprocess
+import sys
+import os
+import glob
+
+# Fail the run when a benchmark's best time slows down by more than this relative to the last saved run
+DEFAULT_THRESHOLD = "min:15%"
+
+def run_benchmarks(threshold=DEFAULT_THRESHOLD, storage='.benchmarks', extra_args=None):
+    """Run the benchmark suite, save the results under the current commit id and compare to the previous run."""
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    args = [
+        sys.executable, '-m', 'pytest', 'src/bench',
+        f'--benchmark-storage={storage}',
+        '--benchmark-autosave',
+        '--benchmark-columns=min,mean,stddev,rounds',
+    ]
+    # Only compare when a previous run has been saved, the first run just records the baseline
+    if glob.glob(os.path.join(storage, '*', '*.json')):
+        args.extend(['--benchmark-compare', f'--benchmark-compare-fail={threshold}'])
+    if extra_args:
+        args.extend(extra_args)
+    return subprocess.call(args, env=env)
+
+if __name__ == '__main__':
+    sys.exit(run_benchmarks(extra_args=sys.argv[1:]))
@@ -0,0 +1,34 @@
+import os
+import sys
+import pytest
+import numpy as np
+
+# Benchmarks run headless; make sure Qt never tries to open a display
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from src.main.model.phototransduction import Phototransduction
+
+@pytest.fixture(scope="session")
+def qapp():
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv)
+    yield app
+
+@pytest.fixture
+def model():
+    return Phototransduction()
+
+@pytest.fixture
+def sweep_model():
+    # Factory for a model holding a sweep of n conditions (betaDark sweep, single flash)
+    def build(n, responseDuration=1.5):
+        m = Phototransduction(responseDuration=responseDuration)
+        m.setParam(betaDark=np.linspace(2, 20, n))
+        return m
+    return build
+
+@pytest.fixture
+def simulated_model(sweep_model):
+    m = sweep_model(10)
+    m.simulate(stimulusIntensities=[100, 1000], stimulusDurations=[0.01])
+    return m
@@ -0,0 +1,45 @@
+import pytest
+
+from src.main.utils import write_csv
+
+@pytest.mark.parametrize("dt", [1e-3, 1e-4])
+@pytest.mark.parametrize("intensity", [0, 1e2, 1e4])
+def test_simulate_once(benchmark, model, intensity, dt):
+    model.dt = dt
+    benchmark.group = "simulate_once"
+    result = benchmark(model.simulate_once, intensity, (0, 0.01), intensity * 0.01 * model.param['colArea'])
+    assert len(result['time']) == len(model.time)
+
+@pytest.mark.parametrize("n", [10, 100, 1000])
+def test_simulate_sweep(benchmark, sweep_model, n):
+    # Shorter responses keep the 1,000 condition sweep within a reasonable wall time
+    m = sweep_model(n, responseDuration=0.5)
+    benchmark.group = "simulate"
+    benchmark.pedantic(m.simulate, kwargs={'stimulusIntensities': [100]}, rounds=1 if n >= 1000 else 3, iterations=1)
+    assert len(m.results) == n
+
+def test_calculate_steady_state(benchmark, model):
+    benchmark.group = "steady_state"
+    steady_state = benchmark(model.calculate_steady_state)
+    assert len(steady_state) == 5
+
+def test_get_result(benchmark, simulated_model):
+    benchmark.group = "results"
+    results = benchmark(simulated_model.getResult, 'time', 'intracellularCurrentNorm')
+    assert len(results['data']) == len(simulated_model.results)
+
+def test_export(benchmark, simulated_model):
+    benchmark.group = "results"
+    data = benchmark(simulated_model.export, 'time', 'intracellularCurrentNorm', 'Ca')
+    assert data.shape[0] == len(simulated_model.time)
+
+@pytest.mark.parametrize("fields", [['intracellularCurrentNorm'], None], ids=["plotted", "allSignals"])
+def test_csv_export(benchmark, simulated_model, tmp_path, fields):
+    file_name = str(tmp_path / "results.csv")
+
+    def export():
+        headers, columns = simulated_model.getExportColumns('time', fields)
+        write_csv(file_name, headers, columns)
+    benchmark.group = "export"
+    benchmark(export)
+    assert (tmp_path / "results.csv").stat().st_size > 0
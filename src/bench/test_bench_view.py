@@ -0,0 +1,38 @@
+import pytest
+
+from src.main.view.components import Axes
+
+@pytest.fixture
+def axes(qapp):
+    widget = Axes()
+    widget.resize(800, 600)
+    yield widget
+    widget.close()
+
+@pytest.fixture
+def plot_results(simulated_model):
+    return simulated_model.getResult('time', 'intracellularCurrentNorm')
+
+def test_axes_append(benchmark, axes, plot_results):
+    def redraw():
+        axes.clear()
+        axes.setAxesLabels(plot_results['label'])
+        for result in plot_results['data']:
+            axes.append(result)
+    benchmark.group = "plot"
+    benchmark(redraw)
+    axes.canvas.draw()
+    assert len(axes.axes.lines) == len(plot_results['data'])
+
+@pytest.mark.parametrize("n", [10, 300])
+def test_axes_plot(benchmark, axes, sweep_model, n):
+    m = sweep_model(n, responseDuration=0.5)
+    m.simulate(stimulusIntensities=[100])
+    results = m.getResult('time', 'intracellularCurrentNorm')
+
+    def redraw():
+        axes.plot(results)
+        axes.canvas.draw()
+    benchmark.group = "plot"
+    benchmark.pedantic(redraw, rounds=5, iterations=1)
+    assert len(axes.axes.lines) == n
@@ -1,55 +1,60 @@
 import sys
 import threading
+import multiprocessing
 
 from PyQt6.QtWidgets import QApplication
-from PyQt6.QtCore import QElapsedTimer, QTimer
+from PyQt6.QtCore import QTimer
 
 from src.main.app.splash import PhototransducSimSplash
 from src.main.app.version import __version__, __author__, __year__
+from src.main.utils import Metrics
 
 class PhototransductSimApp:
-    MIN_SPLASH_DELAY = 3000
-    
+    # Pass on the command line to print startup stage timings once the window is shown
+    STARTUP_REPORT_FLAG = "--startup-report"
+
     def __init__(self):
-        self.app = QApplication(sys.argv)
-        splash_text = f"PhototransductSim v{__version__}"
-        splash_by = f"{__author__} ({__year__})"
-        self.splash = PhototransducSimSplash("psim_image.png", splash_text, splash_by)
-        self.splash.show()
-        
-        self.elapsed_timer = QElapsedTimer()
-        self.elapsed_timer.start()
-        
-        self.initialization_done = False
-
-        # Start the initialization in the main thread
+        self.startup = Metrics()
+        with self.startup.stage('qapplication'):
+            self.app = QApplication(sys.argv)
+        with self.startup.stage('splash'):
+            splash_text = f"PhototransductSim v{__version__}"
+            splash_by = f"{__author__} ({__year__})"
+            self.splash = PhototransducSimSplash("psim_image.png", splash_text, splash_by)
+            self.splash.show()
+
+        # Start the initialization in the main thread once the splash is painted
         QTimer.singleShot(0, self.initializeApp)
 
-        # Check the initialization status periodically
-        self.check_timer = QTimer()
-        self.check_timer.timeout.connect(self.checkInit)
-        self.check_timer.start(100)
-
     def initializeApp(self):
-        from src.main.model.phototransduction import Phototransduction
-        from src.main.view.ui import MainView
-        from src.main.controller.controller import Controller
-
-        self.model = Phototransduction()
-        self.view = MainView()
-        self.controller = Controller(self.model, self.view)
-        
-        self.initialization_done = True
-
-    def checkInit(self):
-        if self.initialization_done and self.elapsed_timer.elapsed() >= self.MIN_SPLASH_DELAY:
-            self.check_timer.stop()
-            self.splash.close()
+        with self.startup.stage('imports'):
+            from src.main.model.phototransduction import Phototransduction
+            from src.main.view.ui import MainView
+            from src.main.controller.controller import Controller
+
+        with self.startup.stage('model'):
+            self.model = Phototransduction()
+        with self.startup.stage('view'):
+            self.view = MainView()
+        with self.startup.stage('controller'):
+            self.controller = Controller(self.model, self.view)
+
+        # Close the splash as soon as the window is ready
+        with self.startup.stage('show'):
             self.view.show()
-    
+            self.splash.close()
+        self.view.setStatusToolTip(self.startup_report())
+        if self.STARTUP_REPORT_FLAG in sys.argv:
+            print(self.startup_report())
+
+    def startup_report(self):
+        return "Startup\n" + self.startup.tooltip()
+
     def run(self):
         sys.exit(self.app.exec())
 
 if __name__ == '__main__':
+    # Figure batches render in spawned processes, which frozen builds must hand off here
+    multiprocessing.freeze_support()
     app = PhototransductSimApp()
     app.run()
@@ -1,21 +1,22 @@
 import os
 import json
+import itertools
+from functools import partial
 import yaml
-import csv
 import numpy as np
 from PyQt6.QtCore import QObject, QCoreApplication, Qt, QThread, QTimer, pyqtSlot, QUrl
 from PyQt6.QtGui import QIcon, QDesktopServices
 from PyQt6.QtWidgets import QMessageBox
 
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.units import inch
-from reportlab.pdfgen import canvas
-from reportlab.lib import colors
-from reportlab.platypus import Table, TableStyle
-
 from src.main.app.baseapp import BaseApp
-from src.main.utils import StateBuffer, NumpyEncoder, camel_to_title
+from src.main.utils import StateBuffer, Snapshot, share_parameters, NumpyEncoder, camel_to_title, write_csv
 from src.main.model.simulationworker import SimulationWorker
+from src.main.model.exportworker import ExportWorker
+from src.main.model.workerpool import WorkerPool, INTERACTIVE, BACKGROUND
+from src.main.model.resultstore import result_bytes
+from src.main.model.session import save_session, load_session, detach, SESSION_FILTER
+from src.main.controller.simulationscheduler import SimulationScheduler, SimulationRun
+from src.main.view.figureexport import render_figure, render_figures, figure_jobs
 
 class Controller(QObject, BaseApp):
     MAX_UNDO = 20
@@ -25,6 +26,9 @@ class Controller(QObject, BaseApp):
         self.model = model
         self.view = view
         self.param_actions_buffer = StateBuffer(self.MAX_UNDO)
+        self.runs = {}  # priority -> SimulationRun in progress
+        self.run_sequence = itertools.count(1)
+        self.displayed_sequence = 0  # sequence of the run (or restored state) on screen
         self.refreshOnExit = False
         
         # Initialize the UI and Model
@@ -39,15 +43,26 @@ class Controller(QObject, BaseApp):
         
         # Apply settings related to model
         self.updateModelData()
+        self.pushSnapshot()
         
         # Bind ui listeners
         self.bindUi()
         
-        # Setup, run simulation
-        self.initSimWorker()
+        # Setup, run simulation; the pool's threads load the solver while the UI starts
+        self.pool = WorkerPool(self.worker_count())
+        self.pool.warm()
+        self.schedulers = {
+            priority: SimulationScheduler(partial(self.startSimulation, priority), partial(self.stopSimulation, priority), parent=self)
+            for priority in (INTERACTIVE, BACKGROUND)
+        }
+
+        # Exports run in the background, one job at a time
+        self.initExportWorker()
         
         # Setup onClose()
         QCoreApplication.instance().aboutToQuit.connect(self.save_settings)
+        QCoreApplication.instance().aboutToQuit.connect(self.stopExportWorker)
+        QCoreApplication.instance().aboutToQuit.connect(lambda: self.pool.shutdown(wait=False, cancel_futures=True))
 
     def bindUi(self):
         # Sidebar and param view toggles
@@ -71,13 +86,18 @@ class Controller(QObject, BaseApp):
         self.view.actionConfiguration.triggered.connect(self.edit_configuration)
         self.view.actionImport.triggered.connect(self.load_parameters)
         self.view.actionExport.triggered.connect(self.save_parameters)
+        self.view.actionOpenSession.triggered.connect(self.open_session)
+        self.view.actionSaveSession.triggered.connect(self.save_session)
         self.view.actionQuit.triggered.connect(self.quit_application)
         self.view.actionResetSettings.triggered.connect(self.reset_settings)
+        self.view.actionExportTrace.triggered.connect(self.export_timing_trace)
+        self.view.actionFigures.triggered.connect(self.export_figure_set)
         
         # Connect Keyboard Actions
         self.view.requestUndo.connect(self.undo)
         self.view.requestRedo.connect(self.redo)
         self.view.interruptSim.connect(self.onInterruptSim)
+        self.view.cancelExport.connect(self.cancel_exports)
         
         # Connect configuration events
         for _, section in self.view.config_sections.items():
@@ -220,42 +240,57 @@ class Controller(QObject, BaseApp):
             self.view.sidebar_toggle.setToolTip("Click to hide menu")
     
     def on_axes_changed(self, eventData):
+        # Only the plotted signals change: reuse the lines and legend, no copies needed
         selections = self.view.getAxesSelectedOptions()
-        results = self.model.getResult(selections['x'], selections['y'])
-        self.view.updatePlot(results)
+        signals = [selections['y']] + selections.get('panels', [])
+        results = self.model.getResults(selections['x'], signals, copy=False)
+        if results:
+            self.view.updatePlot(results)
 
     def handle_config_value_changed(self):
         # No action for now
         pass
     
     @pyqtSlot(object)
-    def on_data_exported(self,data):
+    def on_data_exported(self,selection):
         file_name = self.save_file(
             "Export Results Data", 
             "CSV Files (*.csv);;All Files (*.*)",
             os.path.join(self.view.getConfig("directories","saveDir"),"results.csv")
         )
         if file_name:
-            with open(file_name, 'w', newline='') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(data['headers'])
-                writer.writerows(data['data'])
-            self.save_parameters_as_pdf(file_name)
-
-    def save_parameters_as_pdf(self, csv_file_path):
-        params = self.model.getParameters()
+            # Export the plotted signal, or every signal, straight from the results.
+            # The columns and parameters are gathered here, the writing happens in the background.
+            fields = None if self.view.getConfig("export","allSignals") else [selection['y']]
+            headers, columns = self.model.getExportColumns(selection['x'], fields)
+            self.exporter.submit("Results CSV", write_csv, file_name, headers, columns)
+            self.exporter.submit("Parameters PDF", self.save_parameters_as_pdf, file_name, self.model.getParameters())
+
+    def save_parameters_as_pdf(self, csv_file_path, params=None, progress=None):
+        # reportlab is only needed for exports, load it on first use
+        from reportlab.lib.pagesizes import letter
+        from reportlab.pdfgen import canvas
+
+        if params is None:
+            params = self.model.getParameters()
         pdf_file_path = os.path.splitext(csv_file_path)[0] + ".pdf"
         
         c = canvas.Canvas(pdf_file_path, pagesize=letter)
         width, height = letter
 
-        for root_key, root_value in params.items():
+        for page, (root_key, root_value) in enumerate(params.items()):
             self.create_pdf_page(c, root_key, root_value, width, height)
             c.showPage()  # Create a new page for each root key
+            if progress is not None:
+                progress((page + 1) / len(params))
         
         c.save()
 
     def create_pdf_page(self, c, root_key, data, width, height):
+        from reportlab.lib.units import inch
+        from reportlab.lib import colors
+        from reportlab.platypus import Table, TableStyle
+
         c.setFont("Helvetica-Bold", 16)
         c.drawString(1 * inch, height - 1 * inch, camel_to_title(root_key))
         
@@ -304,74 +339,215 @@ class Controller(QObject, BaseApp):
         table_height = table._height
         table.drawOn(c, 1 * inch, height - 2 * inch - table_height)
     
-    def initSimWorker(self):
-        self.simulationThread = None
-        selections = self.view.getAxesSelectedOptions()
-        self.worker = SimulationWorker(self.model, selections)
-
-    def initSimulation(self):
-        self.simulationThread = QThread()
-        self.worker.moveToThread(self.simulationThread)
-        self.simulationThread.started.connect(self.worker.run)
-        self.worker.finished.connect(self.on_simulation_finished)
-        self.worker.finished.connect(self.simulationThread.quit)
-        self.worker.finished.connect(self.worker.deleteLater)
-        self.worker.error.connect(self.on_simulation_error)
-        self.worker.result.connect(self.on_simulation_result)
-        self.worker.progress.connect(self.on_simulation_progress)
+    def initSimulation(self, priority):
+        # One worker and thread per run; runs of different priority classes may overlap
+        worker = SimulationWorker(self.model, self.view.getAxesSelectedOptions(), self.pool)
+        worker.priority = priority
+        thread = QThread()
+        run = SimulationRun(priority, worker, thread, self.param_actions_buffer.current(), next(self.run_sequence))
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        worker.finished.connect(lambda: self.on_simulation_finished(run))
+        worker.finished.connect(thread.quit)
+        worker.finished.connect(worker.deleteLater)
+        worker.cancelled.connect(lambda: self.on_simulation_cancelled(run))
+        worker.cancelled.connect(thread.quit)
+        worker.cancelled.connect(worker.deleteLater)
+        worker.error.connect(lambda message: self.on_simulation_error(run, message))
+        worker.error.connect(thread.quit)
+        # The next scheduled run of this class starts once this thread has wound down
+        thread.finished.connect(lambda: self.on_simulation_ended(run))
+        worker.result.connect(lambda plot_data, results: self.on_simulation_result(run, plot_data, results))
+        worker.progress.connect(lambda progress: self.on_simulation_progress(run, progress))
+        worker.eta.connect(lambda seconds: self.on_simulation_eta(run, seconds))
+        return run
 
     def runSimulation(self):
-        # Check if parameters are different?
-        # Update status bar
+        # Explicit runs start right away, replacing a run of outdated parameters
+        self.requestSimulation(0)
+
+    def runPriority(self):
+        # Parameter sweeps run in the background, previews of a single family go ahead of them
+        return BACKGROUND if self.model.isSweep() else INTERACTIVE
+
+    def requestSimulation(self, delay=None):
+        # Edits are debounced; the latest parameter state is always the one simulated.
+        # A request only supersedes the run of its own class, a background sweep keeps running.
+        priority = self.runPriority()
+        # A request still waiting in the other class is for a state that is gone
+        for other, waiting in self.schedulers.items():
+            if other != priority:
+                waiting.withdraw()
+        scheduler = self.schedulers[priority]
+        run = self.runs.get(priority)
+        if scheduler.active and not scheduler.pending and run is not None and self.param_actions_buffer.current() is run.snapshot:
+            return
         self.view.setStatus("Simulating...")
-        
-        # Prepare simulation
-        if self.simulationThread is not None:
-            try: 
-                if self.simulationThread.isRunning():
-                    QMessageBox.information(
-                        self.view, 
-                        "Simulation In Progress",
-                        "A simulation is already in progress. Press Ctrl+C (Cmd+C for Mac) to interrupt."
-                        )
-                    return
-            except RuntimeError: 
-                return
-        
-        self.initSimWorker()
-        self.initSimulation()
-        self.worker.selections = self.view.getAxesSelectedOptions()
-        self.simulationThread.start()
+        scheduler.request(delay)
 
-    def on_simulation_finished(self):
-        self.view.setStatus("Current")
+    def stopSimulation(self, priority):
+        run = self.runs.get(priority)
+        if run is not None:
+            run.worker.stop()
+
+    def worker_count(self):
+        count = int(self.view.getConfig("simulation","workerThreads") or 0)
+        return count if count > 0 else None
+
+    def startSimulation(self, priority):
+        snapshot = self.param_actions_buffer.current()
+        if self.runPriority() != priority or snapshot.results is not None:
+            # The state moved to the other class or got results while the request waited
+            if snapshot.results is not None and self.model.results is not snapshot.results:
+                self.showCachedResults(snapshot)
+            self.schedulers[priority].run_ended()
+            return
+        self.pool.resize(self.worker_count())
+        run = self.initSimulation(priority)
+        self.runs[priority] = run
+        self.model.spillBytes = self.spill_bytes()
+        self.model.resultPrecision = self.view.getConfig("simulation","resultPrecision")
+        self.model.resultCompression = self.view.getConfig("simulation","resultCompression")
+        self.model.conditionStepLimit = float(self.view.getConfig("simulation","conditionStepLimit") or 0)
+        self.model.conditionTimeLimit = float(self.view.getConfig("simulation","conditionTimeLimit") or 0)
+        # Captured here, edits made while the run is in progress do not reach it
+        run.worker.spec = self.model.spec()
+        run.thread.start()
+
+    def spill_bytes(self):
+        limit = float(self.view.getConfig("simulation","resultMemory"))
+        return int(limit * 2**20) if limit > 0 else None
+
+    def foreground(self, run):
+        # The run the status bar reports on: an interactive one when there is one
+        return run.priority == INTERACTIVE or INTERACTIVE not in self.runs
 
-    def on_simulation_error(self, error_message):
+    def on_plot_drawn(self, metrics):
+        metrics.end('draw')
+        if metrics is self.model.metrics:
+            self.updateSimulationToolTip()
+
+    def on_simulation_finished(self, run):
+        if run.sequence != self.displayed_sequence:
+            if not self.runs.keys() - {run.priority}:
+                self.view.updateStatusBarProgress(-1)
+                self.view.setStatus("Background sweep finished, undo to its parameters to view it")
+            return
+        failures = self.model.getSolveFailures()
+        self.view.setStatus(f"Current ({len(failures)} incomplete)" if failures else "Current")
+        self.updateSimulationToolTip()
+
+    def updateSimulationToolTip(self):
+        failures = self.model.getSolveFailures()
+        tooltip = self.model.metrics.tooltip()
+        if failures:
+            # Conditions stopped by their step or time limit, or by a solver error
+            lines = [f"{label}: {message}" for label, _, message in failures[:10]]
+            if len(failures) > 10:
+                lines.append(f"... and {len(failures) - 10} more")
+            tooltip = "\n".join(lines) + "\n\n" + tooltip
+        self.view.setStatusToolTip(tooltip)
+
+    def on_simulation_cancelled(self, run):
+        if self.foreground(run):
+            self.view.updateStatusBarProgress(-1)
+        if not any(scheduler.pending for scheduler in self.schedulers.values()) and not self.runs.keys() - {run.priority}:
+            self.view.setStatus("Awaiting Simulation")
+
+    def on_simulation_error(self, run, error_message):
         QMessageBox.critical(self.view, "Simulation Error", error_message)
         self.view.updateStatusBarProgress(-1)
         self.view.setStatus("Error")
-        self.simulationThread.finished.connect(self.simulationThread.deleteLater)
-        self.simulationThread = None
 
-    def on_simulation_result(self, results):
-        self.view.updatePlot(results)
+    def on_simulation_ended(self, run):
+        if self.runs.get(run.priority) is run:
+            del self.runs[run.priority]
+        run.thread.deleteLater()
+        self.schedulers[run.priority].run_ended()
+
+    def on_simulation_result(self, run, plot_data, results):
+        if run.snapshot is not None:
+            self.attachResults(run.snapshot, results)
+        if run.sequence < self.displayed_sequence:
+            # A run started later is already shown; these stay cached with their parameters
+            return
+        # The run's results and timings become the model's current ones here, on the GUI thread
+        self.displayed_sequence = run.sequence
+        self.model._results = results
+        self.model.metrics = metrics = run.worker.spec.metrics
+        with metrics.stage('updatePlot'):
+            self.view.updatePlot(plot_data)
+        # Lines are only updated above, the canvas renders them on its next idle redraw
+        metrics.begin('draw')
+        self.view.axes.on_next_draw(lambda: self.on_plot_drawn(metrics))
+
+    def on_simulation_progress(self, run, progress):
+        if self.foreground(run):
+            self.view.updateStatusBarProgress(progress)
 
-    def on_simulation_progress(self, progress):
-        self.view.updateStatusBarProgress(progress)
+    def on_simulation_eta(self, run, seconds):
+        if self.foreground(run):
+            self.view.setStatus(f"Simulating... (~{seconds:.0f} s left)" if seconds >= 1 else "Simulating...")
 
     def onInterruptSim(self):
-        if self.simulationThread is not None:
+        # Stops every run, also drops edits still waiting to be simulated
+        for scheduler in self.schedulers.values():
+            scheduler.cancel()
+        for run in list(self.runs.values()):
             try:
-                if self.simulationThread.isRunning():
+                if run.thread.isRunning():
                     self.view.updateStatusBarProgress(-1)
                     self.view.setStatus("Terminating...")
-                    self.worker.stop()
-                    self.simulationThread.quit()
-                    self.simulationThread.wait()
+                    run.thread.quit()
+                    run.thread.wait()
                     self.view.setStatus("Awaiting Simulation")
             except RuntimeError:
-                self.simulationThread = None
+                pass
     
+    def initExportWorker(self):
+        self.exporter = ExportWorker()
+        self.exportThread = QThread()
+        self.exporter.moveToThread(self.exportThread)
+        self.exportThread.started.connect(self.exporter.run)
+        self.exporter.started.connect(self.on_export_started)
+        self.exporter.progress.connect(self.view.updateStatusBarProgress)
+        self.exporter.finished.connect(self.on_export_finished)
+        self.exporter.error.connect(self.on_export_error)
+        self.exporter.cancelled.connect(self.on_export_cancelled)
+        self.exportThread.start()
+
+    def stopExportWorker(self):
+        self.exporter.stop()
+        self.exportThread.quit()
+        self.exportThread.wait()
+
+    def cancel_exports(self):
+        self.view.setStatus("Cancelling export...")
+        self.exporter.cancel()
+
+    def on_export_started(self, name):
+        self.view.setStatus(f"Exporting {name}...")
+        self.view.setExportActive(True)
+        self.view.updateStatusBarProgress(0)
+
+    def on_export_finished(self, name):
+        self.view.setStatus(f"{name} exported successfully!")
+        self.on_export_done()
+
+    def on_export_error(self, name, error_message):
+        self.on_export_done()
+        self.view.setStatus("Export Error")
+        QMessageBox.critical(self.view, "Export Error", f"Error exporting {name}: {error_message}")
+
+    def on_export_cancelled(self, name):
+        self.view.setStatus("Export cancelled")
+        self.on_export_done()
+
+    def on_export_done(self):
+        if not self.exporter.pending():
+            self.view.updateStatusBarProgress(-1)
+            self.view.setExportActive(False)
+
     def on_config_defaults(self):
         # loads the getData("configs.yaml") sets the configs values from it
         with open(self.getData('configs.yaml'), 'r') as file:
@@ -398,6 +574,7 @@ class Controller(QObject, BaseApp):
                     self.model.setParam(**{param:value})
                 except Exception as e:
                     QMessageBox.information(self.view, "Skipping Parameter", f"Skipping {param} for reason: {e}")
+            self.pushSnapshot()
             self.view.setStatus("Parameters imported successfully!")
                     
     def load_parameters(self):
@@ -426,6 +603,66 @@ class Controller(QObject, BaseApp):
             if self.view.getConfig("directories","updateOnSave"):
                 self.view.setConfig("directories","saveDir",os.path.dirname(save_path))
 
+    def save_session(self):
+        # Parameters, solver settings, plot selection and results in one file
+        save_path = self.save_file(
+            "Save Session",
+            SESSION_FILTER,
+            os.path.join(self.view.getConfig("directories","saveDir"),"session.ptsim")
+            )
+        if not save_path:
+            return
+        if self.view.getConfig("directories","updateOnSave"):
+            self.view.setConfig("directories","saveDir",os.path.dirname(save_path))
+        settings = {
+            "solver": self.model.solverSettings(),
+            "axes": self.view.getAxesSelectedOptions()
+        }
+        if self.model.results and detach(self.model.results, save_path):
+            # Saving over the open session: redraw from the copies so nothing still maps the file
+            self.on_axes_changed(self.view.getAxesSelectedOptions())
+        self.exporter.submit(
+            "Session", save_session, save_path, self.model.results, self.view.get_model_parameters(), settings,
+            compress=bool(self.view.getConfig("export","compressSessions"))
+            )
+
+    def open_session(self):
+        session_path = self.load_file(
+            "Open Session",
+            SESSION_FILTER,
+            self.view.getConfig("directories","loadDir")
+            )
+        if not session_path:
+            return
+        if self.view.getConfig("directories","updateOnSave"):
+            self.view.setConfig("directories","loadDir",os.path.dirname(session_path))
+        try:
+            self.restore_session(*load_session(session_path))
+        except Exception as e:
+            QMessageBox.critical(self.view, "Error Opening Session", f"Error opening session: {e}")
+            return
+        self.view.setStatus("Session loaded")
+
+    def restore_session(self, manifest, results):
+        # Restore without re-simulating: the stored results are mapped from the file
+        self.restoreModelParameters(manifest['parameters'])
+        settings = manifest.get('settings', {})
+        self.model.setSolverSettings(settings.get('solver', {}))
+        # The limits are read from the configuration when a run starts
+        self.view.setConfig("simulation","conditionStepLimit",self.model.conditionStepLimit or 0)
+        self.view.setConfig("simulation","conditionTimeLimit",self.model.conditionTimeLimit or 0)
+        self.displayed_sequence = next(self.run_sequence)
+        self.model._results = results
+        self.pushSnapshot()
+        self.attachResults(self.param_actions_buffer.current(), results)
+        axes = settings.get('axes', {})
+        self.view.axes.previous_selection['panels'] = axes.get('panels', [])
+        self.view.axes.update_axes_options(
+            self.model.getLabels(), axes.get('x', 'time'), axes.get('y', 'intracellularCurrentNorm')
+            )
+        if not results:
+            self.view.clearPlot()
+
     def export_results(self):
         if self.model.results is None:
             return
@@ -441,7 +678,44 @@ class Controller(QObject, BaseApp):
         if fig_path:
             if self.view.getConfig("directories","updateOnSave"):
                 self.view.setConfig("directories","saveDir",os.path.dirname(fig_path))
-            self.view.save_figure(fig_path)
+            snapshot = self.view.figureSnapshot()
+            snapshot['options'] = self.figure_options()
+            self.exporter.submit("Figure", render_figure, snapshot, fig_path)
+
+    def figure_options(self):
+        return {
+            'downsample': bool(self.view.getConfig("export","downsampleFigures")),
+            'rasterizePoints': int(self.view.getConfig("export","rasterizePoints")),
+            'rasterDpi': float(self.view.getConfig("export","rasterDpi"))
+        }
+
+    def export_figure_set(self):
+        # One figure per signal against the current x-axis, rendered in parallel processes
+        if not self.model.results:
+            return
+        directory = self.get_directory("Export Figure Set", self.view.getConfig("directories","saveDir"))
+        if not directory:
+            return
+        if self.view.getConfig("directories","updateOnSave"):
+            self.view.setConfig("directories","saveDir",directory)
+        x = self.view.getAxesSelectedOptions()['x']
+        extension = self.view.getConfig("export","figureFormat")
+        options = self.figure_options()
+        specs = [
+            {'x': x, 'y': y, 'path': os.path.join(directory, f"{y}.{extension}"), 'style': {'grid': True}, 'options': options}
+            for y in self.model.getLabels() if y != x
+        ]
+        self.exporter.submit("Figure Set", render_figures, figure_jobs(self.model, specs))
+
+    def export_timing_trace(self):
+        trace_path = self.save_file(
+            "Export Timing Trace",
+            "Chrome Trace (*.json);;All Files (*)",
+            os.path.join(self.view.getConfig("directories","saveDir"),"trace.json")
+            )
+        if trace_path:
+            self.model.metrics.export_chrome_trace(trace_path)
+            self.view.setStatus("Timing trace exported successfully!")
 
     def edit_configuration(self):
         self.view.set_active_page("config")
@@ -466,8 +740,6 @@ class Controller(QObject, BaseApp):
                 # model attributes cause updates to other parameters in stimconfig
                 updated_attrs = self.model.getParameters()
                 self.view.set_model_parameters({section_id: updated_attrs[section_id].copy()})
-                # Update undoable action
-                self.appendAction( section_id, old_value, new_value, line_item_id)
             else:
                 QMessageBox.warning(self.view, "Invalid Attribute", f"Warning: {line_item_id} is not a valid attribute of the model.")
         elif section_id == "modelParameters":
@@ -475,14 +747,13 @@ class Controller(QObject, BaseApp):
             # model attributes cause updates to other parameters in stimconfig
             updated_attrs = self.model.getParameters()
             self.view.set_model_parameters({section_id: updated_attrs[section_id].copy()})
-            # Update undoable action
-            self.appendAction( section_id, old_value, new_value, line_item_id)
         else:
             QMessageBox.warning(self.view, "Unrecognized Section", f"Warning: {section_id} is not a recognized section.")
+        # Update undoable state
+        self.pushSnapshot()
         # Any updates here should cause an request for update
         if self.view.getConfig("simulation","doOnChange"):
-            
-            self.runSimulation()
+            self.requestSimulation()
         else:
             self.view.setStatus("Awaiting Simulation...")
 
@@ -500,31 +771,79 @@ class Controller(QObject, BaseApp):
         # update status bar to pending
         self.view.setStatus("Awaiting Simulation")
 
-    def appendAction(self, section_id, old_value, new_value, line_item_id):
-        # We always want to track the latest update, but if we don't already have an undo buffer, we need to insert the first old_value in
-        if not len(self.param_actions_buffer):
-            self.param_actions_buffer.append((section_id, line_item_id, old_value))
-        self.param_actions_buffer.append((section_id, line_item_id, new_value))
-        
+    def pushSnapshot(self):
+        # Record the whole parameter state; sections that did not change are shared with the previous state
+        parameters = self.view.get_model_parameters()
+        current = self.param_actions_buffer.current()
+        if current is not None and current.matches(parameters):
+            return
+        self.param_actions_buffer.append(Snapshot(share_parameters(current, parameters)))
+
+    def attachResults(self, snapshot, results):
+        # Remember the results simulated for a state, past states keep theirs within the undo memory budget
+        if not self.param_actions_buffer.replace(snapshot, snapshot.with_results(results)):
+            return
+        self.trimCachedResults()
+
+    def trimCachedResults(self):
+        limit = float(self.view.getConfig("simulation","undoResultMemory") or 0)
+        if limit <= 0:
+            return
+        budget = limit * 2**20
+        buffer = self.param_actions_buffer
+        # States nearest the current one keep their results, the current state's are always kept
+        states = sorted(enumerate(buffer), key=lambda item: abs(item[0] - buffer.current_index))
+        kept, used = set(), 0
+        for index, state in states:
+            if state.results is None or id(state.results) in kept:
+                continue
+            size = result_bytes(state.results)
+            if index == buffer.current_index or used + size <= budget:
+                kept.add(id(state.results))
+                used += size
+            else:
+                buffer.replace(state, state.with_results(None))
+
+    def restoreModelParameters(self, parameters):
+        # Set the panels without triggering edit handling, then apply them to the model
+        for section in self.view.param_sections.values():
+            section.blockSignals(True)
+        try:
+            self.view.set_model_parameters(parameters)
+        finally:
+            for section in self.view.param_sections.values():
+                section.blockSignals(False)
+        self.updateModelData()
+
+    def restoreSnapshot(self, snapshot):
+        self.restoreModelParameters(snapshot.parameters)
+        if snapshot.results is not None:
+            # Cached results for this state: redraw without solving, replacing runs of its class
+            self.schedulers[self.runPriority()].cancel()
+            self.showCachedResults(snapshot)
+        elif self.view.getConfig("simulation","doOnChange"):
+            self.requestSimulation()
+        else:
+            self.view.setStatus("Awaiting Simulation...")
+
+    def showCachedResults(self, snapshot):
+        self.displayed_sequence = next(self.run_sequence)
+        self.model._results = snapshot.results
+        self.on_axes_changed(self.view.getAxesSelectedOptions())
+        self.view.setStatus("Current")
+
     def undo(self):
-        pass
-        # if len(self.param_actions_buffer) == 0:
-        #     return
-        # section_id, line_item_id, last_value = self.param_actions_buffer.previous()
-        # if section_id == None:
-        #     # Either no more undo steps or none yet
-        #     return
-        # self.updateModel(section_id,line_item_id,last_value)
+        snapshot = self.param_actions_buffer.previous()
+        if snapshot is None:
+            # Either no more undo steps or none yet
+            return
+        self.restoreSnapshot(snapshot)
 
     def redo(self):
-        pass
-        # if len(self.param_actions_buffer.buffer) == 0:
-        #     return
-        # section_id, line_item_id, next_value = self.param_actions_buffer.previous()
-        # if section_id == None:
-        #     # Either no more undo steps or none yet
-        #     return
-        # self.updateModel(section_id,line_item_id,next_value)
+        snapshot = self.param_actions_buffer.next()
+        if snapshot is None:
+            return
+        self.restoreSnapshot(snapshot)
 
     def quit_application(self):
         QCoreApplication.quit()
@@ -0,0 +1,70 @@
+from dataclasses import dataclass
+from PyQt6.QtCore import QObject, QTimer, pyqtSlot
+
+@dataclass
+class SimulationRun:
+    """A simulation in progress: its worker and thread, the state being simulated and its start order."""
+    priority: int
+    worker: object
+    thread: object
+    snapshot: object
+    sequence: int
+
+class SimulationScheduler(QObject):
+    """Coalesces simulation requests so only the latest parameter state is simulated.
+
+    ``request()`` (re)starts a debounce timer; when it fires, a run in progress
+    is cancelled through ``stop`` and the new run starts once ``run_ended()``
+    reports that the old one has wound down. Any number of requests made while
+    waiting collapse into a single run of whatever ``start`` reads at that time.
+    """
+    DEBOUNCE_MS = 300
+
+    def __init__(self, start, stop, delay=DEBOUNCE_MS, parent=None):
+        super().__init__(parent)
+        self._start = start
+        self._stop = stop
+        self.delay = delay
+        self.pending = False
+        self.active = False
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.dispatch)
+
+    def request(self, delay=None):
+        self.pending = True
+        self.timer.start(self.delay if delay is None else delay)
+
+    def withdraw(self):
+        # Drop pending requests, an active run carries on
+        self.pending = False
+        self.timer.stop()
+
+    def cancel(self):
+        # Drop pending requests and stop the active run
+        self.pending = False
+        self.timer.stop()
+        if self.active:
+            self._stop()
+
+    @pyqtSlot()
+    def dispatch(self):
+        if not self.pending:
+            return
+        if self.active:
+            # The stale run is stopped, the latest request starts when it has ended
+            self._stop()
+            return
+        self.pending = False
+        self.active = True
+        try:
+            self._start()
+        except Exception:
+            self.active = False
+            raise
+
+    @pyqtSlot()
+    def run_ended(self):
+        self.active = False
+        if self.pending and not self.timer.isActive():
+            self.dispatch()
@@ -0,0 +1,79 @@
+from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
+import threading
+import queue
+
+class ExportCancelled(Exception):
+    """Raised inside an export job once it has been cancelled."""
+    pass
+
+class ExportWorker(QObject):
+    """Runs export jobs (CSV, PDF reports, figures) one at a time off the GUI thread.
+
+    A job is a callable taking a ``progress`` keyword; jobs report the fraction
+    done through it, and it raises ``ExportCancelled`` after ``cancel()``.
+    ``cancel()`` stops the running job at its next progress report and drops
+    the queued ones.
+    """
+    started = pyqtSignal(str)
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(str)
+    error = pyqtSignal(str, str)
+    cancelled = pyqtSignal(str)
+
+    def __init__(self):
+        super().__init__()
+        self._jobs = queue.Queue()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._percent = -1
+
+    def submit(self, name, job, *args, **kwargs):
+        with self._lock:
+            generation = self._generation
+        self._jobs.put((generation, name, job, args, kwargs))
+
+    def cancel(self):
+        with self._lock:
+            self._generation += 1
+
+    def stop(self):
+        # Cancel everything and let run() return
+        self.cancel()
+        self._jobs.put(None)
+
+    def pending(self):
+        return self._jobs.qsize()
+
+    @pyqtSlot()
+    def run(self):
+        while True:
+            item = self._jobs.get()
+            if item is None:
+                break
+            generation, name, job, args, kwargs = item
+            if not self.is_current(generation):
+                self.cancelled.emit(name)
+                continue
+            self._percent = -1
+            self.started.emit(name)
+            try:
+                job(*args, progress=lambda fraction: self.report(generation, fraction), **kwargs)
+            except ExportCancelled:
+                self.cancelled.emit(name)
+            except Exception as e:
+                self.error.emit(name, str(e))
+            else:
+                self.finished.emit(name)
+
+    def is_current(self, generation):
+        with self._lock:
+            return generation == self._generation
+
+    def report(self, generation, fraction):
+        if not self.is_current(generation):
+            raise ExportCancelled()
+        # Only emit when the displayed percentage changes
+        percent = min(max(int(fraction * 100), 0), 99)
+        if percent != self._percent:
+            self._percent = percent
+            self.progress.emit(percent)
@@ -0,0 +1,95 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+CHUNKS_PER_WORKER = 8
+IN_FLIGHT_PER_WORKER = 2
+
+def chunk_size(total, workers):
+    # Single conditions for small runs, larger chunks once the sweep dwarfs the pool
+    return max(1, total // (max(1, workers) * CHUNKS_PER_WORKER))
+
+def run_chunk(fn, chunk, should_stop=None, checkpoint=None):
+    results = []
+    for condition in chunk:
+        if should_stop is not None and should_stop():
+            break
+        if checkpoint is not None:
+            checkpoint()
+        results.append(fn(*condition))
+    return results
+
+class ProgressTracker:
+    """Reports the fraction done and an ETA, at most every ``interval`` seconds.
+
+    ``callback(completed, total, eta)`` is always called for the last
+    condition; ``eta`` is the remaining time in seconds, None before the first
+    condition has completed.
+    """
+
+    def __init__(self, total, callback, interval=0.1):
+        self.total = total
+        self.callback = callback
+        self.interval = interval
+        self._start = time.perf_counter()
+        self._last = None
+
+    def update(self, completed):
+        now = time.perf_counter()
+        if completed < self.total and self._last is not None and now - self._last < self.interval:
+            return
+        self._last = now
+        eta = (now - self._start) / completed * (self.total - completed) if completed else None
+        self.callback(completed, self.total, eta)
+
+def run_conditions(executor, fn, conditions, on_result, workers=1, chunk=None, max_in_flight=None, should_stop=None, progress=None, priority=None):
+    """Run ``fn(*condition)`` for every condition on ``executor``.
+
+    Conditions are submitted in chunks (one task per chunk) and at most
+    ``max_in_flight`` chunks are queued at once, so a large sweep neither
+    floods the executor's queue nor holds a future per condition.
+    ``on_result(condition, result)`` is called on the calling thread as
+    results arrive. Returns False when ``should_stop()`` ended the run early,
+    in which case queued chunks are cancelled and running ones awaited.
+    With a ``priority``, chunks are queued on a ``WorkerPool`` at that
+    priority and step aside for more urgent tasks between conditions.
+    """
+    total = len(conditions)
+    chunk = chunk or chunk_size(total, workers)
+    max_in_flight = max_in_flight or max(1, workers) * IN_FLIGHT_PER_WORKER
+    tracker = ProgressTracker(total, progress) if progress is not None else None
+    pending = {}  # future -> start of its chunk
+    submitted = completed = 0
+    if priority is None:
+        schedule, checkpoint = executor.submit, None
+    else:
+        schedule = lambda *args: executor.schedule(priority, *args)
+        checkpoint = lambda: executor.yield_to(priority)
+
+    def submit():
+        nonlocal submitted
+        start = submitted
+        submitted = min(start + chunk, total)
+        pending[schedule(run_chunk, fn, conditions[start:submitted], should_stop, checkpoint)] = start
+
+    try:
+        while submitted < total and len(pending) < max_in_flight:
+            submit()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                start = pending.pop(future)
+                for offset, result in enumerate(future.result()):
+                    on_result(conditions[start + offset], result)
+                completed += min(start + chunk, total) - start
+                if should_stop is not None and should_stop():
+                    return False
+                if submitted < total:
+                    submit()
+            if tracker is not None:
+                tracker.update(completed)
+        return True
+    finally:
+        # Drop queued chunks, the executor may be shared with the next run
+        for future in pending:
+            future.cancel()
+        wait(pending)
@@ -1,9 +1,15 @@
 import numpy as np
-from scipy.integrate import solve_ivp
-from scipy.optimize import fsolve
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from time import perf_counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from functools import partial
 import warnings
 
+from src.main.utils import Metrics
+from src.main.model.resultstore import ResultStore, PRECISIONS, COMPRESSIONS
+from src.main.model.jobqueue import run_conditions
+from src.main.model.simulationspec import SimulationSpec
+
 class SimulationError(Exception):
     """Exception raised for errors in the simulation."""
     pass
@@ -15,6 +21,22 @@ class SimulationWarning(Warning):
 class Phototransduction:
     
     MAX_SOLVE_ATTEMPTS = 20
+    SOLVER_METHOD = 'RK45'  # the only method, stepped by CountingRK45
+    SOLVER_STATS = [
+        'nfev', 'njev', 'nlu', 'acceptedSteps', 'rejectedSteps', 'solveRetries', 'finalMaxStep', 'solveTime', 'solverStatus', 'solverMessage',
+        'solveOutcome', 'solvedUntil'
+    ]
+    # solveOutcome values: 'ok', or why the condition stopped early (its signals are NaN from there on)
+    SOLVE_OUTCOMES = ('ok', 'timedOut', 'stepLimit', 'failed')
+    # Signals that are a normalized signal scaled by the dark current, derived on read instead of stored
+    SCALED_SIGNALS = {
+        'extracellularCurrentScaled': 'extracellularCurrentNorm',
+        'extracellularCurrentChScaled': 'extracellularCurrentChNorm',
+        'extracellularCurrentExScaled': 'extracellularCurrentExNorm',
+        'intracellularCurrentScaled': 'intracellularCurrentNorm',
+        'intracellularCurrentChScaled': 'intracellularCurrentChNorm',
+        'intracellularCurrentExScaled': 'intracellularCurrentExNorm'
+    }
     
     def __init__(self, dt=0.001, responseDuration=1.5, stimulusOffset=0.1, darkCurrent=15):
         self._dt = dt
@@ -22,6 +44,13 @@ class Phototransduction:
         self._responseDuration = responseDuration
         self._fs = 1 / dt
         self._maxStep = np.inf
+        self.rtol = 1e-6  # relative tolerance of the solver
+        self.atol = 1e-8  # absolute tolerance of the solver
+        self._conditionStepLimit = None  # solver steps per condition, None is unlimited
+        self._conditionTimeLimit = None  # wall-time seconds per condition, None is unlimited
+        self._spillBytes = None  # results beyond this many bytes of signals go to disk
+        self._resultPrecision = 'float64'
+        self._resultCompression = 'none'
         
         self.param = {
             'betaDark': 4.1,         # s^-1
@@ -49,6 +78,7 @@ class Phototransduction:
         self._pigmentActivations = np.array([1])
 
         self._results = None
+        self.metrics = Metrics()
 
     @property
     def stimulusOffset(self):
@@ -146,11 +176,91 @@ class Phototransduction:
     @maxStep.setter
     def maxStep(self,value):
         self._maxStep = float(value)
+
+    def solverSettings(self):
+        # Everything that decides how conditions are solved, e.g. to save with a session
+        return {
+            'method': self.SOLVER_METHOD,
+            'maxStep': self.maxStep,
+            'rtol': self.rtol,
+            'atol': self.atol,
+            'maxAttempts': self.MAX_SOLVE_ATTEMPTS,
+            'conditionStepLimit': self.conditionStepLimit,
+            'conditionTimeLimit': self.conditionTimeLimit
+        }
+
+    def setSolverSettings(self, settings):
+        # Settings missing from older sessions keep their current values
+        method = settings.get('method', self.SOLVER_METHOD)
+        if method != self.SOLVER_METHOD:
+            warnings.warn(f"Solver method {method} is not available, using {self.SOLVER_METHOD}.", SimulationWarning)
+        self.maxStep = settings.get('maxStep', self.maxStep)
+        self.rtol = float(settings.get('rtol', self.rtol))
+        self.atol = float(settings.get('atol', self.atol))
+        self.MAX_SOLVE_ATTEMPTS = int(settings.get('maxAttempts', self.MAX_SOLVE_ATTEMPTS))
+        self.conditionStepLimit = settings.get('conditionStepLimit', self.conditionStepLimit)
+        self.conditionTimeLimit = settings.get('conditionTimeLimit', self.conditionTimeLimit)
+
+    @property
+    def conditionStepLimit(self):
+        return self._conditionStepLimit
+
+    @conditionStepLimit.setter
+    def conditionStepLimit(self, value):
+        self._conditionStepLimit = int(value) if value and value > 0 else None
+
+    @property
+    def conditionTimeLimit(self):
+        return self._conditionTimeLimit
+
+    @conditionTimeLimit.setter
+    def conditionTimeLimit(self, value):
+        self._conditionTimeLimit = float(value) if value and value > 0 else None
     
+    @property
+    def spillBytes(self):
+        return self._spillBytes
+
+    @spillBytes.setter
+    def spillBytes(self, value):
+        self._spillBytes = None if value is None else int(value)
+
+    @property
+    def resultPrecision(self):
+        return self._resultPrecision
+
+    @resultPrecision.setter
+    def resultPrecision(self, value):
+        if value not in PRECISIONS:
+            raise ValueError(f"Invalid result precision: {value}")
+        self._resultPrecision = value
+
+    @property
+    def resultCompression(self):
+        return self._resultCompression
+
+    @resultCompression.setter
+    def resultCompression(self, value):
+        if value not in COMPRESSIONS:
+            raise ValueError(f"Invalid result compression: {value}")
+        self._resultCompression = value
+
     @property
     def results(self):
         return self._results
 
+    def createResultStore(self, spec=None):
+        # Storage settings come from the spec, so a run keeps those it started with
+        if spec is None:
+            spec = self.spec()
+        dark_current = lambda meta: meta['modelParameters']['iDark']
+        return ResultStore(
+            spec.spillBytes,
+            precision=spec.resultPrecision,
+            compression=spec.resultCompression,
+            derived={scaled: (norm, dark_current) for scaled, norm in self.SCALED_SIGNALS.items()}
+        )
+
     def _adjust_stimulus_durations(self, target_name):
         if target_name == "intensity":
             target = self._stimulusIntensities
@@ -197,8 +307,8 @@ class Phototransduction:
                 else:
                     self.param[key] = value
     
-    def light_stimulus(self, stimulusIntensity, stimulusTime):
-        time = self.time
+    def light_stimulus(self, stimulusIntensity, stimulusTime, time=None):
+        time = self.time if time is None else time
         lightStimulus = np.zeros(time.shape)
         if stimulusIntensity > 0:
             suppress_time = 1 - self.suppress_interval(1, time, stimulusTime[0], stimulusTime[1], 0.0002)
@@ -208,7 +318,7 @@ class Phototransduction:
     def suppress_interval(self, suppressFactor, matrix, pstart, pend, sensitivity):
         return 1 - suppressFactor * (np.tanh((matrix - pstart) / sensitivity) - np.tanh((matrix - pend) / sensitivity)) / 2
 
-    def diff_eq(self, t, u, lightStimulus, param):
+    def diff_eq(self, t, u, lightStimulus, param, spec=None):
         betaDark = param['betaDark']
         muRa = param['muRa']
         muTa = param['muTa']
@@ -224,7 +334,8 @@ class Phototransduction:
         muCa = param['muCa']
         colArea = param['colArea']
         
-        indTime = int((t + self.stimulusOffset) / self.dt)
+        offset, dt = (self.stimulusOffset, self.dt) if spec is None else (spec.stimulusOffset, spec.dt)
+        indTime = int((t + offset) / dt)
         stimAmplitude = lightStimulus[indTime]
 
         ca = np.exp(-u[4])
@@ -240,50 +351,115 @@ class Phototransduction:
         ) * np.exp(u[4])
         return dudt
 
-    def simulate_once(self, stimulusIntensity, stimulusTime, pigmentActivation,param=None):
+    def simulate_once(self, stimulusIntensity, stimulusTime, pigmentActivation,param=None, label=None, spec=None):
+        # spec: the run's SimulationSpec, captured from the live model when omitted
+        if spec is None:
+            spec = self.spec(self.metrics)
+        metrics = spec.metrics
+        metrics.end('queueWait', label)
+        # SciPy is heavy to import, load it on first use instead of at startup
+        from scipy.integrate import solve_ivp
+        from src.main.model.solvers import CountingRK45, SolveBudget
+
+        solveStart = perf_counter()
         if param is None:
-            param = self.__generate_parameters()
-        time = self.time
-        lightStimulus = self.light_stimulus(stimulusIntensity, stimulusTime)
+            param = spec.parameter_set()
+        time = spec.time
+        lightStimulus = self.light_stimulus(stimulusIntensity, stimulusTime, time)
 
         # init_values = np.zeros(5)
-        init_values = self.calculate_steady_state(param)
+        with metrics.stage('steadyState', label):
+            init_values = self.calculate_steady_state(param, metrics)
+        budget = SolveBudget(spec.stepLimit, spec.timeLimit)
+        outcome, failure = 'ok', None
+        solution = None
         attempt = 0
-        max_step = self.maxStep # np.inf  # Initial max step size
+        max_step = spec.maxStep # np.inf  # Initial max step size
+        stepCounts = {'accepted': 0, 'rejected': 0}
+        evaluations = {'nfev': 0, 'njev': 0, 'nlu': 0}
 
-        while attempt < self.MAX_SOLVE_ATTEMPTS:
+        while attempt < spec.maxAttempts:
+            if attempt:
+                max_step = 0.01 if max_step == np.inf else max_step / 2  # Decrease max step size for the retry
             attempt += 1
             try:
-                with warnings.catch_warnings(record=True) as w:
+                with warnings.catch_warnings(record=True) as w, metrics.stage('integrate', label):
                     warnings.simplefilter("always", RuntimeWarning)
                     solution = solve_ivp(
-                        lambda t, y: self.diff_eq(t, y, lightStimulus, param),
-                        [-self.dt, time[-1]],
+                        lambda t, y: self.diff_eq(t, y, lightStimulus, param, spec),
+                        [-spec.dt, time[-1]],
                         init_values,
-                        t_eval=time[time >= -self.dt],
-                        method='RK45',  # Use RK45 solver
+                        t_eval=time[time >= -spec.dt],
+                        method=CountingRK45,  # RK45 with step accounting
                         vectorized=True,
-                        rtol=1e-6,       # Relative tolerance
-                        atol=1e-8,       # Absolute tolerance
-                        max_step=max_step  # Set max step size
+                        rtol=spec.rtol,  # Relative tolerance
+                        atol=spec.atol,  # Absolute tolerance
+                        max_step=max_step,  # Set max step size
+                        stepCounts=stepCounts,
+                        budget=budget
                     )
+                    metrics.count('rhsEvaluations', solution.nfev, label)
+                    for key in evaluations:
+                        evaluations[key] += getattr(solution, key)
 
+                    if budget.outcome is not None:
+                        outcome = budget.outcome
+                        break  # Retrying cannot help once the budget is spent
                     if not any(item.category == RuntimeWarning for item in w):
                         break  # Exit loop if no warning was raised
 
             except Exception as e:
-                raise SimulationError(f"Attempt {attempt} failed with error: {e}")
-
-            max_step = 0.01 if max_step == np.inf else max_step / 2  # Decrease max step size for the next attempt
-
-        if attempt == self.MAX_SOLVE_ATTEMPTS:
+                # The rest of the sweep carries on; this condition is marked failed
+                outcome, failure = 'failed', f"Attempt {attempt} failed with error: {e}"
+                solution = None
+                break
+
+        if outcome == 'ok' and solution.status < 0:
+            # Solver gave up on its own, e.g. the step size underflowed
+            outcome, failure = 'failed', solution.message
+
+        solveTime = perf_counter() - solveStart
+        metrics.count('acceptedSteps', stepCounts['accepted'], label)
+        metrics.count('rejectedSteps', stepCounts['rejected'], label)
+        metrics.count('retries', attempt - 1, label)
+
+        if outcome != 'ok':
+            metrics.count(outcome, 1, label)
+            warnings.warn(f"Condition {label} stopped early: {failure or budget.message}", SimulationWarning)
+        elif attempt == spec.maxAttempts:
             warnings.warn("Simulation completed with warnings due to repeated overflow warnings.", SimulationWarning)
 
-        # Get the solutions (transpose for convenience)
-        sol = solution.y.T
-        
+        # Time points the solver did not reach are NaN
+        evaluated = time[time >= -spec.dt]
+        sol = np.full((len(evaluated), len(init_values)), np.nan)
+        solvedUntil = -spec.dt
+        if solution is not None and len(solution.t):
+            sol[:solution.y.shape[1]] = solution.y.T
+            solvedUntil = float(solution.t[-1])
+
+        with metrics.stage('postProcess', label):
+            result = self.__post_process(sol=sol, time=time, dt=spec.dt, init_values=init_values, lightStimulus=lightStimulus, param=param, stimulusIntensity=stimulusIntensity, pigmentActivation=pigmentActivation)
+
+        # Solver statistics, totals over all attempts
+        result.update({
+            'nfev': evaluations['nfev'],
+            'njev': evaluations['njev'],
+            'nlu': evaluations['nlu'],
+            'acceptedSteps': stepCounts['accepted'],
+            'rejectedSteps': stepCounts['rejected'],
+            'solveRetries': attempt - 1,
+            'finalMaxStep': max_step,
+            'solveTime': solveTime,
+            'solverStatus': -1 if solution is None else solution.status,
+            'solverMessage': failure if solution is None else solution.message,
+            'solveOutcome': outcome,
+            'solvedUntil': solvedUntil
+        })
+        return result
+
+    def __post_process(self, sol, time, dt, init_values, lightStimulus, param, stimulusIntensity, pigmentActivation):
         # Assess pre-stimulus time as steady state
-        pre_stimulus_length = len(time[time < -self.dt])
+        pre_stimulus_length = len(time[time < -dt])
         pre_stimulus_values = np.tile(init_values,(pre_stimulus_length,1))
         
         sol = np.vstack((pre_stimulus_values,sol))
@@ -314,87 +490,101 @@ class Phototransduction:
             'intracellularCurrentNorm': intracellularCurrent,
             'intracellularCurrentChNorm': intracellularCurrentCh,
             'intracellularCurrentExNorm': intracellularCurrentEx,
-            'extracellularCurrentScaled': extracellularCurrent * param['iDark'],
-            'extracellularCurrentChScaled': extracellularCurrentCh * param['iDark'],
-            'extracellularCurrentExScaled': extracellularCurrentEx * param['iDark'],
-            'intracellularCurrentScaled': intracellularCurrent * param['iDark'],
-            'intracellularCurrentChScaled': intracellularCurrentCh * param['iDark'],
-            'intracellularCurrentExScaled': intracellularCurrentEx * param['iDark'],
             'lightStimulus': lightStimulus,
             'stimulusIntensity': stimulusIntensity,
             'pigmentActivation': pigmentActivation,
             'modelParameters': {key: np.copy(value) for key, value in param.items() if key != 'time'}
         }
 
-    def simulate(self, stimulusIntensities=None, stimulusDurations=None):
+    def spec(self, metrics=None):
+        # Frozen copy of everything a run reads, see SimulationSpec; each run gets new Metrics by default
+        return SimulationSpec(
+            dt=self.dt,
+            stimulusOffset=self.stimulusOffset,
+            responseDuration=self.responseDuration,
+            stimulusIntensities=self.stimulusIntensities,
+            stimulusDurations=self.stimulusDurations,
+            pigmentActivations=self.pigmentActivations,
+            parameters=self.param,
+            maxStep=self.maxStep,
+            rtol=self.rtol,
+            atol=self.atol,
+            maxAttempts=self.MAX_SOLVE_ATTEMPTS,
+            stepLimit=self.conditionStepLimit,
+            timeLimit=self.conditionTimeLimit,
+            spillBytes=self.spillBytes,
+            resultPrecision=self.resultPrecision,
+            resultCompression=self.resultCompression,
+            metrics=metrics
+        )
+
+    def isSweep(self):
+        # A parameter with several values makes the next run a parameter sweep
+        return any(np.size(value) > 1 for value in self.param.values())
+
+    def buildConditions(self, spec=None):
+        # One (intensity, stimulus time, activation, parameters, label) tuple per simulation
+        if spec is None:
+            spec = self.spec()
+        stimulusTimes = [(np.float64(0), d) for d in spec.stimulusDurations]
+        params = spec.parameter_set()
+        # Identify parameter sweeps
+        sweep_param = {
+            k: v for k, v in params.items() if np.ndim(v) > 0 and len(v) > 1
+            }
+        conditions = []
+        for intensity, time, activation in zip(spec.stimulusIntensities, stimulusTimes, spec.pigmentActivations):
+            if not sweep_param:
+                conditions.append((intensity, time, activation, params, f"{activation} (R*)"))
+                continue
+            sweep_key = list(sweep_param.keys())[-1]
+            for sweep_value in sweep_param[sweep_key]:
+                param_set = spec.parameter_set()
+                param_set[sweep_key] = np.asarray(sweep_value)
+                label = f"{activation} (R*); {param_set[sweep_key]:.5g} ({sweep_key})"
+                conditions.append((intensity, time, activation, param_set, label))
+        return conditions
+
+    def runConditions(self, executor, conditions, results, workers=None, should_stop=None, progress=None, priority=None, spec=None):
+        # Runs conditions built from spec on executor, appending labelled results; False if stopped early.
+        # priority (workerpool.INTERACTIVE/BACKGROUND) only applies to a WorkerPool
+        metrics = self.metrics if spec is None else spec.metrics
+        for condition in conditions:
+            metrics.begin('queueWait', condition[-1])
+
+        def collect(condition, result):
+            result['label'] = condition[-1]
+            results.append(result)
+
+        workers = workers or getattr(executor, 'workers', None) or getattr(executor, '_max_workers', 1)
+        if not hasattr(executor, 'schedule'):
+            priority = None
+        simulate_once = self.simulate_once if spec is None else partial(self.simulate_once, spec=spec)
+        return run_conditions(executor, simulate_once, conditions, collect, workers=workers, should_stop=should_stop, progress=progress, priority=priority)
+
+    def run(self, spec, executor=None, should_stop=None, progress=None, priority=None, sortKey='stimulusIntensity'):
+        # Simulates spec into a new result store, recording into spec.metrics. The model's own
+        # results and metrics are left alone, so runs may overlap. None if stopped early.
+        results = self.createResultStore(spec)
+        conditions = self.buildConditions(spec)
+        with spec.metrics.stage('simulate'), nullcontext(executor) if executor is not None else ThreadPoolExecutor() as executor:
+            finished = self.runConditions(executor, conditions, results, should_stop=should_stop, progress=progress, priority=priority, spec=spec)
+        if not finished:
+            return None
+        with spec.metrics.stage('sort'):
+            return self.sortResults(results, sortKey)
+
+    def simulate(self, stimulusIntensities=None, stimulusDurations=None, executor=None, priority=None):
+        # executor: a shared pool (e.g. WorkerPool) to run conditions on, a temporary one is used by default
         if stimulusIntensities is not None:
             self.stimulusIntensities = stimulusIntensities
         if stimulusDurations is not None:
             self.stimulusDurations = stimulusDurations
 
-        # Determine Stimulus Times
-        stimulusTimes = [(np.float64(0), d) for d in self.stimulusDurations]
-        params = self.__generate_parameters()
-        # Identify parameter sweeps
-        sweep_param = {
-            k: v for k, v in params.items() if np.ndim(v) > 0 and len(v) > 1
-            }
-        sweep_key = list(sweep_param.keys())
-        nSweepKeys = len(sweep_key)
-        nSweep = 0
-        if nSweepKeys:
-            sweep_key = sweep_key.pop()
-            nSweep = len(sweep_param[sweep_key])
-        # Run simulations
         self._results = []  # Clear previous results
-        results = []
-        with ThreadPoolExecutor() as executor:
-            futures = []
-            # Loop through stimuli
-            for intensity, time, activation in zip(self.stimulusIntensities, stimulusTimes, self.pigmentActivations):
-                # Loop through parameter sweep
-                if nSweep:
-                    for i in range(nSweep):
-                        param_set = {
-                            key:np.copy(value) for key,value in params.items()
-                            } # copy the parameters
-                        param_set[sweep_key] = np.asarray(sweep_param[sweep_key][i])
-                        label = f"{activation} (R*); {param_set[sweep_key]:.5g} ({sweep_key})"
-                        futures.append(
-                            (
-                                executor.submit(
-                                    self.simulate_once,
-                                    intensity,
-                                    time,
-                                    activation,
-                                    param_set
-                                    ),
-                                label
-                            )
-                        )
-                else:
-                    label = f"{activation} (R*)"
-                    futures.append(
-                        (
-                            executor.submit(
-                                self.simulate_once,
-                                intensity,
-                                time,
-                                activation,
-                                params
-                                ),
-                            label
-                        )
-                    )
-            
-            for future in as_completed([fut for fut, _ in futures]):
-                # Find the corresponding label
-                label = next(label for fut, label in futures if fut == future)
-                result = future.result()
-                result['label'] = label
-                results.append(result)
-
-        self._results = sorted(results, key=lambda x: x['stimulusIntensity'])
+        spec = self.spec()
+        self.metrics = spec.metrics
+        self._results = self.run(spec, executor, priority=priority)
 
     def export(self, *fields):
         if self._results is None:
@@ -409,9 +599,40 @@ class Phototransduction:
 
         return np.array([data[key] for key in sorted(data.keys())]).T
 
-    
-    def getResult(self, x, y, opts={}):
+    def getExportColumns(self, x, fields=None):
+        # Columns reference the stored arrays, nothing is copied. All signals are
+        # exported when fields is None. A single x column is shared when every
+        # trace's x is a prefix of the longest one (e.g. time), otherwise each
+        # trace gets its own x column.
         if not self.results:
+            warnings.warn("No simulation results available.", SimulationWarning)
+            return [], []
+        valid_keys = self.getLabels()
+        fields = [key for key in valid_keys if key != x] if fields is None else list(fields)
+        if x not in valid_keys or any(field not in valid_keys for field in fields):
+            warnings.warn(f"Invalid keys: {x}, {fields}", SimulationWarning)
+            return [], []
+        x_values = [result[x] for result in self.results]
+        longest = max(x_values, key=len)
+        shared = all(np.array_equal(longest[:len(value)], value) for value in x_values)
+        headers, columns = [], []
+        if shared:
+            headers.append(x)
+            columns.append(longest)
+        for result in self.results:
+            label = result['label'] if 'label' in result else f"{result['pigmentActivation']} R*"
+            if not shared:
+                headers.append(f"{x}: {label}")
+                columns.append(result[x])
+            for field in fields:
+                headers.append(f"{field}: {label}")
+                columns.append(result[field])
+        return headers, columns
+
+    def getResult(self, x, y, opts={}, copy=True, results=None):
+        # results: a run's result store, the model's current results by default
+        results = self.results if results is None else results
+        if not results:
             warnings.warn("No simulation results available.", SimulationWarning)
             return []
         valid_keys = self.getLabels()
@@ -420,14 +641,21 @@ class Phototransduction:
             return []
         # for now, opts is empty, but we will use it to gather different sorting or grouping values and set other plot options
         # return {label:{x:label (unit), y: label (unit)}, data: [{x:data,y:data,label:stim R*}]
+        # Only the requested signals are copied, copy=False hands out read-only views for plotting
+        sweep_keys = self.__varying_parameters(results)
         data = []
-        for result in self.results:
-            result_copy = {key: np.copy(value) for key, value in result.items()}
+        for result in results:
             data.append(
                 {
-                    "x": result_copy[x],
-                    "y": result_copy[y],
-                    "label": result_copy['label'] if 'label' in result_copy else f"{result_copy['pigmentActivation']} R*"
+                    "x": np.copy(result[x]) if copy else self.__read_only(result[x]),
+                    "y": np.copy(result[y]) if copy else self.__read_only(result[y]),
+                    "label": result['label'] if 'label' in result else f"{result['pigmentActivation']} R*",
+                    # Condition values shown by the plot readout
+                    "meta": {
+                        'stimulusIntensity': result['stimulusIntensity'],
+                        'pigmentActivation': result['pigmentActivation'],
+                        **{key: result['modelParameters'][key] for key in sweep_keys}
+                    }
                 }
             )
         return {
@@ -437,6 +665,12 @@ class Phototransduction:
             "data": data
         }
 
+    def getResults(self, x, ys, copy=False, results=None):
+        # One getResult per signal for the small-multiples view; the x arrays are
+        # views of the same stored result, so panels share them without copying
+        panels = [self.getResult(x, y, copy=copy, results=results) for y in ys]
+        return panels if all(panels) else []
+
     
     def steady_state_equations(self,u, param=None):
         if param is None:
@@ -471,11 +705,15 @@ class Phototransduction:
         
         return dudt
 
-    def calculate_steady_state(self,param=None):
+    def calculate_steady_state(self,param=None, metrics=None):
         if param is None:
             param = self.__generate_parameters()
+        if metrics is None:
+            metrics = self.metrics
+        from scipy.optimize import fsolve
         initial_guess = np.zeros(5)
-        steady_state_values = fsolve(self.steady_state_equations, initial_guess, args=(param,))
+        steady_state_values, info, _, _ = fsolve(self.steady_state_equations, initial_guess, args=(param,), full_output=True)
+        metrics.count('steadyStateEvaluations', info['nfev'])
         return steady_state_values
     
     def getParameters(self):
@@ -519,8 +757,77 @@ class Phototransduction:
         keys = ['lightStimulus','stimulusIntensity','pigmentActivation']
         for key,_ in self.param.items():
             keys.append(key)
+        keys.extend(self.SOLVER_STATS)
         return keys
+
+    def getSolverStats(self, sortKey=None, reverse=False):
+        if not self.results:
+            warnings.warn("No simulation results available.", SimulationWarning)
+            return []
+        if sortKey is not None and sortKey not in self.getValidSortKeys():
+            warnings.warn(f"Invalid sort key: {sortKey}", SimulationWarning)
+            return []
+        stats = []
+        for result in self.__metadata():
+            row = {
+                'label': result['label'] if 'label' in result else f"{result['pigmentActivation']} R*",
+                'stimulusIntensity': result['stimulusIntensity'],
+                'pigmentActivation': result['pigmentActivation']
+            }
+            row.update({key: result.get(key) for key in self.SOLVER_STATS})
+            row.update(result['modelParameters'])
+            stats.append(row)
+        if sortKey is not None:
+            stats = sorted(stats, key=lambda row: self.__sort_value(row[sortKey]), reverse=reverse)
+        return stats
+
+    def getSolveFailures(self):
+        # (label, solveOutcome, solverMessage) for conditions that stopped early
+        if not self.results:
+            return []
+        return [
+            (result.get('label'), result['solveOutcome'], result['solverMessage'])
+            for result in self.__metadata() if result.get('solveOutcome', 'ok') != 'ok'
+        ]
+
+    def sortResults(self, results, sortKey):
+        # Sort keys may be result fields, solver statistics or model parameters
+        def value(result):
+            if sortKey in result:
+                return self.__sort_value(result[sortKey])
+            return self.__sort_value(result['modelParameters'][sortKey])
+        if isinstance(results, ResultStore):
+            results.sort(value)
+            return results
+        return sorted(results, key=value)
     
+    def __metadata(self, results=None):
+        # Result conditions and statistics; a ResultStore serves these without reading signals
+        results = self.results if results is None else results
+        if isinstance(results, ResultStore):
+            return [results.metadata(index) for index in range(len(results))]
+        return results
+
+    def __varying_parameters(self, results=None):
+        # Model parameters that differ between the stored results (the swept ones)
+        metadata = self.__metadata(results)
+        first = metadata[0]['modelParameters']
+        return [
+            key for key, value in first.items()
+            if any(not np.array_equal(result['modelParameters'][key], value) for result in metadata[1:])
+        ]
+
+    def __read_only(self, value):
+        view = np.asarray(value).view()
+        view.flags.writeable = False
+        return view
+
+    def __sort_value(self, value):
+        if isinstance(value, str):
+            return value
+        # arrays (e.g. lightStimulus) sort by their mean
+        return float(np.mean(value))
+
     def __truncate_params(self,exclude=None):
         for key, value in self.param.items():
             new_value = np.atleast_1d(value)
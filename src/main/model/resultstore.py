@@ -0,0 +1,257 @@
+import mmap
+import zlib
+import tempfile
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+import numpy as np
+
+PRECISIONS = ('float64', 'float32')
+COMPRESSIONS = ('none', 'lossless', 'bounded')
+
+def result_bytes(results):
+    # Memory held by a result set, a ResultStore or a list of result dicts. Signals
+    # mapped from a file (a spilled store, an opened session) take no memory of
+    # their own, views of one array count it once.
+    if isinstance(results, ResultStore):
+        return results.resident_bytes()
+    owners = {}
+    for result in results:
+        for value in result.values():
+            if isinstance(value, np.ndarray):
+                owner = memory_owner(value)
+                if owner is not None:
+                    owners[id(owner)] = owner
+    return sum(owner.nbytes if isinstance(owner, np.ndarray) else len(owner) for owner in owners.values())
+
+def memory_owner(array):
+    # The object holding an array's data in memory, None when it is mapped from a file
+    base = array
+    while isinstance(base, np.ndarray) and base.base is not None:
+        base = base.base
+    if isinstance(base, memoryview):
+        base = base.obj
+    return base if isinstance(base, (np.ndarray, bytes, bytearray)) else None
+
+class StoredResult(Mapping):
+    """Read-only view of a stored result; signals are resolved on access."""
+
+    def __init__(self, store, meta, signals):
+        self._store = store
+        self._meta = meta
+        self._signals = signals
+
+    def __getitem__(self, key):
+        if key in self._signals:
+            return self._store._read(self._signals[key])
+        if key in self._store.derived and self._store.derived[key][0] in self._signals:
+            source, factor = self._store.derived[key]
+            value = self._store._read(self._signals[source])
+            return self._store._read_only((value * factor(self._meta)).astype(value.dtype, copy=False))
+        return self._meta[key]
+
+    def __iter__(self):
+        yield from self._meta
+        yield from self._signals
+        yield from (key for key, (source, _) in self._store.derived.items() if source in self._signals)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+class ResultStore(Sequence):
+    """Simulation results kept in memory up to a byte budget, then spilled to disk.
+
+    Each result is split into per-sample signals (1-D arrays) and metadata
+    (conditions, labels, solver statistics, model parameters). Metadata always
+    stays in memory. Once the in-memory signals would exceed ``spill_bytes``,
+    signals of further results are appended to an anonymous temporary file and
+    read back as read-only views of a memory map, so slices, plots and exports
+    only page in what they touch. ``spill_bytes=None`` keeps everything in memory.
+
+    Storage can be made more compact:
+
+    - ``precision='float32'`` stores floating point signals (other than shared
+      ones such as time) in single precision;
+    - ``derived`` maps a signal to ``(source, factor)``, it is not stored but
+      computed as ``source * factor(metadata)`` when read;
+    - ``shared`` signals equal to the previous result's are stored once;
+    - ``compression`` applies to in-memory signals: ``'lossless'`` (byte
+      shuffled zlib) or ``'bounded'`` (quantized to ``tolerance`` times the
+      signal's range, then zlib; shared signals are kept lossless). Compressed
+      signals are decoded on access and the most recently used ones are
+      cached up to ``cache_bytes``.
+
+    Items are ``StoredResult`` mappings. The file is removed by the OS once the
+    store and every view of it are released.
+    """
+
+    def __init__(self, spill_bytes=None, directory=None, precision='float64', compression='none',
+                 derived=None, shared=('time',), tolerance=1e-6, cache_bytes=64 * 2**20):
+        if precision not in PRECISIONS:
+            raise ValueError(f"Invalid precision: {precision}")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Invalid compression: {compression}")
+        self.spill_bytes = spill_bytes
+        self.directory = directory
+        self.precision = precision
+        self.compression = compression
+        self.derived = dict(derived or {})
+        self.shared = tuple(shared)
+        self.tolerance = tolerance
+        self.cache_bytes = cache_bytes
+        self.memory_bytes = 0
+        self.disk_bytes = 0
+        self._entries = []  # (metadata, {signal: stored signal})
+        self._last_shared = {}  # signal -> (array, stored signal)
+        self._cache = OrderedDict()
+        self._cached_bytes = 0
+        self._file = None
+        self._map = None
+        self._lock = threading.Lock()
+
+    def append(self, result):
+        meta = {key: value for key, value in result.items() if not self._is_signal(value)}
+        signals = {
+            key: value for key, value in result.items()
+            if self._is_signal(value) and key not in self.derived
+        }
+        with self._lock:
+            stored = {}
+            for key, value in signals.items():
+                if key in self.shared and key in self._last_shared:
+                    last, location = self._last_shared[key]
+                    if last is value or np.array_equal(last, value):
+                        stored[key] = location
+                        continue
+                stored[key] = None
+            # Signals are kept in memory while the result fits the budget
+            values = {key: self._convert(key, signals[key]) for key, location in stored.items() if location is None}
+            encoded = {key: self._encode(key, value) for key, value in values.items()}
+            nbytes = sum(self._nbytes(location) for location in encoded.values())
+            if self.spill_bytes is None or self.memory_bytes + nbytes <= self.spill_bytes:
+                self.memory_bytes += nbytes
+            else:
+                encoded = {key: self._write(value) for key, value in values.items()}
+            stored.update(encoded)
+            for key in self.shared:
+                if key in encoded:
+                    self._last_shared[key] = (signals[key], encoded[key])
+            self._entries.append((meta, stored))
+
+    def extend(self, results):
+        for result in results:
+            self.append(result)
+
+    def sort(self, key, reverse=False):
+        # Reorders the index only, stored signals are not moved
+        order = sorted(range(len(self)), key=lambda index: key(self[index]), reverse=reverse)
+        self._entries = [self._entries[index] for index in order]
+
+    def metadata(self, index):
+        # Conditions and statistics without touching the signals
+        return self._entries[index][0]
+
+    def resident_bytes(self):
+        # In-memory signals and decoded ones in the cache; spilled signals only use disk
+        return self.memory_bytes + self._cached_bytes
+
+    def is_spilled(self, index):
+        return any(location[0] == 'disk' for location in self._entries[index][1].values() if isinstance(location, tuple))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        meta, signals = self._entries[index]
+        return StoredResult(self, meta, signals)
+
+    def _is_signal(self, value):
+        return isinstance(value, np.ndarray) and value.ndim == 1
+
+    def _convert(self, key, value):
+        if self.precision == 'float32' and key not in self.shared and value.dtype.kind == 'f':
+            return value.astype(np.float32)
+        return value
+
+    def _nbytes(self, location):
+        if isinstance(location, np.ndarray):
+            return location.nbytes
+        return len(location[1])
+
+    def _encode(self, key, value):
+        # In memory: the array itself or ('zip', payload, dtype, length, offset, step)
+        if self.compression == 'none' or value.dtype.kind != 'f' or len(value) == 0:
+            return value
+        finite = bool(np.isfinite(value).all())
+        # Shared signals (the time grid) are kept exact, as with float32
+        if self.compression == 'bounded' and finite and key not in self.shared:
+            offset = float(value[0])
+            step = self.tolerance * float(np.ptp(value)) or 1.0
+            codes = np.round((value - offset) / step).astype(np.int64)
+            deltas = np.diff(codes, prepend=np.int64(0))
+            if np.abs(deltas).max() < 2**31:
+                payload = zlib.compress(self._shuffle(deltas.astype(np.int32)), 1)
+                return ('zip', payload, value.dtype.str, len(value), offset, step)
+        return ('zip', zlib.compress(self._shuffle(value), 1), value.dtype.str, len(value), None, None)
+
+    def _shuffle(self, value):
+        # Group the n-th bytes of every element, slowly varying signals then compress well
+        return np.ascontiguousarray(value).view(np.uint8).reshape(-1, value.itemsize).T.tobytes()
+
+    def _decode(self, location):
+        _, payload, dtype, length, offset, step = location
+        if step is None:
+            itemsize = np.dtype(dtype).itemsize
+            data = np.frombuffer(zlib.decompress(payload), np.uint8).reshape(itemsize, length).T.copy()
+            return data.view(dtype).ravel()
+        data = np.frombuffer(zlib.decompress(payload), np.uint8).reshape(4, length).T.copy()
+        codes = np.cumsum(data.view(np.int32).ravel(), dtype=np.int64)
+        return (codes * step + offset).astype(dtype)
+
+    def _write(self, value):
+        # Append-only: every signal goes to the end of the file
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(dir=self.directory, prefix="results-")
+        value = np.ascontiguousarray(value)
+        location = ('disk', self.disk_bytes, value.dtype.str, len(value))
+        self._file.write(value.tobytes())
+        self.disk_bytes += value.nbytes
+        return location
+
+    def _read(self, location):
+        if isinstance(location, np.ndarray):
+            return location
+        if location[0] == 'zip':
+            return self._read_compressed(location)
+        _, offset, dtype, length = location
+        if length == 0:
+            return np.empty(0, dtype=dtype)
+        with self._lock:
+            if self._map is None or len(self._map) < offset + length * np.dtype(dtype).itemsize:
+                # The file grew since it was mapped; views of the old map stay valid
+                self._file.flush()
+                self._map = mmap.mmap(self._file.fileno(), self.disk_bytes, access=mmap.ACCESS_READ)
+            buffer = self._map
+        return np.frombuffer(buffer, dtype=dtype, count=length, offset=offset)
+
+    def _read_compressed(self, location):
+        key = id(location)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key][1]
+        value = self._read_only(self._decode(location))
+        with self._lock:
+            # The location is kept with the value so its id stays unique while cached
+            self._cache[key] = (location, value)
+            self._cached_bytes += value.nbytes
+            while self._cached_bytes > self.cache_bytes and len(self._cache) > 1:
+                _, (_, evicted) = self._cache.popitem(last=False)
+                self._cached_bytes -= evicted.nbytes
+        return value
+
+    def _read_only(self, value):
+        value.flags.writeable = False
+        return value
@@ -0,0 +1,167 @@
+import os
+import json
+import mmap
+import struct
+import zipfile
+import weakref
+import numpy as np
+
+from src.main.utils import NumpyEncoder
+
+SESSION_VERSION = 1
+SESSION_FILTER = "PhototransductSim Session (*.ptsim)"
+MANIFEST = "session.json"
+LENGTHS = "lengths.npy"
+
+# Rows of a signal written per chunk (bounded memory for large sweeps)
+CHUNK_ROWS = 256
+
+# Session files mapped by load_session, while any of their signals is in use
+_mapped = weakref.WeakValueDictionary()  # real path -> mmap
+
+class SessionError(Exception):
+    """Raised when a session file cannot be read."""
+    pass
+
+def signal_keys(results):
+    # Per-sample arrays are stored as signals, everything else goes in the manifest
+    return [key for key, value in results[0].items() if isinstance(value, np.ndarray) and value.ndim == 1]
+
+def save_session(file_name, results, parameters, settings=None, compress=False, progress=None):
+    """Write parameters, settings and results to a session file.
+
+    The file is a zip archive holding a JSON manifest and one ``.npy`` member
+    per signal, shaped (conditions, samples) and padded with NaN. Members are
+    stored uncompressed unless ``compress`` is set, so ``load_session`` can
+    map them straight from disk. Signals mapped from ``file_name`` itself
+    (saving over the open session) are copied into memory first, see ``detach``.
+    """
+    results = results or []
+    detach(results, file_name)
+    keys = signal_keys(results) if results else []
+    lengths = np.array([[len(result[key]) for result in results] for key in keys], dtype=np.int64).reshape(len(keys), len(results))
+    manifest = {
+        'version': SESSION_VERSION,
+        'parameters': parameters,
+        'settings': settings or {},
+        'signals': keys,
+        'results': [
+            {
+                **{key: value for key, value in result.items() if key not in keys and key != 'modelParameters'},
+                'modelParameters': result.get('modelParameters', {})
+            }
+            for result in results
+        ]
+    }
+    compression = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    tmp_name = f"{file_name}.{os.getpid()}.tmp"
+    try:
+        with zipfile.ZipFile(tmp_name, 'w', compression=compression, allowZip64=True) as archive:
+            archive.writestr(MANIFEST, json.dumps(manifest, cls=NumpyEncoder))
+            with archive.open(LENGTHS, 'w') as file:
+                np.lib.format.write_array(file, lengths, allow_pickle=False)
+            for index, key in enumerate(keys):
+                write_signal(archive, key, results, int(lengths[index].max(initial=0)))
+                if progress is not None:
+                    progress((index + 1) / len(keys))
+        os.replace(tmp_name, file_name)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+        raise
+    return file_name
+
+def detach(results, file_name):
+    """Copy the signals of ``results`` that are mapped from ``file_name`` into memory.
+
+    The result dicts are updated in place, so every holder of the list sees the
+    copies. A file that is still mapped cannot be replaced on Windows, so this
+    runs before saving over the session the results were loaded from; views of
+    the old signals held elsewhere (e.g. plotted lines) must be dropped too.
+    Returns the number of signals copied.
+    """
+    buffer = _mapped.get(os.path.realpath(file_name))
+    if buffer is None:
+        return 0
+    copied = 0
+    for result in results:
+        if not isinstance(result, dict):
+            continue
+        for key, value in list(result.items()):
+            if isinstance(value, np.ndarray) and mapped_from(value, buffer):
+                value = np.array(value)
+                value.flags.writeable = False
+                result[key] = value
+                copied += 1
+    return copied
+
+def mapped_from(array, buffer):
+    base = array
+    while isinstance(base, np.ndarray):
+        base = base.base
+    return base is buffer or (isinstance(base, memoryview) and base.obj is buffer)
+
+def write_signal(archive, key, results, samples):
+    dtype = np.result_type(*(result[key].dtype for result in results))
+    header = {'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': False, 'shape': (len(results), samples)}
+    with archive.open(f"signals/{key}.npy", 'w', force_zip64=True) as file:
+        np.lib.format.write_array_header_2_0(file, header)
+        for start in range(0, len(results), CHUNK_ROWS):
+            chunk = results[start:start + CHUNK_ROWS]
+            block = np.full((len(chunk), samples), np.nan, dtype=dtype)
+            for row, result in enumerate(chunk):
+                block[row, :len(result[key])] = result[key]
+            file.write(block.tobytes())
+
+def load_session(file_name):
+    """Read a session file written by ``save_session``.
+
+    Returns ``(manifest, results)``. Signals stored uncompressed are read-only
+    views of a memory map of the file, so only the pages of the signals that are
+    used get read; compressed members are loaded into memory.
+    """
+    with open(file_name, 'rb') as file:
+        # An empty file cannot be mapped
+        if os.fstat(file.fileno()).st_size == 0:
+            raise SessionError(f"{file_name} is empty.")
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    _mapped[os.path.realpath(file_name)] = buffer
+    try:
+        archive = zipfile.ZipFile(file_name)
+    except zipfile.BadZipFile as e:
+        raise SessionError(f"{file_name} is not a session file: {e}")
+    with archive:
+        try:
+            manifest = json.loads(archive.read(MANIFEST))
+        except KeyError:
+            raise SessionError(f"{file_name} has no session manifest.")
+        if manifest.get('version', 0) > SESSION_VERSION:
+            raise SessionError(f"{file_name} was written by a newer version (session format {manifest['version']}).")
+        lengths = read_member(archive, buffer, LENGTHS)
+        signals = {key: read_member(archive, buffer, f"signals/{key}.npy") for key in manifest['signals']}
+    results = []
+    for row, entry in enumerate(manifest['results']):
+        result = {key: value for key, value in entry.items() if key != 'modelParameters'}
+        result['modelParameters'] = {key: np.asarray(value) for key, value in entry['modelParameters'].items()}
+        for index, (key, signal) in enumerate(signals.items()):
+            result[key] = signal[row, :lengths[index, row]]
+        results.append(result)
+    return manifest, results
+
+def read_member(archive, buffer, name):
+    info = archive.getinfo(name)
+    with archive.open(info) as file:
+        version = np.lib.format.read_magic(file)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(file)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(file)
+        header_size = file.tell()
+        if info.compress_type != zipfile.ZIP_STORED:
+            return np.lib.format.read_array(archive.open(info), allow_pickle=False)
+    # Stored members are contiguous in the file, past the local header
+    name_size, extra_size = struct.unpack('<HH', buffer[info.header_offset + 26:info.header_offset + 30])
+    offset = info.header_offset + 30 + name_size + extra_size + header_size
+    count = int(np.prod(shape))
+    array = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+    return array.reshape(shape, order='F' if fortran_order else 'C')
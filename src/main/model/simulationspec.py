@@ -0,0 +1,57 @@
+from dataclasses import dataclass, field
+from types import MappingProxyType
+import numpy as np
+
+from src.main.utils import Metrics
+
+def frozen_array(value):
+    array = np.array(value)
+    array.setflags(write=False)
+    return array
+
+@dataclass(frozen=True)
+class SimulationSpec:
+    """Everything one simulation run reads, captured when the run starts.
+
+    Arrays are read-only copies and ``parameters`` is a read-only mapping, so
+    workers integrating from a spec are unaffected by later edits to the model.
+    ``metrics`` is the one mutable member: each run records its timings there
+    rather than in the model's, so several runs can use the same model at
+    once. Build one with ``Phototransduction.spec()``.
+    """
+    dt: float
+    stimulusOffset: float
+    responseDuration: float
+    stimulusIntensities: np.ndarray
+    stimulusDurations: np.ndarray
+    pigmentActivations: np.ndarray
+    parameters: MappingProxyType
+    maxStep: float = np.inf
+    rtol: float = 1e-6
+    atol: float = 1e-8
+    maxAttempts: int = 20
+    stepLimit: int = None  # per condition, None is unlimited
+    timeLimit: float = None  # seconds per condition, None is unlimited
+    spillBytes: int = None  # signals beyond this many bytes go to disk, None keeps all in memory
+    resultPrecision: str = 'float64'
+    resultCompression: str = 'none'
+    metrics: Metrics = field(default=None, repr=False, compare=False)  # the run's own timings, new by default
+    time: np.ndarray = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.metrics is None:
+            object.__setattr__(self, 'metrics', Metrics())
+        for name in ('stimulusIntensities', 'stimulusDurations', 'pigmentActivations'):
+            object.__setattr__(self, name, frozen_array(getattr(self, name)))
+        parameters = {key: frozen_array(value) for key, value in self.parameters.items()}
+        object.__setattr__(self, 'parameters', MappingProxyType(parameters))
+        time = np.arange(-self.stimulusOffset, self.responseDuration - self.stimulusOffset, self.dt)
+        object.__setattr__(self, 'time', frozen_array(time))
+
+    def is_sweep(self):
+        # A parameter with several values makes the run a parameter sweep
+        return any(value.size > 1 for value in self.parameters.values())
+
+    def parameter_set(self):
+        # Writable copy for a single condition
+        return {key: np.copy(value) for key, value in self.parameters.items()}
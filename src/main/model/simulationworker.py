@@ -1,19 +1,24 @@
 from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import numpy as np
+from src.main.model.workerpool import INTERACTIVE, BACKGROUND
 
 class SimulationWorker(QObject):
     finished = pyqtSignal()
+    cancelled = pyqtSignal()
     error = pyqtSignal(str)
-    result = pyqtSignal(object)
+    result = pyqtSignal(object, object)  # plot data, the run's results
     progress = pyqtSignal(int)  # Progress signal
+    eta = pyqtSignal(float)  # Estimated seconds left
 
-    def __init__(self, model, selections):
+    def __init__(self, model, selections, pool=None, spec=None):
         super().__init__()
         self.model = model
+        self.spec = spec  # SimulationSpec to run, captured from the model at start when None
+        self.priority = None  # workerpool priority, sweeps run as BACKGROUND when None
+        self.pool = pool  # shared WorkerPool, a temporary executor is used without one
         self._selections = selections
         self._is_running = True
         self._sort_key = 'stimulusIntensity'
+        self._percent = -1
 
     @property
     def selections(self):
@@ -42,85 +47,44 @@ class SimulationWorker(QObject):
     def run(self):
         try:
             self._is_running = True
-            results = []
-
-            # Determine Stimulus Times
-            stimulusTimes = [(np.float64(0), d) for d in self.model.stimulusDurations]
-            params = self.model.getParameters()['modelParameters']
-            
-            # Identify parameter sweeps
-            sweep_param = {
-                k: v for k, v in params.items() if np.ndim(v) > 0 and len(v) > 1
-            }
-            sweep_key = list(sweep_param.keys())
-            nSweepKeys = len(sweep_key)
-            nSweep = 0
-            if nSweepKeys:
-                sweep_key = sweep_key.pop()
-                nSweep = len(sweep_param[sweep_key])
-
-            # Run simulations
-            total = len(self.model.stimulusIntensities) * max(1, nSweep)
-            futures = []
-
-            with ThreadPoolExecutor() as executor:
-                # Loop through stimuli
-                for intensity, time, activation in zip(self.model.stimulusIntensities, stimulusTimes, self.model.pigmentActivations):
-                    # Loop through parameter sweep
-                    if nSweep:
-                        for i in range(nSweep):
-                            param_set = {
-                                key: np.copy(value) for key, value in params.items()
-                            }  # copy the parameters
-                            param_set[sweep_key] = np.asarray(sweep_param[sweep_key][i])
-                            label = f"{activation} (R*); {param_set[sweep_key]} ({sweep_key})"
-                            futures.append(
-                                (
-                                    executor.submit(
-                                        self.model.simulate_once,
-                                        intensity,
-                                        time,
-                                        activation,
-                                        param_set
-                                    ),
-                                    label
-                                )
-                            )
-                    else:
-                        label = f"{activation} (R*)"
-                        futures.append(
-                            (
-                                executor.submit(
-                                    self.model.simulate_once,
-                                    intensity,
-                                    time,
-                                    activation,
-                                    params
-                                ),
-                                label
-                            )
-                        )
-
-                completed = 0
-                for future in as_completed([fut for fut, _ in futures]):
-                    if not self._is_running:
-                        executor.shutdown(wait=False, cancel_futures=True)
-                        raise RuntimeError("Simulation was stopped.")
-                    label = next(label for fut, label in futures if fut == future)
-                    result = future.result()
-                    result['label'] = label
-                    results.append(result)
-                    completed += 1
-                    progress = int((completed / total) * 100)
-                    self.progress.emit(progress)
-
-            self.model._results = sorted(results, key=lambda x: x[self.sort_key])
-            if self._is_running:
-                final_results = self.model.getResult(self.selections['x'], self.selections['y'])
-                self.result.emit(final_results)
+            self._percent = -1
+            if self.spec is None:
+                self.spec = self.model.spec()
+            # The results go to this run's own store, the model is only updated by whoever receives them
+            results = self.model.run(
+                self.spec,
+                self.pool,
+                should_stop=lambda: not self._is_running,
+                progress=self.report,
+                priority=self.run_priority(),
+                sortKey=self.sort_key
+            )
+            if results is None or not self._is_running:
+                # Stopped runs leave the model's results untouched
+                self.cancelled.emit()
+                return
+            with self.spec.metrics.stage('getResult'):
+                signals = [self.selections['y']] + self.selections.get('panels', [])
+                final_results = self.model.getResults(self.selections['x'], signals, copy=False, results=results)
+            self.result.emit(final_results, results)
             self.finished.emit()
         except Exception as e:
             self.error.emit(str(e))
 
+    def report(self, completed, total, eta):
+        # Throttled by the job runner; only percent changes are signalled
+        percent = int((completed / total) * 100)
+        if percent != self._percent:
+            self._percent = percent
+            self.progress.emit(percent)
+        if eta is not None and completed < total:
+            self.eta.emit(eta)
+
+    def run_priority(self):
+        # Sweeps yield to single-family previews sharing the pool
+        if self.priority is not None:
+            return self.priority
+        return BACKGROUND if self.spec.is_sweep() else INTERACTIVE
+
     def stop(self):
         self._is_running = False
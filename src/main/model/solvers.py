@@ -0,0 +1,54 @@
+from time import perf_counter
+from scipy.integrate import RK45
+
+class SolveBudget:
+    """Step and wall-time limits for one condition, shared by all its solve attempts.
+
+    Limits of None (or 0) are unlimited. The clock starts when the budget is
+    created. Once a limit is hit ``outcome`` is ``'stepLimit'`` or
+    ``'timedOut'`` and ``message`` describes it; it stays exhausted.
+    """
+    def __init__(self, maxSteps=None, maxSeconds=None):
+        self.maxSteps = maxSteps or None
+        self.maxSeconds = maxSeconds or None
+        self.deadline = perf_counter() + maxSeconds if maxSeconds else None
+        self.steps = 0
+        self.outcome = None
+        self.message = None
+
+    def exhausted(self):
+        if self.outcome is None:
+            if self.maxSteps is not None and self.steps >= self.maxSteps:
+                self.outcome = 'stepLimit'
+                self.message = f"Step limit of {self.maxSteps} steps reached."
+            elif self.deadline is not None and perf_counter() >= self.deadline:
+                self.outcome = 'timedOut'
+                self.message = f"Time limit of {self.maxSeconds:g} s reached."
+        return self.outcome is not None
+
+class CountingRK45(RK45):
+    """RK45 solver that tallies accepted and rejected steps into ``stepCounts``.
+
+    With a ``budget`` (SolveBudget), every step first checks the budget and
+    the integration fails with the budget's message once it is exhausted.
+    """
+    def __init__(self, *args, stepCounts=None, budget=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stepCounts = stepCounts if stepCounts is not None else {'accepted': 0, 'rejected': 0}
+        self.budget = budget
+
+    def _step_impl(self):
+        if self.budget is not None and self.budget.exhausted():
+            return False, self.budget.message
+        nfev = self.nfev
+        success, message = super()._step_impl()
+        # Every attempt (accepted or not) costs exactly n_stages RHS evaluations
+        attempts = (self.nfev - nfev) // self.n_stages
+        if success:
+            self.stepCounts['accepted'] += 1
+            self.stepCounts['rejected'] += max(attempts - 1, 0)
+        else:
+            self.stepCounts['rejected'] += attempts
+        if self.budget is not None:
+            self.budget.steps += attempts
+        return success, message
@@ -0,0 +1,102 @@
+import heapq
+import itertools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Lower values run first
+INTERACTIVE = 0
+BACKGROUND = 10
+
+def warm_up():
+    # Load what the first solve would otherwise import (SciPy is heavy to import)
+    import scipy.integrate
+    import scipy.optimize
+    from src.main.model import solvers
+    return True
+
+class WorkerPool:
+    """Long-lived executor shared by every simulation run.
+
+    Threads are created once and reused, so a small interactive run only pays
+    for queueing its conditions. ``warm()`` starts the threads and loads the
+    solver modules in the background, ahead of the first run. ``resize()``
+    swaps in a new executor when the configured size changes; tasks already
+    running on the old one finish there.
+
+    Tasks wait in a priority queue: whenever a thread frees up it takes the
+    most urgent one, so ``INTERACTIVE`` work goes ahead of queued
+    ``BACKGROUND`` sweep chunks. Long background tasks can call
+    ``yield_to(priority)`` between steps to run more urgent tasks inline.
+    """
+
+    def __init__(self, workers=None):
+        self._lock = threading.Lock()
+        self._workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="simulation")
+        self._queue = []  # (priority, sequence, future, fn, args, kwargs)
+        self._sequence = itertools.count()
+
+    @property
+    def workers(self):
+        return self._executor._max_workers
+
+    def submit(self, fn, *args, **kwargs):
+        return self.schedule(INTERACTIVE, fn, *args, **kwargs)
+
+    def schedule(self, priority, fn, *args, **kwargs):
+        future = Future()
+        with self._lock:
+            heapq.heappush(self._queue, (priority, next(self._sequence), future, fn, args, kwargs))
+            # One dispatch per task; each runs whichever task is most urgent by then
+            self._executor.submit(self._dispatch)
+        return future
+
+    def yield_to(self, priority):
+        # Run queued tasks more urgent than priority on the calling thread
+        while True:
+            with self._lock:
+                if not self._queue or self._queue[0][0] >= priority:
+                    return
+                # Taking a task here leaves one queued dispatch with nothing to run
+                task = heapq.heappop(self._queue)
+            self._run(task)
+
+    def _dispatch(self):
+        with self._lock:
+            if not self._queue:
+                return
+            task = heapq.heappop(self._queue)
+        self._run(task)
+
+    @staticmethod
+    def _run(task):
+        _, _, future, fn, args, kwargs = task
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+
+    def resize(self, workers):
+        with self._lock:
+            if workers == self._workers:
+                return
+            old = self._executor
+            self._workers = workers
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="simulation")
+        old.shutdown(wait=False)
+
+    def warm(self):
+        # One task per worker so every thread is started
+        return [self.submit(warm_up) for _ in range(self.workers)]
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        with self._lock:
+            if cancel_futures:
+                for task in self._queue:
+                    task[2].cancel()
+                self._queue.clear()
+            self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
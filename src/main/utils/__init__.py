@@ -2,6 +2,12 @@ from .camel_to_title import camel_to_title
 from .num_to_str import num_to_str
 from .safe_eval import safe_eval
 from .statebuffer import StateBuffer
+from .snapshot import Snapshot, share_parameters
 from .numpyencoder import NumpyEncoder
+from .metrics import Metrics
+from .texcache import TexCache
+from .decimate import TracePyramid
+from .pointindex import PointIndex
+from .write_csv import write_csv
 
-__all__ = ['camel_to_title', 'num_to_str', 'safe_eval', 'StateBuffer', 'NumpyEncoder']
\ No newline at end of file
+__all__ = ['camel_to_title', 'num_to_str', 'safe_eval', 'StateBuffer', 'Snapshot', 'share_parameters', 'NumpyEncoder', 'Metrics', 'TexCache', 'TracePyramid', 'PointIndex', 'write_csv']
\ No newline at end of file
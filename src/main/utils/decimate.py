@@ -0,0 +1,92 @@
+import numpy as np
+
+class TracePyramid:
+    """Multi-resolution min/max decimation of a single trace.
+
+    Each level keeps the indices of the minimum and maximum sample in
+    consecutive buckets of the level's size, so peaks survive exactly at every
+    resolution. ``query`` picks the coarsest level that still has at least one
+    bucket (two samples) per pixel for the visible x-range, merges its buckets
+    further to at most two per pixel, and returns only those samples.
+    """
+    # Traces shorter than this are always served at full resolution
+    MIN_POINTS = 4096
+
+    def __init__(self, x, y, factor=4, monotonic=None):
+        self.x = np.asarray(x)
+        self.y = np.asarray(y)
+        self.factor = factor
+        self.levels = []  # [(bucket size, min indices, max indices)]
+        n = len(self.y)
+        if n <= self.MIN_POINTS:
+            self.monotonic = True
+            return
+        # Bucketing by index only maps to x-ranges when x is sorted (e.g. time);
+        # callers that already checked this x pass it in
+        self.monotonic = bool(np.all(np.diff(self.x) >= 0)) if monotonic is None else monotonic
+        indices = np.arange(n)
+        imin, imax, size = indices, indices, 1
+        while 2 * len(imin) > self.MIN_POINTS // 4:
+            imin, imax = self._reduce(imin, imax)
+            size *= factor
+            self.levels.append((size, imin, imax))
+
+    def __len__(self):
+        return len(self.y)
+
+    def _reduce(self, imin, imax, factor=None):
+        factor = factor or self.factor
+        pad = (-len(imin)) % factor
+        if pad:
+            imin = np.concatenate((imin, np.repeat(imin[-1], pad)))
+            imax = np.concatenate((imax, np.repeat(imax[-1], pad)))
+        groupMin = imin.reshape(-1, factor)
+        groupMax = imax.reshape(-1, factor)
+        rows = np.arange(len(groupMin))
+        return (
+            groupMin[rows, np.argmin(self.y[groupMin], axis=1)],
+            groupMax[rows, np.argmax(self.y[groupMax], axis=1)]
+        )
+
+    def overview(self):
+        # The coarsest level over the whole trace: cheap, and it keeps every extremum
+        if not self.levels:
+            return self.x, self.y
+        _, imin, imax = self.levels[-1]
+        idx = self._merge(imin, imax, 0, len(self.y))
+        return self.x[idx], self.y[idx]
+
+    def _merge(self, imin, imax, start, stop):
+        # Both index sets are in order already, a sort and a neighbour check drop duplicates
+        idx = np.sort(np.concatenate((imin, imax, [start, stop - 1])))
+        keep = np.empty(len(idx), dtype=bool)
+        keep[0] = True
+        np.not_equal(idx[1:], idx[:-1], out=keep[1:])
+        return idx[keep & (idx >= start) & (idx < stop)]
+
+    def query(self, xmin=None, xmax=None, pixels=1000):
+        n = len(self.y)
+        if not self.levels:
+            return self.x, self.y
+        start, stop = 0, n
+        if self.monotonic and xmin is not None and xmax is not None:
+            # Keep one sample beyond each edge so lines run off the axes
+            start = max(int(np.searchsorted(self.x, xmin, side='left')) - 1, 0)
+            stop = min(int(np.searchsorted(self.x, xmax, side='right')) + 1, n)
+        visible = stop - start
+        pixels = max(int(pixels), 1)
+        level = None
+        for size, imin, imax in self.levels:
+            if visible / size >= pixels:
+                level = (size, imin, imax)
+        if level is None:
+            return self.x[start:stop], self.y[start:stop]
+        size, imin, imax = level
+        first, last = start // size, -(-stop // size)
+        imin, imax = imin[first:last], imax[first:last]
+        # Levels are a factor apart, merge buckets so no more than two remain per pixel
+        group = int(visible / size // pixels)
+        if group > 1:
+            imin, imax = self._reduce(imin, imax, group)
+        idx = self._merge(imin, imax, start, stop)
+        return self.x[idx], self.y[idx]
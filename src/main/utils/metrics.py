@@ -0,0 +1,138 @@
+import os
+import json
+import time
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+class Metrics:
+    """Thread-safe registry of stage timings and counters.
+
+    Timings use the monotonic ``time.perf_counter_ns`` clock and are recorded
+    per stage, per condition (e.g. the sweep label) and per thread so they can
+    be summarized or exported as a Chrome trace (chrome://tracing, Perfetto).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._origin = time.perf_counter_ns()
+            self._events = []  # (stage, condition, thread_id, start_ns, end_ns)
+            self._counters = defaultdict(int)  # (name, condition) -> value
+            self._pending = {}  # (stage, condition) -> start_ns
+
+    @contextmanager
+    def stage(self, name, condition=None):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter_ns(), condition)
+
+    def record(self, name, start_ns, end_ns, condition=None):
+        with self._lock:
+            self._events.append((name, condition, threading.get_ident(), start_ns, end_ns))
+
+    def begin(self, name, condition=None):
+        # For stages that start and end on different threads, e.g. queue wait
+        with self._lock:
+            self._pending[(name, condition)] = time.perf_counter_ns()
+
+    def end(self, name, condition=None):
+        end = time.perf_counter_ns()
+        with self._lock:
+            start = self._pending.pop((name, condition), None)
+            if start is not None:
+                self._events.append((name, condition, threading.get_ident(), start, end))
+
+    def count(self, name, value=1, condition=None):
+        with self._lock:
+            self._counters[(name, condition)] += value
+
+    def summary(self):
+        with self._lock:
+            events = list(self._events)
+            counters = dict(self._counters)
+        stages = {}
+        for name, _, _, start, end in events:
+            stats = stages.setdefault(name, {'count': 0, 'total': 0.0, 'max': 0.0})
+            duration = (end - start) * 1e-9
+            stats['count'] += 1
+            stats['total'] += duration
+            stats['max'] = max(stats['max'], duration)
+        for stats in stages.values():
+            stats['mean'] = stats['total'] / stats['count']
+        totals = defaultdict(int)
+        for (name, _), value in counters.items():
+            totals[name] += value
+        wall = (max(e[4] for e in events) - min(e[3] for e in events)) * 1e-9 if events else 0.0
+        return {'wall': wall, 'stages': stages, 'counters': dict(totals)}
+
+    def conditions(self):
+        with self._lock:
+            events = list(self._events)
+            counters = dict(self._counters)
+        per_condition = {}
+        for name, condition, _, start, end in events:
+            if condition is None:
+                continue
+            stages = per_condition.setdefault(condition, {'stages': defaultdict(float), 'counters': defaultdict(int)})['stages']
+            stages[name] += (end - start) * 1e-9
+        for (name, condition), value in counters.items():
+            if condition is None:
+                continue
+            per_condition.setdefault(condition, {'stages': defaultdict(float), 'counters': defaultdict(int)})['counters'][name] += value
+        return {
+            condition: {'stages': dict(values['stages']), 'counters': dict(values['counters'])}
+            for condition, values in per_condition.items()
+        }
+
+    def tooltip(self):
+        summary = self.summary()
+        if not summary['stages']:
+            return ""
+        lines = [f"Wall time: {summary['wall'] * 1e3:.1f} ms"]
+        for name, stats in sorted(summary['stages'].items(), key=lambda item: -item[1]['total']):
+            lines.append(f"{name}: {stats['total'] * 1e3:.1f} ms total, {stats['mean'] * 1e3:.2f} ms mean (n={stats['count']})")
+        for name, value in sorted(summary['counters'].items()):
+            lines.append(f"{name}: {value}")
+        return "\n".join(lines)
+
+    def to_chrome_trace(self):
+        with self._lock:
+            events = list(self._events)
+            counters = dict(self._counters)
+            origin = self._origin
+        pid = os.getpid()
+        per_condition = defaultdict(dict)
+        for (counter, condition), value in counters.items():
+            per_condition[condition][counter] = value
+        # Chrome trace viewers like small thread ids, keep them in order of first appearance
+        thread_ids = {}
+        trace_events = []
+        for name, condition, thread_id, start, end in sorted(events, key=lambda e: e[3]):
+            tid = thread_ids.setdefault(thread_id, len(thread_ids))
+            event = {
+                'name': name,
+                'cat': 'simulation',
+                'ph': 'X',
+                'ts': (start - origin) / 1e3,
+                'dur': (end - start) / 1e3,
+                'pid': pid,
+                'tid': tid
+            }
+            if condition is not None:
+                event['args'] = {'condition': condition, **per_condition.get(condition, {})}
+            trace_events.append(event)
+        for thread_id, tid in thread_ids.items():
+            trace_events.append({
+                'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                'args': {'name': 'main' if thread_id == threading.main_thread().ident else f'worker {tid}'}
+            })
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+    def export_chrome_trace(self, file_path):
+        with open(file_path, 'w') as file:
+            json.dump(self.to_chrome_trace(), file)
@@ -0,0 +1,102 @@
+import numpy as np
+
+class PointIndex:
+    """KD-tree over the points of many traces for nearest-trace lookups.
+
+    ``traces`` is a sequence of (N, 2) arrays or (x, y) pairs of 1-D arrays.
+    Non-finite points are skipped. ``nearest`` returns the trace number and the
+    position of the point within that trace, so callers can read values
+    straight back from the arrays they indexed.
+
+    Points are indexed multiplied by ``scale`` (e.g. one over each axis'
+    extent, so a single cell size suits signals of any units). With a
+    ``resolution``, consecutive points of a trace falling in the same
+    resolution-sized cell of the scaled space are indexed once (the first of
+    each run), which shrinks dense traces to a size that builds quickly;
+    lookups still search every point of the runs near the query.
+    """
+    def __init__(self, traces, resolution=None, scale=None):
+        # scipy is only needed once a readout is requested
+        from scipy.spatial import cKDTree
+        self.scale = np.ones(2) if scale is None else np.asarray(scale, dtype=float)
+        self.resolution = resolution
+        self.traces = []  # (x, y) per trace, the arrays as given
+        points, positions, offsets = [], [], [0]
+        for trace in traces:
+            if isinstance(trace, tuple):
+                x, y = (np.asarray(values) for values in trace)
+            else:
+                trace = np.asarray(trace).reshape(-1, 2)
+                x, y = trace[:, 0], trace[:, 1]
+            self.traces.append((x, y))
+            scaled_x, scaled_y = x * self.scale[0], y * self.scale[1]
+            finite = np.flatnonzero(np.isfinite(scaled_x) & np.isfinite(scaled_y))
+            if resolution and len(finite) > 1:
+                cell_x, cell_y = np.floor(scaled_x[finite] / resolution), np.floor(scaled_y[finite] / resolution)
+                keep = np.empty(len(finite), dtype=bool)
+                keep[0] = True
+                keep[1:] = (cell_x[1:] != cell_x[:-1]) | (cell_y[1:] != cell_y[:-1])
+                finite = finite[keep]
+            points.append(np.column_stack((scaled_x[finite], scaled_y[finite])))
+            positions.append(finite)
+            offsets.append(offsets[-1] + len(finite))
+        self.offsets = np.asarray(offsets)
+        self.positions = np.concatenate(positions) if positions else np.empty(0, dtype=int)
+        self.size = int(self.offsets[-1])
+        self.tree = None
+        if self.size:
+            # Unbalanced trees build several times faster
+            self.tree = cKDTree(np.concatenate(points), balanced_tree=False, compact_nodes=False)
+
+    def __len__(self):
+        return self.size
+
+    def nearest(self, x, y, radius=np.inf, weights=None, mask=None):
+        """Closest point to (x, y) within ``radius``, as (trace, position, distance).
+
+        Distances are ``hypot(dx * weights[0], dy * weights[1])`` for offsets
+        in data units, e.g. pixels per data unit for an on-screen pick; the
+        index does not need rebuilding when they change. ``mask`` is a boolean
+        per trace, traces where it is False are never returned.
+        """
+        if self.tree is None:
+            return None
+        weights = np.ones(2) if weights is None else np.abs(np.asarray(weights, dtype=float))
+        point = np.array((x, y), dtype=float) * self.scale
+        if weights[0] == weights[1] and self.scale[0] == self.scale[1] and mask is None and not self.resolution:
+            distance, index = self.tree.query(point, distance_upper_bound=radius * self.scale[0] / weights[0])
+            if not np.isfinite(distance):
+                return None
+            trace = int(np.searchsorted(self.offsets, index, side='right')) - 1
+            return trace, int(self.positions[index]), float(distance * weights[0] / self.scale[0])
+        # Every point within radius lies in this ball of the scaled space, or in a run starting in it
+        reach = radius / np.min(weights / self.scale)
+        if self.resolution:
+            reach += self.resolution * np.sqrt(2)
+        candidates = np.arange(self.size) if not np.isfinite(reach) else np.asarray(self.tree.query_ball_point(point, reach), dtype=int)
+        if not len(candidates):
+            return None
+        owners = np.searchsorted(self.offsets, candidates, side='right') - 1
+        if mask is not None:
+            allowed = np.asarray(mask, dtype=bool)[owners]
+            candidates, owners = candidates[allowed], owners[allowed]
+        best = None
+        for trace in np.unique(owners):
+            trace_x, trace_y = self.traces[trace]
+            members = self.members(candidates[owners == trace], trace)
+            distances = np.hypot((trace_x[members] - x) * weights[0], (trace_y[members] - y) * weights[1])
+            distances[~np.isfinite(distances)] = np.inf
+            closest = int(np.argmin(distances))
+            if distances[closest] <= radius and (best is None or distances[closest] < best[2]):
+                best = (int(trace), int(members[closest]), float(distances[closest]))
+        return best
+
+    def members(self, indexed, trace):
+        # Positions of every point in the runs started by the indexed points of one trace
+        starts = self.positions[indexed]
+        if not self.resolution:
+            return starts
+        last = self.offsets[trace + 1] - 1
+        stops = np.where(indexed < last, self.positions[np.minimum(indexed + 1, last)], len(self.traces[trace][0]))
+        lengths = stops - starts
+        return np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
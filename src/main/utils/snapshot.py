@@ -0,0 +1,42 @@
+from dataclasses import dataclass, field
+from typing import Any
+import numpy as np
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Parameter state of the UI paired with the results simulated for it.
+
+    ``parameters`` maps section ids to {item id: value}. Sections that did not
+    change are the same dict objects as in the previous snapshot, and results
+    are a handle to the model's result set, never a copy, so a history of
+    snapshots costs little more than the states that actually differ.
+    """
+    parameters: dict
+    results: Any = field(default=None, compare=False)
+
+    def with_results(self, results):
+        return Snapshot(self.parameters, results)
+
+    def matches(self, parameters):
+        return all(
+            same_section(self.parameters.get(section_id, {}), values)
+            for section_id, values in parameters.items()
+        )
+
+def same_value(a, b):
+    if isinstance(a, (np.ndarray, list, tuple)) or isinstance(b, (np.ndarray, list, tuple)):
+        return np.shape(a) == np.shape(b) and bool(np.all(np.asarray(a) == np.asarray(b)))
+    return a == b
+
+def same_section(a, b):
+    return a.keys() == b.keys() and all(same_value(a[key], b[key]) for key in a)
+
+def share_parameters(previous, parameters):
+    # Reuse the previous snapshot's section dicts where nothing changed
+    if previous is None:
+        return parameters
+    return {
+        section_id: previous.parameters[section_id]
+        if section_id in previous.parameters and same_section(previous.parameters[section_id], values) else values
+        for section_id, values in parameters.items()
+    }
@@ -21,21 +21,34 @@ class StateBuffer:
             self.current_index += 1
             return self.buffer[self.current_index]
         
-        # If index doesn't increment, return tuple of None based on current buffer slot
-        if len(self.buffer):
-            num_items = len(self.buffer[self.current_index])
-            return tuple(None for _ in range(num_items))
-        return None
+        return self.__empty()
 
     def next(self):
         if self.current_index > 0:
             self.current_index -= 1
             return self.buffer[self.current_index]
         
-        # If index doesn't decrement, return tuple of None based on current buffer slot
+        return self.__empty()
+
+    def current(self):
+        if len(self.buffer):
+            return self.buffer[self.current_index]
+        return None
+
+    def replace(self, old, new):
+        # Swap an item in place (by identity), e.g. to attach data to a past state
+        for index, item in enumerate(self.buffer):
+            if item is old:
+                self.buffer[index] = new
+                return True
+        return False
+
+    def __empty(self):
+        # If the index doesn't move, return tuple of None based on current buffer slot
         if len(self.buffer):
-            num_items = len(self.buffer[self.current_index])
-            return tuple(None for _ in range(num_items))
+            item = self.buffer[self.current_index]
+            if isinstance(item, tuple):
+                return tuple(None for _ in range(len(item)))
         return None
 
     def __repr__(self):
@@ -0,0 +1,75 @@
+import os
+import io
+import hashlib
+
+class TexCache:
+    """Disk-backed cache of mathtext labels rendered to transparent PNG images.
+
+    Images are keyed by the text, font size, font set, DPI, text color and the
+    application/matplotlib versions, so a version change never reuses stale
+    images. Images are rendered on first request and read back from disk after.
+    """
+    def __init__(self, cache_dir, version=""):
+        self.cache_dir = cache_dir
+        self.version = version
+        self._memory = {}
+
+    def key(self, text, fontsize=9, dpi=None, color=None):
+        import matplotlib
+        dpi = dpi or matplotlib.rcParams['figure.dpi']
+        color = color or matplotlib.rcParams['text.color']
+        ident = "\x00".join(str(value) for value in (
+            self.version,
+            matplotlib.__version__,
+            matplotlib.rcParams['mathtext.fontset'],
+            ",".join(matplotlib.rcParams['font.family']),
+            text,
+            fontsize,
+            dpi,
+            color
+        ))
+        return hashlib.sha1(ident.encode("utf-8")).hexdigest()
+
+    def get(self, text, fontsize=9, dpi=None, color=None):
+        key = self.key(text, fontsize, dpi, color)
+        if key in self._memory:
+            return self._memory[key]
+        file_path = os.path.join(self.cache_dir, f"{key}.png")
+        try:
+            with open(file_path, "rb") as file:
+                image = file.read()
+        except OSError:
+            image = self.render(text, fontsize, dpi, color)
+            self._write(file_path, image)
+        self._memory[key] = image
+        return image
+
+    def render(self, text, fontsize=9, dpi=None, color=None):
+        # Render without pyplot so no global figure manager is involved
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        figure = Figure(figsize=(0.01, 0.01))
+        FigureCanvasAgg(figure)
+        figure.text(0.5, 0.5, text, horizontalalignment='center', verticalalignment='center', fontsize=fontsize, color=color)
+        buf = io.BytesIO()
+        figure.savefig(buf, format='png', dpi=dpi or 'figure', bbox_inches='tight', pad_inches=0.05, transparent=True)
+        return buf.getvalue()
+
+    def clear(self):
+        self._memory = {}
+        if not os.path.isdir(self.cache_dir):
+            return
+        for file_name in os.listdir(self.cache_dir):
+            if file_name.endswith(".png"):
+                os.remove(os.path.join(self.cache_dir, file_name))
+
+    def _write(self, file_path, image):
+        # A failed write only costs a re-render next launch
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{file_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as file:
+                file.write(image)
+            os.replace(tmp_path, file_path)
+        except OSError:
+            pass
@@ -0,0 +1,53 @@
+import io
+import os
+import csv
+import numpy as np
+
+# Cells formatted per chunk when no chunk size is given (~2 MB of float64)
+CHUNK_CELLS = 1 << 18
+
+def column_format(column):
+    # Enough significant digits for the stored precision to read back exactly
+    if column.dtype.kind == 'f':
+        return {2: "%.5g", 4: "%.9g"}.get(column.dtype.itemsize, "%.17g")
+    if column.dtype.kind in 'iub':
+        return "%d"
+    return "%.17g"
+
+def write_csv(file_name, headers, columns, chunk_rows=None, fmt=None, progress=None):
+    # Columns may differ in length (ragged traces), missing cells are left blank
+    # while NaN values within a column are written as nan. Each column is
+    # formatted for its own dtype unless a fmt is given for all of them.
+    # Rows are formatted a chunk at a time so memory stays bounded by the chunk.
+    # The file is written next to the target and moved into place when complete,
+    # so an interrupted export (e.g. progress raising to cancel) leaves no partial file.
+    columns = [np.asarray(column) for column in columns]
+    formats = [fmt or column_format(column) for column in columns]
+    lengths = [len(column) for column in columns]
+    n_rows = max(lengths, default=0)
+    if chunk_rows is None:
+        chunk_rows = max(1, CHUNK_CELLS // max(len(columns), 1))
+    tmp_name = f"{file_name}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_name, 'w', newline='') as file:
+            csv.writer(file, lineterminator='\n').writerow(headers)
+            for start in range(0, n_rows, chunk_rows):
+                stop = min(start + chunk_rows, n_rows)
+                buffer = io.StringIO()
+                # The columns present only change where one ends, each stretch gets one row format
+                ends = sorted({length for length in lengths if start < length < stop} | {stop})
+                for first, last in zip([start] + ends[:-1], ends):
+                    present = [index for index, length in enumerate(lengths) if length >= last]
+                    block = np.empty((last - first, len(present)))
+                    for position, index in enumerate(present):
+                        block[:, position] = columns[index][first:last]
+                    row = ",".join(formats[index] if length >= last else "" for index, length in enumerate(lengths))
+                    np.savetxt(buffer, block, fmt=row)
+                file.write(buffer.getvalue())
+                if progress is not None:
+                    progress(stop / n_rows)
+        os.replace(tmp_name, file_name)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+        raise
@@ -3,7 +3,8 @@ from .lineitem import LineItem
 from .collapsiblesection import CollapsibleSection
 from .axes import Axes
 from .axestoolbar import AxesToolbar
+from .legendview import LegendView, LegendModel
 
 __all__ = [
-    "CollapsibleSection", "Axes", "LineItem", "CollapsibleContainer", 'AxesToolbar'
+    "CollapsibleSection", "Axes", "LineItem", "CollapsibleContainer", 'AxesToolbar', "LegendView", "LegendModel"
     ]
\ No newline at end of file
@@ -1,13 +1,19 @@
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QSizePolicy, QGridLayout
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QSizePolicy, QToolButton, QMenu
 )
 from PyQt6.QtCore import pyqtSignal, pyqtSlot
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+from matplotlib.colors import to_hex
+import matplotlib
 
 from src.main.app.baseapp import BaseApp
 from src.main.view.components import CollapsibleContainer
+from src.main.utils import TracePyramid
 from .axestoolbar import AxesToolbar
+from .legendview import LegendView
+from .tracecursor import TraceCursor
 
 class Axes(QWidget,BaseApp):
     axes_changed = pyqtSignal(dict)
@@ -15,9 +21,14 @@ class Axes(QWidget,BaseApp):
     
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.previous_selection = {"x": None, "y": None}
-        self.max_legend_width = 6
-        self.legend_items = []
+        self.previous_selection = {"x": None, "y": None, "panels": []}
+        self.highlighted = None
+        # Lines, traces and pyramids are flat lists ordered panel by panel,
+        # each panel holding one line per condition
+        self.conditions = 0
+        self.lines = []
+        self.traces = []  # full resolution trace data, parallel to self.lines
+        self.pyramids = []
         self.setupUi()
         self.bindUi()
 
@@ -28,7 +39,17 @@ class Axes(QWidget,BaseApp):
         self.y_axis_dropdown.currentTextChanged.connect(
             lambda: self.on_axis_changed("y")
         )
+        self.panels_menu.triggered.connect(self.on_panels_changed)
         self.toolbar.dataExported.connect(self.handle_data_exported)
+        self.legend.traceHovered.connect(self.highlight_trace)
+        self.cursor = TraceCursor(self, self)
+        self.canvas.mpl_connect('resize_event', lambda event: self.update_lod())
+        self.connect_axes_callbacks()
+
+    def connect_axes_callbacks(self):
+        # Axes.clear() resets the callback registry, so this is rerun after clearing.
+        # Panels share x, so the top panel's limits drive the level of detail.
+        self.axes.callbacks.connect('xlim_changed', lambda ax: self.update_lod())
         
     def setupUi(self):
         self.setObjectName("plot_page")
@@ -39,8 +60,9 @@ class Axes(QWidget,BaseApp):
         self.figure = Figure()
         self.canvas = FigureCanvas(self.figure)
         # self.toolbar = NavigationToolbar(self.canvas, self)
-        self.toolbar = AxesToolbar(self.canvas,self)
+        self.toolbar = AxesToolbar(self.canvas,self,traces=self.get_traces)
         self.axes = self.figure.add_subplot(111)
+        self.panels = [self.axes]  # stacked panels sharing x, self.axes is the top one
         self.axes.set_xlabel("X")
         self.axes.set_ylabel("Y")
 
@@ -72,10 +94,20 @@ class Axes(QWidget,BaseApp):
         x_label.setSizePolicy(QSizePolicy.Policy.Maximum, QSizePolicy.Policy.Fixed)
         self.x_axis_dropdown.setSizePolicy(QSizePolicy.Policy.Maximum, QSizePolicy.Policy.Fixed)
         
+        # Extra signals, each drawn in its own panel below the Y-Axis signal
+        self.panels_button = QToolButton()
+        self.panels_button.setText("Panels")
+        self.panels_button.setToolTip("Plot more signals in stacked panels sharing the X-Axis")
+        self.panels_button.setPopupMode(QToolButton.ToolButtonPopupMode.InstantPopup)
+        self.panels_menu = QMenu(self.panels_button)
+        self.panels_button.setMenu(self.panels_menu)
+        self.panels_button.setSizePolicy(QSizePolicy.Policy.Maximum, QSizePolicy.Policy.Fixed)
+        
         # Add contents to layout
         # Y-Axis
         axis_layout.addWidget(y_label)
         axis_layout.addWidget(self.y_axis_dropdown)
+        axis_layout.addWidget(self.panels_button)
         # Expanding space
         axis_layout.addStretch()
         # X-Axis
@@ -84,9 +116,11 @@ class Axes(QWidget,BaseApp):
 
         # Create the collapsible legend container
         self.legend_container = CollapsibleContainer(title="Legend")
-        legend_layout = QGridLayout()
+        legend_layout = QVBoxLayout()
         legend_layout.setContentsMargins(2, 3, 2, 3)  # Add some padding
         legend_layout.setSpacing(2)
+        self.legend = LegendView()
+        legend_layout.addWidget(self.legend)
         self.legend_container.setContentLayout(legend_layout)
         legendObjs = [
             "collapsibleContainer", "collapsibleToggleButton", "collapsibleHeaderLine", "collapsibleContentArea", "collapsibleContentWidget"
@@ -114,6 +148,15 @@ class Axes(QWidget,BaseApp):
         self.x_axis_dropdown.addItems(opts)
         self.y_axis_dropdown.addItems(opts)
 
+        # Keep checked panel signals that are still available
+        checked = set(self.previous_selection["panels"])
+        self.panels_menu.clear()
+        for opt in opts:
+            action = self.panels_menu.addAction(opt)
+            action.setCheckable(True)
+            action.setChecked(opt in checked)
+        self.previous_selection["panels"] = self.checked_panels()
+
         if xSelection in opts:
             self.x_axis_dropdown.setCurrentText(xSelection)
         if ySelection in opts:
@@ -125,7 +168,7 @@ class Axes(QWidget,BaseApp):
         self.x_axis_dropdown.blockSignals(False)
         self.y_axis_dropdown.blockSignals(False)
 
-        self.axes_changed.emit(self.previous_selection.copy())
+        self.axes_changed.emit(self.getAxesDataLabels())
 
     @pyqtSlot(str)
     def on_axis_changed(self, axis):
@@ -135,45 +178,210 @@ class Axes(QWidget,BaseApp):
         if new_value != old_value:
             # update previous selection and then send a copy (prevent unwanted mutations)
             self.previous_selection[axis] = new_value
-            self.axes_changed.emit(self.previous_selection.copy())
+            self.axes_changed.emit(self.getAxesDataLabels())
+
+    def checked_panels(self):
+        return [action.text() for action in self.panels_menu.actions() if action.isChecked()]
+
+    def on_panels_changed(self, action):
+        self.previous_selection["panels"] = self.checked_panels()
+        self.axes_changed.emit(self.getAxesDataLabels())
 
     @pyqtSlot(object)
     def handle_data_exported(self, data):
-        self.data_exported.emit(data)
+        # Attach the plotted signals to the export request
+        self.data_exported.emit({**data, **self.getAxesDataLabels()})
     
     def add_legend_item(self, label, color):
-        legend_layout = self.legend_container.contentLayout
-        count = legend_layout.count()
-          # Set your desired max columns
-        row = count // self.max_legend_width
-        column = count % self.max_legend_width
-        legend_label = QLabel(f'<font color="{color}"><b>{label}</b></font>')
-        legend_label.setStyleSheet("padding: 2px;")
-        legend_layout.addWidget(legend_label, row, column)
-        self.legend_items.append(legend_label)
-    
+        self.legend.addEntry(label, color)
+
+    def update_legend(self, labels):
+        # The legend model only repaints changed rows when the trace count is unchanged
+        self.legend.setEntries(labels, [self.trace_color(index) for index in range(len(labels))])
+
+    def condition_lines(self, index):
+        # The lines of one condition, one per panel
+        if not 0 <= index < self.conditions:
+            return []
+        return self.lines[index::self.conditions]
+
+    @pyqtSlot(int)
+    def highlight_trace(self, index):
+        # Only the previously and newly hovered lines are touched
+        if self.highlighted is not None:
+            for line in self.condition_lines(self.highlighted):
+                line.set_linewidth(matplotlib.rcParams['lines.linewidth'])
+                line.set_zorder(Line2D.zorder)
+        self.highlighted = None
+        lines = self.condition_lines(index)
+        for line in lines:
+            line.set_linewidth(2.5 * matplotlib.rcParams['lines.linewidth'])
+            line.set_zorder(Line2D.zorder + 1)
+        if lines:
+            self.highlighted = index
+        self.canvas.draw_idle()
+
+    def on_next_draw(self, callback):
+        # Calls callback once, when the canvas has finished its next redraw
+        def handler(event):
+            self.canvas.mpl_disconnect(cid)
+            callback()
+        cid = self.canvas.mpl_connect('draw_event', handler)
+
+    def set_panel_count(self, count):
+        # Rebuild the figure as count stacked panels sharing x; lines are recreated
+        if count == len(self.panels):
+            return
+        self.cursor.reset()
+        self.figure.clear()
+        self.panels = list(self.figure.subplots(count, 1, sharex=True, squeeze=False)[:, 0])
+        self.axes = self.panels[0]
+        self.conditions = 0
+        self.lines = []
+        self.traces = []
+        self.pyramids = []
+        self.highlighted = None
+        self.connect_axes_callbacks()
+        # Navigation history refers to the removed axes
+        self.toolbar.update()
+
     def clear(self):
+        self.set_panel_count(1)
         self.axes.clear()
-        self.legend_container.clear()
-        self.legend_items = []
-        self.canvas.draw()
+        self.connect_axes_callbacks()
+        self.conditions = 0
+        self.lines = []
+        self.traces = []
+        self.pyramids = []
+        self.highlighted = None
+        self.cursor.reset()
+        self.legend.clear()
+        self.canvas.draw_idle()
+
+    def trace_color(self, index):
+        colors = matplotlib.rcParams['axes.prop_cycle'].by_key().get('color', ['C0'])
+        return to_hex(colors[index % len(colors)])
+
+    def plot(self, results):
+        self.plot_panels([results])
+
+    def plot_panels(self, panel_results):
+        # Draw one result set per panel in one pass: existing Line2D artists are
+        # reused with set_data, the legend is rebuilt once and a single redraw is
+        # deferred. Every panel holds the same conditions, in the same order.
+        panel_results = [results for results in panel_results if results]
+        if not panel_results:
+            return
+        self.highlight_trace(-1)
+        self.cursor.unpin()
+        self.set_panel_count(len(panel_results))
+        data = panel_results[0]['data']
+        self.conditions = len(data)
+        self.traces = [
+            {'x': result['x'], 'y': result['y'], 'label': result['label'], 'meta': result.get('meta', {})}
+            for results in panel_results for result in results['data']
+        ]
+        self.pyramids = self.build_pyramids(self.traces)
+        # New result set, the hover index is rebuilt on the next hover
+        self.cursor.invalidate()
+        lines = []
+        for panel_index, panel in enumerate(self.panels):
+            existing = [line for line in self.lines if line.axes is panel]
+            for index, result in enumerate(data):
+                trace = self.conditions * panel_index + index
+                color = self.trace_color(index)
+                # Coarsest level for the autoscale below, update_lod then serves the view
+                x, y = self.pyramids[trace].overview()
+                if index < len(existing):
+                    line = existing[index]
+                    line.set_data(x, y)
+                    line.set_label(result['label'])
+                    line.set_color(color)
+                else:
+                    line = Line2D(x, y, label=result['label'], color=color)
+                    panel.add_line(line)
+                lines.append(line)
+            for line in existing[len(data):]:
+                line.remove()
+        self.lines = lines
+
+        self.update_legend([result['label'] for result in data])
+
+        self.panels[-1].set_xlabel(panel_results[0]['label']['x'])
+        # Decimated levels keep each trace's extrema, so limits match the full data.
+        # The level of detail is updated once, after every panel is scaled.
+        with self.axes.callbacks.blocked(signal='xlim_changed'):
+            for panel, results in zip(self.panels, panel_results):
+                panel.set_ylabel(results['label']['y'])
+                panel.relim()
+                panel.autoscale_view()
+        self.apply_grid()
+        self.update_lod()
+        self.canvas.draw_idle()
+
+    def build_pyramids(self, traces):
+        # Traces already shown keep their pyramid; a new y over a known x reuses the x check
+        built = {(id(pyramid.x), id(pyramid.y)): pyramid for pyramid in self.pyramids}
+        known_x = {id(pyramid.x): pyramid for pyramid in self.pyramids}
+        pyramids = []
+        for trace in traces:
+            pyramid = built.get((id(trace['x']), id(trace['y'])))
+            if pyramid is None:
+                same_x = known_x.get(id(trace['x']))
+                pyramid = TracePyramid(trace['x'], trace['y'], monotonic=same_x.monotonic if same_x is not None else None)
+            pyramids.append(pyramid)
+        return pyramids
 
     def append(self, result):
-        line, = self.axes.plot(result['x'], result['y'], label=result['label'])
-        color = line.get_color()
-        self.add_legend_item(result['label'],color)
-        # Check the toolbar's status for grid lines and apply them
-        if self.toolbar.is_h_grid_enabled():
-            self.axes.yaxis.grid(True)
-        if self.toolbar.is_v_grid_enabled():
-            self.axes.xaxis.grid(True)
+        self.set_panel_count(1)
+        self.conditions += 1
+        pyramid = TracePyramid(result['x'], result['y'])
+        x, y = pyramid.query(pixels=self.axes.bbox.width)
+        line = Line2D(x, y, label=result['label'], color=self.trace_color(len(self.lines)))
+        self.axes.add_line(line)
+        self.lines.append(line)
+        self.traces.append({'x': result['x'], 'y': result['y'], 'label': result['label'], 'meta': result.get('meta', {})})
+        self.pyramids.append(pyramid)
+        self.add_legend_item(result['label'], line.get_color())
+        self.cursor.invalidate()
+        self.axes.relim()
+        self.axes.autoscale_view()
+        self.apply_grid()
         # update view
-        self.canvas.draw()
+        self.canvas.draw_idle()
+
+    def update_lod(self):
+        # Serve each line the decimation level matching the visible x-range and pixel width
+        if not self.pyramids:
+            return
+        xmin, xmax = sorted(self.axes.get_xlim())
+        pixels = self.axes.bbox.width
+        for line, pyramid in zip(self.lines, self.pyramids):
+            if pyramid.levels:
+                line.set_data(*pyramid.query(xmin, xmax, pixels))
+
+    def get_traces(self):
+        # Traces of the top panel (the Y-Axis signal)
+        return self.traces[:self.conditions]
+
+    def apply_grid(self):
+        # Check the toolbar's status for grid lines and apply them
+        for panel in self.panels:
+            if self.toolbar.is_h_grid_enabled():
+                panel.yaxis.grid(True)
+            if self.toolbar.is_v_grid_enabled():
+                panel.xaxis.grid(True)
 
     def setAxesLabels(self, labels):
-        self.axes.set_xlabel(labels['x'])
+        self.panels[-1].set_xlabel(labels['x'])
         self.axes.set_ylabel(labels['y'])
-        self.canvas.draw()
+        self.canvas.draw_idle()
 
     def getAxesDataLabels(self):
-        return {"x": self.x_axis_dropdown.currentText(), "y": self.y_axis_dropdown.currentText()}
+        # Panel signals other than the Y-Axis signal, in menu order
+        y = self.y_axis_dropdown.currentText()
+        return {
+            "x": self.x_axis_dropdown.currentText(),
+            "y": y,
+            "panels": [signal for signal in self.previous_selection["panels"] if signal != y]
+        }
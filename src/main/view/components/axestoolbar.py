@@ -1,6 +1,5 @@
 from PyQt6.QtCore import pyqtSignal
 from PyQt6.QtGui import QIcon, QAction
-import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qtagg import NavigationToolbar2QT as NavigationToolbar
 
 from src.main.app.baseapp import BaseApp
@@ -8,8 +7,10 @@ from src.main.app.baseapp import BaseApp
 class AxesToolbar(NavigationToolbar, BaseApp):
     dataExported = pyqtSignal(object)
     
-    def __init__(self, canvas, parent=None):
+    def __init__(self, canvas, parent=None, traces=None):
         super().__init__(canvas, parent)
+        # Callable returning the full resolution traces, the plotted lines may be decimated
+        self.traces = traces if traces is not None else self.get_line_traces
 
         # Icons
         pop_icon = QIcon(self.getResource('icons', 'up-right-from-square-solid.svg'))
@@ -48,14 +49,12 @@ class AxesToolbar(NavigationToolbar, BaseApp):
         self.addAction(self.pop_figure_action)
 
     def pop_figure(self):
+        import matplotlib.pyplot as plt
         original_axes = self.canvas.figure.get_axes()[0]
         new_fig, new_axes = plt.subplots()
 
-        for line in original_axes.lines:
-            x_data = line.get_xdata()
-            y_data = line.get_ydata()
-            label = line.get_label()
-            new_axes.plot(x_data, y_data, label=label)
+        for trace in self.traces():
+            new_axes.plot(trace['x'], trace['y'], label=trace['label'])
         
         new_axes.set_title(original_axes.get_title())
         new_axes.set_xlabel(original_axes.get_xlabel())
@@ -66,41 +65,24 @@ class AxesToolbar(NavigationToolbar, BaseApp):
         new_fig.show()
     
     def pop_data(self):
-        # Get the current axes
-        original_axes = self.canvas.figure.get_axes()[0]
+        # Request an export, the data is written from the model's result store
+        self.dataExported.emit({})
 
-        # Prepare data for export
-        data = []
-        headers = []
-        for line in original_axes.lines:
-            x_data = line.get_xdata()
-            y_data = line.get_ydata()
-            label = line.get_label()
-            headers.append(f'X-{label}')
-            headers.append(f'Y-{label}')
-            if len(data) == 0:
-                data = list(zip(x_data, y_data))
-            else:
-                new_data = list(zip(x_data, y_data))
-                data = [(*d, *n) for d, n in zip(data, new_data)]
-        # Emit the data
-        self.dataExported.emit({'headers':headers,'data': data})
-        
-        # # Save to CSV
-        # file_name = self.save_file("CSV Files (*.csv);;All Files (*.*)")
-        # if file_name:
-        #     with open(file_name, 'w', newline='') as csvfile:
-        #         writer = csv.writer(csvfile)
-        #         writer.writerow(headers)
-        #         writer.writerows(data)
-        #     print(f"Data exported to {file_name}")
+    def get_line_traces(self):
+        original_axes = self.canvas.figure.get_axes()[0]
+        return [
+            {'x': line.get_xdata(), 'y': line.get_ydata(), 'label': line.get_label()}
+            for line in original_axes.lines
+        ]
 
     def toggle_h_grid(self, checked):
-        self.canvas.figure.gca().yaxis.grid(checked)
+        for axes in self.canvas.figure.get_axes():
+            axes.yaxis.grid(checked)
         self.canvas.draw()
 
     def toggle_v_grid(self, checked):
-        self.canvas.figure.gca().xaxis.grid(checked)
+        for axes in self.canvas.figure.get_axes():
+            axes.xaxis.grid(checked)
         self.canvas.draw()
 
     def is_h_grid_enabled(self):
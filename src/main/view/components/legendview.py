@@ -0,0 +1,135 @@
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLineEdit, QListView, QAbstractItemView
+from PyQt6.QtCore import (
+    Qt, QAbstractListModel, QModelIndex, QSortFilterProxyModel, QEvent, pyqtSignal
+)
+from PyQt6.QtGui import QColor
+
+class LegendModel(QAbstractListModel):
+    """Flat list of (label, color) legend entries.
+
+    Only the rows a view asks for are ever formatted, so a sweep with thousands
+    of traces costs the same to show as one with a handful.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.labels = []
+        self.colors = []
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.labels)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.labels):
+            return None
+        row = index.row()
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return self.labels[row]
+        if role in (Qt.ItemDataRole.DecorationRole, Qt.ItemDataRole.ForegroundRole):
+            return QColor(self.colors[row])
+        return None
+
+    def setEntries(self, labels, colors):
+        labels, colors = list(labels), list(colors)
+        if len(labels) == len(self.labels):
+            # Same number of traces (e.g. an axis change): only repaint rows that differ
+            changed = [row for row in range(len(labels)) if (labels[row], colors[row]) != (self.labels[row], self.colors[row])]
+            self.labels, self.colors = labels, colors
+            if changed:
+                self.dataChanged.emit(self.index(changed[0]), self.index(changed[-1]))
+            return
+        self.beginResetModel()
+        self.labels, self.colors = labels, colors
+        self.endResetModel()
+
+    def addEntry(self, label, color):
+        row = len(self.labels)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.labels.append(label)
+        self.colors.append(color)
+        self.endInsertRows()
+
+    def clear(self):
+        self.setEntries([], [])
+
+class LegendView(QWidget):
+    # Source row of the hovered entry, -1 once the pointer leaves the legend
+    traceHovered = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.model = LegendModel(self)
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        self.proxy.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.hoveredRow = -1
+        self.setupUi()
+        self.bindUi()
+
+    def setupUi(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(2)
+
+        self.filterEdit = QLineEdit(self)
+        self.filterEdit.setObjectName("legendFilter")
+        self.filterEdit.setPlaceholderText("Filter traces...")
+        self.filterEdit.setClearButtonEnabled(True)
+
+        # Entries flow left to right and wrap; uniform sizes and batched layout
+        # keep the cost proportional to the visible rows only
+        self.listView = QListView(self)
+        self.listView.setObjectName("legendList")
+        self.listView.setModel(self.proxy)
+        self.listView.setViewMode(QListView.ViewMode.ListMode)
+        self.listView.setFlow(QListView.Flow.LeftToRight)
+        self.listView.setWrapping(True)
+        self.listView.setResizeMode(QListView.ResizeMode.Adjust)
+        self.listView.setUniformItemSizes(True)
+        self.listView.setLayoutMode(QListView.LayoutMode.Batched)
+        self.listView.setBatchSize(200)
+        self.listView.setSpacing(2)
+        self.listView.setTextElideMode(Qt.TextElideMode.ElideRight)
+        self.listView.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.listView.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.listView.setMouseTracking(True)
+        self.listView.setFixedHeight(96)
+
+        layout.addWidget(self.filterEdit)
+        layout.addWidget(self.listView)
+
+    def bindUi(self):
+        self.filterEdit.textChanged.connect(self.proxy.setFilterFixedString)
+        self.listView.entered.connect(self.on_entered)
+        self.listView.viewport().installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if obj is self.listView.viewport() and event.type() == QEvent.Type.Leave:
+            self.setHovered(-1)
+        return super().eventFilter(obj, event)
+
+    def on_entered(self, index):
+        self.setHovered(self.proxy.mapToSource(index).row())
+
+    def setHovered(self, row):
+        if row != self.hoveredRow:
+            self.hoveredRow = row
+            self.traceHovered.emit(row)
+
+    def setEntries(self, labels, colors):
+        self.setHovered(-1)
+        self.model.setEntries(labels, colors)
+
+    def addEntry(self, label, color):
+        self.model.addEntry(label, color)
+
+    def clear(self):
+        self.setHovered(-1)
+        self.model.clear()
+
+    def count(self):
+        return self.model.rowCount()
+
+    def visibleCount(self):
+        return self.proxy.rowCount()
@@ -3,15 +3,17 @@ from PyQt6.QtWidgets import (
     QWidget, QLabel, QLineEdit, QComboBox, QHBoxLayout, QSizePolicy, QCheckBox, QPushButton, QFileDialog, QMessageBox
 )
 from PyQt6.QtGui import QDoubleValidator, QPixmap
-from matplotlib import pyplot as plt
-import io
 import numpy as np
 
-from src.main.utils import safe_eval, num_to_str
+from src.main.app.baseapp import BaseApp
+from src.main.app.version import __version__
+from src.main.utils import safe_eval, num_to_str, TexCache
 
 class LineItem(QWidget):
     valueChanged = pyqtSignal(object, object, str)  # old_value, new_value, id
     LineItemError = pyqtSignal(str)
+    # Rendered LaTeX labels, shared by all line items and persisted across launches
+    texCache = None
     def __init__(self, id, config, useTex=True, parent=None):
         super().__init__(parent)
         self.id = id
@@ -131,15 +133,10 @@ class LineItem(QWidget):
             self.valueChanged.emit(old_value, new_value, self.id)
 
     def set_latex_label(self, latex_text):
-        plt.figure(figsize=(0.01, 0.01))
-        plt.text(0.5, 0.5, latex_text, horizontalalignment='center', verticalalignment='center', fontsize=9)
-        plt.axis('off')
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', bbox_inches='tight', pad_inches=0.05, transparent=True)
-        plt.close()
-        buf.seek(0)
+        if LineItem.texCache is None:
+            LineItem.texCache = TexCache(BaseApp.getUserData('cache', 'labels'), __version__)
         pixmap = QPixmap()
-        pixmap.loadFromData(buf.getvalue(), "PNG")
+        pixmap.loadFromData(LineItem.texCache.get(latex_text, fontsize=9), "PNG")
         self.label.setPixmap(pixmap)
 
     def getValue(self):
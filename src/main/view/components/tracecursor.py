@@ -0,0 +1,138 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from PyQt6.QtWidgets import QToolTip
+from PyQt6.QtCore import QObject, QPoint
+from PyQt6.QtGui import QCursor
+from matplotlib.lines import Line2D
+
+from src.main.utils import PointIndex, num_to_str
+
+class TraceCursor(QObject):
+    """Hover and click readout for the traces of an ``Axes`` widget.
+
+    The nearest point is looked up in a ``PointIndex`` over the traces of the
+    hovered panel, in data coordinates scaled by the traces' extent. An index
+    is built once per result set, on a background thread; hovering a panel
+    whose index is not ready yet shows nothing. Pans, zooms and resizes only
+    change the pixels-per-unit weights of the lookup.
+    """
+    # Pointer distance (px) within which a point is picked
+    PICK_RADIUS = 8
+    # Index cells per trace extent, runs of points within a cell are indexed once
+    RESOLUTION = 256
+    DISPLAY = ".5g"
+
+    def __init__(self, axes, parent=None):
+        super().__init__(parent)
+        self.axes = axes
+        self.indexes = {}  # panel -> (future PointIndex, trace numbers)
+        self.executor = ThreadPoolExecutor(1, thread_name_prefix="trace-index")
+        self.hit = None
+        self.marker = None
+        self.annotation = None
+        canvas = self.axes.canvas
+        canvas.mpl_connect('motion_notify_event', self.on_motion)
+        canvas.mpl_connect('button_press_event', self.on_click)
+        canvas.mpl_connect('figure_leave_event', lambda event: QToolTip.hideText())
+
+    def invalidate(self):
+        self.indexes = {}
+
+    def reset(self):
+        # Artists are removed by Axes.clear(), only drop the references
+        self.invalidate()
+        self.marker = None
+        self.annotation = None
+
+    def build(self, panel):
+        # The traces are gathered here, the index is built off the GUI thread
+        numbers = [number for number, line in enumerate(self.axes.lines) if line.axes is panel]
+        traces = [(self.axes.traces[number]['x'], self.axes.traces[number]['y']) for number in numbers]
+        self.indexes[panel] = (self.executor.submit(index_traces, traces, self.RESOLUTION), numbers)
+        return self.indexes[panel]
+
+    def pick(self, event):
+        if event.inaxes not in self.axes.panels or not self.axes.lines or event.xdata is None:
+            return None
+        future, numbers = self.indexes.get(event.inaxes) or self.build(event.inaxes)
+        if not future.done():
+            return None
+        visible = [self.axes.lines[number].get_visible() for number in numbers]
+        hit = future.result().nearest(event.xdata, event.ydata, self.PICK_RADIUS, pixel_scale(event.inaxes, event.xdata, event.ydata), visible)
+        if hit is None:
+            return None
+        trace, position, _ = hit
+        number = numbers[trace]
+        return number, self.axes.traces[number]['x'][position], self.axes.traces[number]['y'][position]
+
+    def on_motion(self, event):
+        # No readout while panning or zooming
+        if event.button is not None or self.axes.toolbar.mode:
+            return
+        hit = self.pick(event)
+        if hit is None:
+            if self.hit is not None:
+                QToolTip.hideText()
+            self.hit = None
+            return
+        if hit == self.hit:
+            return
+        self.hit = hit
+        QToolTip.showText(QCursor.pos() + QPoint(12, 12), self.text(*hit), self.axes.canvas)
+
+    def on_click(self, event):
+        if event.button != 1 or self.axes.toolbar.mode:
+            return
+        hit = self.pick(event)
+        self.unpin()
+        if hit is not None:
+            self.pin(*hit)
+        self.axes.canvas.draw_idle()
+
+    def pin(self, trace, x, y):
+        ax = self.axes.lines[trace].axes
+        color = self.axes.lines[trace].get_color()
+        self.marker = Line2D([x], [y], marker='o', markersize=6, color=color, linestyle='none', zorder=Line2D.zorder + 2)
+        ax.add_line(self.marker)
+        self.annotation = ax.annotate(
+            self.text(trace, x, y), xy=(x, y), xytext=(10, 10), textcoords='offset points', fontsize=8,
+            bbox={'boxstyle': 'round', 'facecolor': 'white', 'edgecolor': color, 'alpha': 0.9}
+        )
+
+    def unpin(self):
+        for artist in (self.marker, self.annotation):
+            if artist is not None:
+                artist.remove()
+        self.marker = None
+        self.annotation = None
+
+    def text(self, trace, x, y):
+        # Panels share x, only the bottom one carries the x label
+        ax = self.axes.lines[trace].axes
+        info = self.axes.traces[trace]
+        lines = [
+            str(info['label']),
+            f"{self.axes.panels[-1].get_xlabel()}: {num_to_str(x, self.DISPLAY)}",
+            f"{ax.get_ylabel()}: {num_to_str(y, self.DISPLAY)}"
+        ]
+        for key, value in info.get('meta', {}).items():
+            lines.append(f"{key}: {num_to_str(value, self.DISPLAY)}")
+        return "\n".join(lines)
+
+def pixel_scale(ax, x, y):
+    # Pixels per data unit along x and y around (x, y), log axes included
+    dx, dy = abs(x) * 1e-3 or 1e-3, abs(y) * 1e-3 or 1e-3
+    origin, right, up = ax.transData.transform([(x, y), (x + dx, y), (x, y + dy)])
+    return np.hypot(*(right - origin)) / dx, np.hypot(*(up - origin)) / dy
+
+def index_traces(traces, resolution):
+    # Scaled by the extent of all traces, one cell size suits signals of any units
+    low, high = np.full(2, np.inf), np.full(2, -np.inf)
+    for trace in traces:
+        for axis, values in enumerate(trace):
+            finite = values[np.isfinite(values)]
+            if len(finite):
+                low[axis], high[axis] = min(low[axis], finite.min()), max(high[axis], finite.max())
+    span = high - low
+    span[~(span > 0)] = 1
+    return PointIndex(traces, resolution=1 / resolution, scale=1 / span)
@@ -0,0 +1,199 @@
+import os
+
+# Formats written as vector paths, where trace count drives file size
+VECTOR_FORMATS = ('svg', 'svgz', 'pdf', 'eps', 'ps')
+
+# Output options, see configs.yaml 'export' for the user facing settings
+DEFAULT_OPTIONS = {
+    'downsample': True,         # serve traces from the LOD pyramid at output resolution
+    'rasterizePoints': 1000000, # vector exports rasterize the traces above this many points (0 disables)
+    'rasterDpi': 300            # resolution of rasterized traces and of the simplification threshold
+}
+
+# Style applied to batch figures unless a spec overrides it
+DEFAULT_STYLE = {
+    'size': (6.4, 4.8),
+    'dpi': 150,
+    'linewidth': 1.5,
+    'colors': None,
+    'title': None,
+    'legend': False,
+    'grid': False,
+    'xlim': None,
+    'ylim': None,
+    'xscale': 'linear',
+    'yscale': 'linear'
+}
+
+def panel_snapshot(panel, traces, lines):
+    return {
+        'ylabel': panel.get_ylabel(),
+        'ylim': panel.get_ylim(),
+        'yscale': panel.get_yscale(),
+        'traces': [
+            {
+                'x': trace['x'],
+                'y': trace['y'],
+                'label': trace['label'],
+                'color': line.get_color(),
+                'linewidth': line.get_linewidth()
+            }
+            for trace, line in zip(traces, lines) if line.axes is panel
+        ]
+    }
+
+def figure_snapshot(axes):
+    # Plain data describing what the Axes widget shows, taken on the GUI thread.
+    # Traces reference the full resolution arrays, the plotted lines may be decimated.
+    # Small-multiples add 'panels', one entry per panel stacked on the shared x-axis.
+    ax = axes.axes
+    panels = [panel_snapshot(panel, axes.traces, axes.lines) for panel in axes.panels]
+    snapshot = {
+        'size': tuple(axes.figure.get_size_inches()),
+        'dpi': axes.figure.dpi,
+        'xlabel': axes.panels[-1].get_xlabel(),
+        'xlim': ax.get_xlim(),
+        'xscale': ax.get_xscale(),
+        'hgrid': axes.toolbar.is_h_grid_enabled(),
+        'vgrid': axes.toolbar.is_v_grid_enabled(),
+        **panels[0]
+    }
+    if len(panels) > 1:
+        snapshot['panels'] = panels
+    return snapshot
+
+def result_snapshot(model, spec):
+    # Snapshot for a batch spec, built straight from the model's result store:
+    #   {'x': signal, 'y': signal, 'conditions': None | [labels] | callable(result) -> bool,
+    #    'style': {...DEFAULT_STYLE overrides}}
+    # The callable receives the getResult entry (x, y, label and meta).
+    import matplotlib
+    from matplotlib.colors import to_hex
+    style = {**DEFAULT_STYLE, **spec.get('style', {})}
+    options = {**DEFAULT_OPTIONS, **spec.get('options', {})}
+    results = model.getResult(spec['x'], spec['y'], copy=False)
+    if not results:
+        raise ValueError(f"No results for {spec['x']} vs {spec['y']}")
+    conditions = spec.get('conditions')
+    if conditions is None:
+        data = results['data']
+    elif callable(conditions):
+        data = [result for result in results['data'] if conditions(result)]
+    else:
+        data = [result for result in results['data'] if result['label'] in conditions]
+    colors = style['colors'] or matplotlib.rcParams['axes.prop_cycle'].by_key().get('color', ['C0'])
+    return {
+        'size': style['size'],
+        'dpi': style['dpi'],
+        'options': options,
+        'title': style['title'],
+        'legend': style['legend'],
+        'xlabel': results['label']['x'],
+        'ylabel': results['label']['y'],
+        'xlim': style['xlim'],
+        'ylim': style['ylim'],
+        'xscale': style['xscale'],
+        'yscale': style['yscale'],
+        'hgrid': style['grid'],
+        'vgrid': style['grid'],
+        'traces': [
+            {
+                'x': result['x'],
+                'y': result['y'],
+                'label': result['label'],
+                'color': to_hex(colors[index % len(colors)]),
+                'linewidth': style['linewidth']
+            }
+            for index, result in enumerate(data)
+        ]
+    }
+
+def output_traces(snapshot, pixels, traces=None):
+    # Trace data as written: downsampled from the LOD pyramid to the output width
+    # (extrema are kept, so nothing visible is lost) over the exported x-range
+    from src.main.utils import TracePyramid
+    options = {**DEFAULT_OPTIONS, **snapshot.get('options', {})}
+    xlim = snapshot.get('xlim')
+    xmin, xmax = sorted(xlim) if xlim is not None else (None, None)
+    for trace in snapshot['traces'] if traces is None else traces:
+        if options['downsample']:
+            yield TracePyramid(trace['x'], trace['y']).query(xmin, xmax, pixels)
+        else:
+            yield trace['x'], trace['y']
+
+def render_figure(snapshot, file_path, progress=None):
+    # Rebuild the figure headless and save it; safe to call off the GUI thread
+    # or in another process since nothing here touches Qt or the on-screen figure.
+    import matplotlib
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    options = {**DEFAULT_OPTIONS, **snapshot.get('options', {})}
+    vector = os.path.splitext(file_path)[1].lower().lstrip('.') in VECTOR_FORMATS
+    # Output resolution: the raster dpi for vector formats, the figure dpi otherwise
+    dpi = options['rasterDpi'] if vector else snapshot['dpi']
+    figure = Figure(figsize=snapshot['size'], dpi=snapshot['dpi'])
+    FigureCanvasAgg(figure)
+    panels = snapshot.get('panels') or [snapshot]
+    axes = figure.subplots(len(panels), 1, sharex=True, squeeze=False)[:, 0]
+    data = [list(output_traces(snapshot, snapshot['size'][0] * dpi, panel['traces'])) for panel in panels]
+    # Dense bundles become one embedded image, axes and text stay vector
+    rasterize = vector and 0 < options['rasterizePoints'] < sum(len(x) for traces in data for x, _ in traces)
+    total = sum(len(panel['traces']) for panel in panels)
+    drawn = 0
+    for ax, panel, traces in zip(axes, panels, data):
+        for trace, (x, y) in zip(panel['traces'], traces):
+            line, = ax.plot(x, y, label=trace['label'], color=trace['color'], linewidth=trace['linewidth'])
+            line.set_rasterized(rasterize)
+            drawn += 1
+            if progress is not None:
+                progress(0.5 * drawn / total)
+        ax.set_ylabel(panel['ylabel'])
+        ax.set_yscale(panel['yscale'])
+        if panel.get('ylim') is not None:
+            ax.set_ylim(panel['ylim'])
+        if snapshot['hgrid']:
+            ax.yaxis.grid(True)
+        if snapshot['vgrid']:
+            ax.xaxis.grid(True)
+    ax = axes[0]
+    axes[-1].set_xlabel(snapshot['xlabel'])
+    ax.set_xscale(snapshot['xscale'])
+    if snapshot.get('xlim') is not None:
+        ax.set_xlim(snapshot['xlim'])
+    if snapshot.get('title'):
+        ax.set_title(snapshot['title'])
+    if snapshot.get('legend') and panels[0]['traces']:
+        ax.legend(fontsize='small')
+    if progress is not None:
+        progress(0.5)
+    # Simplify paths to half an output pixel (vector units are points, 1/72 in)
+    threshold = 0.5 * 72 / dpi if vector else matplotlib.rcParams['path.simplify_threshold']
+    with matplotlib.rc_context({'path.simplify': True, 'path.simplify_threshold': threshold}):
+        figure.savefig(file_path, dpi=dpi)
+    return file_path
+
+def figure_jobs(model, specs):
+    # (snapshot, path) pairs for a list of specs, each with a 'path' whose
+    # extension picks PNG/SVG/PDF. Build these where the model is owned (GUI thread).
+    return [(result_snapshot(model, spec), spec['path']) for spec in specs]
+
+def render_figures(jobs, max_workers=None, progress=None):
+    # Render (snapshot, path) jobs in a pool of headless processes; workers only
+    # receive the arrays they draw. Returns the written paths in job order.
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    for _, path in jobs:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # Spawned workers do not inherit the GUI process' threads or Qt state
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+        futures = [executor.submit(render_figure, snapshot, path) for snapshot, path in jobs]
+        try:
+            for done, future in enumerate(as_completed(futures)):
+                future.result()
+                if progress is not None:
+                    progress((done + 1) / len(futures))
+        except BaseException:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+    return [path for _, path in jobs]
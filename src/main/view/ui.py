@@ -5,7 +5,7 @@ import os
 import yaml
 from PyQt6 import QtCore
 from PyQt6.QtWidgets import (
-    QApplication, QMainWindow, QVBoxLayout, QLabel, QPushButton, QHBoxLayout, QFrame, QListWidget, QListWidgetItem, QStackedWidget, QWidget, QGridLayout, QMenuBar, QMenu, QStatusBar, QScrollArea, QSizePolicy, QSpacerItem, QProgressBar
+    QApplication, QMainWindow, QVBoxLayout, QLabel, QPushButton, QHBoxLayout, QFrame, QListWidget, QListWidgetItem, QStackedWidget, QWidget, QGridLayout, QMenuBar, QMenu, QStatusBar, QScrollArea, QSizePolicy, QSpacerItem, QProgressBar, QToolButton
 )
 from PyQt6.QtGui import (
     QFontDatabase, QIcon, QPixmap, QFont, QAction, QKeySequence, QShortcut
@@ -15,6 +15,7 @@ from PyQt6.QtCore import Qt, QSize, pyqtSignal, QRect
 # local imports
 from src.main.app.baseapp import BaseApp
 from src.main.view.components import CollapsibleSection, Axes
+from src.main.view.figureexport import figure_snapshot, render_figure
 
 # utilities
 from src.main.utils import camel_to_title
@@ -23,6 +24,7 @@ class MainView(QMainWindow, BaseApp):
     requestUndo = pyqtSignal()
     requestRedo = pyqtSignal()
     interruptSim = pyqtSignal()
+    cancelExport = pyqtSignal()
     
     def __init__(self):
         super().__init__()
@@ -211,6 +213,17 @@ class MainView(QMainWindow, BaseApp):
         self.statusProgressBar.setFixedSize(100, 16)
         self.statusProgressBar.setVisible(False)
         status_layout.addWidget(self.statusProgressBar)
+
+        # Cancel button, shown while exports are running
+        self.statusCancelButton = QToolButton()
+        self.statusCancelButton.setObjectName("statusbar_cancel")
+        self.statusCancelButton.setIcon(QIcon(self.getResource('icons', 'circle-xmark-solid.svg')))
+        self.statusCancelButton.setToolTip("Cancel exports")
+        self.statusCancelButton.setAutoRaise(True)
+        self.statusCancelButton.setFixedSize(18, 18)
+        self.statusCancelButton.setVisible(False)
+        self.statusCancelButton.clicked.connect(self.cancelExport.emit)
+        status_layout.addWidget(self.statusCancelButton)
         
         self.statusbar.addPermanentWidget(status_container)
         
@@ -224,6 +237,10 @@ class MainView(QMainWindow, BaseApp):
         self.actionConfiguration.setObjectName("actionConfiguration")
         self.actionImport = QAction(parent=self)
         self.actionImport.setObjectName("actionImport")
+        self.actionOpenSession = QAction(parent=self)
+        self.actionOpenSession.setObjectName("actionOpenSession")
+        self.actionSaveSession = QAction(parent=self)
+        self.actionSaveSession.setObjectName("actionSaveSession")
         self.actionParameters = QAction(parent=self)
         self.actionParameters.setObjectName("actionParameters")
         self.actionSolution = QAction(parent=self)
@@ -236,13 +253,20 @@ class MainView(QMainWindow, BaseApp):
         self.actionQuit.setObjectName("actionQuit")
         self.actionResetSettings = QAction(parent=self)
         self.actionResetSettings.setObjectName("actionResetSettings")
+        self.actionExportTrace = QAction(parent=self)
+        self.actionExportTrace.setObjectName("actionExportTrace")
 
+        self.menuFile.addAction(self.actionOpenSession)
+        self.menuFile.addAction(self.actionSaveSession)
+        self.menuFile.addSeparator()
         self.menuFile.addAction(self.actionImport)
         self.menuFile.addAction(self.actionExport)
+        self.menuFile.addAction(self.actionFigures)
         self.menuFile.addAction(self.actionQuit)
         self.menuEdit.addAction(self.actionConfiguration)
         self.menuHelp.addAction(self.actionAbout)
         self.menuHelp.addAction(self.actionResetSettings)
+        self.menuHelp.addAction(self.actionExportTrace)
         self.menubar.addAction(self.menuFile.menuAction())
         self.menubar.addAction(self.menuEdit.menuAction())
         self.menubar.addAction(self.menuHelp.menuAction())
@@ -327,11 +351,14 @@ class MainView(QMainWindow, BaseApp):
         self.menuHelp.setTitle(_translate("MainWindow", "Help"))
         self.actionAbout.setText(_translate("MainWindow", "About"))
         self.actionResetSettings.setText(_translate("MainWindow", "Reset Settings"))
+        self.actionExportTrace.setText(_translate("MainWindow", "Export Timing Trace..."))
         self.actionConfiguration.setText(_translate("MainWindow", "Configuration"))
         self.actionImport.setText(_translate("MainWindow", "Import..."))
+        self.actionOpenSession.setText(_translate("MainWindow", "Open Session..."))
+        self.actionSaveSession.setText(_translate("MainWindow", "Save Session..."))
         self.actionParameters.setText(_translate("MainWindow", "Parameters"))
         self.actionSolution.setText(_translate("MainWindow", "Solution"))
-        self.actionFigures.setText(_translate("MainWindow", "Figures"))
+        self.actionFigures.setText(_translate("MainWindow", "Export Figure Set..."))
         self.actionExport.setText(_translate("MainWindow", "Export..."))
         self.actionQuit.setText(_translate("MainWindow", "Quit"))
         
@@ -438,15 +465,12 @@ class MainView(QMainWindow, BaseApp):
         self.axes.clear()
     
     def updatePlot(self,results):
-        # Results are in the format:
+        # Results are a list with one entry per panel, each in the format:
         # {
             # label:{x:label (unit), y: label (unit)}, 
             # data: [{x:data,y:data,label:stim R*}]
         # }
-        self.clearPlot()
-        self.axes.setAxesLabels(results['label'])
-        for result in results['data']:
-            self.axes.append(result)
+        self.axes.plot_panels(results)
     
     def get_param(self, section_id, line_item_id):
         section = self.param_sections.get(section_id)
@@ -461,7 +485,13 @@ class MainView(QMainWindow, BaseApp):
             
     def setStatus(self,message):
         self.statustext.setText(message)
+
+    def setStatusToolTip(self, message):
+        self.statustext.setToolTip(message)
     
+    def setExportActive(self, active):
+        self.statusCancelButton.setVisible(active)
+
     def updateStatusBarProgress(self, progress):
         if progress < 0:
             self.statusProgressBar.hide()
@@ -520,7 +550,10 @@ class MainView(QMainWindow, BaseApp):
                 section.setValue(line_id,value)
 
     def save_figure(self, file_path):
-        self.axes.figure.savefig(file_path)
+        render_figure(self.figureSnapshot(), file_path)
+
+    def figureSnapshot(self):
+        return figure_snapshot(self.axes)
 
     def export_figure_data(self):
         self.axes.toolbar.pop_data()
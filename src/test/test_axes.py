@@ -0,0 +1,107 @@
+import unittest
+import sys
+from unittest import mock
+import numpy as np
+from PyQt6.QtWidgets import QApplication
+
+from src.main.model.phototransduction import Phototransduction
+from src.main.view.components.axes import Axes
+from src.main.view.figureexport import figure_snapshot
+from src.main.utils import TracePyramid
+
+class TestAxesPanels(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication(sys.argv)
+        cls.model = Phototransduction(responseDuration=0.5)
+        cls.model.setParam(betaDark=[2, 4, 8])
+        cls.model.simulate(stimulusIntensities=[100])
+
+    def setUp(self):
+        self.axes = Axes()
+        self.axes.update_axes_options(self.model.getLabels(), 'time', 'Ca')
+
+    def test_panels_share_x(self):
+        self.axes.plot_panels(self.model.getResults('time', ['Ca', 'cGMP', 'PDEstar']))
+        self.assertEqual(len(self.axes.panels), 3)
+        self.assertEqual(len(self.axes.lines), 9)
+        self.assertEqual(self.axes.legend.count(), 3)
+        self.assertEqual(self.axes.panels[1].get_ylabel(), self.model.getResult('time', 'cGMP')['label']['y'])
+        # Every panel draws from the same stored time arrays
+        for index in range(3):
+            top, middle, bottom = self.axes.traces[index::3]
+            self.assertTrue(np.shares_memory(top['x'], bottom['x']))
+            self.assertFalse(top['x'].flags.writeable)
+        self.axes.axes.set_xlim(0, 0.1)
+        self.assertEqual(self.axes.panels[2].get_xlim(), (0, 0.1))
+        self.assertEqual(len(self.axes.get_traces()), 3)
+
+    def test_panels_update_together(self):
+        self.axes.plot_panels(self.model.getResults('time', ['Ca', 'cGMP']))
+        lines = list(self.axes.lines)
+        self.axes.plot_panels(self.model.getResults('time', ['Ca', 'PDEstar']))
+        # Same layout reuses every line
+        self.assertEqual(self.axes.lines, lines)
+        self.axes.highlight_trace(1)
+        self.assertEqual(lines[1].get_linewidth(), lines[4].get_linewidth())
+        self.assertGreater(lines[1].get_linewidth(), lines[0].get_linewidth())
+        self.axes.plot(self.model.getResult('time', 'Ca'))
+        self.assertEqual(len(self.axes.panels), 1)
+        self.assertEqual(len(self.axes.lines), 3)
+
+    def test_panel_selection(self):
+        self.assertEqual(self.axes.getAxesDataLabels()['panels'], [])
+        received = []
+        self.axes.axes_changed.connect(received.append)
+        for action in self.axes.panels_menu.actions():
+            if action.text() in ('Ca', 'cGMP'):
+                action.trigger()
+        # The Y-Axis signal is not repeated as a panel
+        self.assertEqual(received[-1]['panels'], ['cGMP'])
+
+    def test_snapshot_panels(self):
+        self.axes.plot_panels(self.model.getResults('time', ['Ca', 'cGMP']))
+        snapshot = figure_snapshot(self.axes)
+        self.assertEqual(len(snapshot['panels']), 2)
+        self.assertEqual([len(panel['traces']) for panel in snapshot['panels']], [3, 3])
+        self.assertEqual(snapshot['traces'], snapshot['panels'][0]['traces'])
+
+    def test_long_traces_decimated_once(self):
+        x = np.linspace(0, 1, 20000)
+        x.flags.writeable = False
+        def panel(signal, scales):
+            return {'data': [{'x': x, 'y': scale * signal, 'label': str(scale)} for scale in scales], 'label': {'x': 'time', 'y': 'y'}}
+        first, second = panel(np.sin(x * 40), (1, 2, 3)), panel(np.cos(x * 40), (1, 2, 3))
+        with mock.patch.object(TracePyramid, 'query', autospec=True, side_effect=TracePyramid.query) as query:
+            self.axes.plot_panels([first, second])
+        # One level of detail pass per trace, not one per autoscale
+        self.assertEqual(query.call_count, 6)
+        pyramids = list(self.axes.pyramids)
+        # Only the second panel's signal changes: the first keeps its pyramids, the x check is reused
+        with mock.patch.object(np, 'diff', wraps=np.diff) as diff:
+            self.axes.plot_panels([first, panel(np.sin(x * 80), (1, 2, 3))])
+        self.assertEqual(self.axes.pyramids[:3], pyramids[:3])
+        self.assertIsNot(self.axes.pyramids[3], pyramids[3])
+        diff.assert_not_called()
+
+    def test_hover_index_survives_zoom(self):
+        from matplotlib.backend_bases import MouseEvent
+        self.axes.plot_panels(self.model.getResults('time', ['Ca']))
+        panel = self.axes.axes
+        trace = self.axes.traces[1]
+        def pick(position):
+            x, y = panel.transData.transform((trace['x'][position], trace['y'][position]))
+            return self.axes.cursor.pick(MouseEvent('motion_notify_event', self.axes.canvas, x, y))
+        pick(250)
+        future, _ = self.axes.cursor.indexes[panel]
+        future.result()
+        self.assertEqual(pick(250)[0], 1)
+        # Zooming reuses the index and reads out the exact sample
+        panel.set_xlim(trace['x'][240], trace['x'][260])
+        panel.set_ylim(trace['y'][260], trace['y'][240])
+        hit = pick(251)
+        self.assertIs(self.axes.cursor.indexes[panel][0], future)
+        self.assertEqual(hit[1:], (trace['x'][251], trace['y'][251]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import unittest
+import sys
+import time
+from unittest import mock
+from PyQt6.QtWidgets import QApplication
+
+from src.main.model.phototransduction import Phototransduction
+from src.main.model.workerpool import INTERACTIVE, BACKGROUND
+from src.main.model.resultstore import result_bytes
+from src.main.view.ui import MainView
+from src.main.controller.controller import Controller
+
+class TestController(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication(sys.argv)
+
+    def setUp(self):
+        self.model = Phototransduction()
+        self.view = MainView()
+        # Start from the defaults, not the user's saved settings
+        with mock.patch.object(Controller, 'load_settings'):
+            self.controller = Controller(self.model, self.view)
+        self.edit("stimulusConfiguration", "responseDuration", 0.5)
+
+    def tearDown(self):
+        self.controller.onInterruptSim()
+        self.controller.pool.shutdown(cancel_futures=True)
+        self.controller.stopExportWorker()
+        self.view.close()
+
+    def edit(self, section, name, value):
+        self.controller.updateModel(section, name, value)
+        self.controller.pushSnapshot()
+
+    def wait_for(self, condition, timeout=60):
+        end = time.monotonic() + timeout
+        while not condition():
+            self.assertLess(time.monotonic(), end, "timed out")
+            self.app.processEvents()
+            time.sleep(0.005)
+
+    def test_preview_runs_next_to_sweep(self):
+        self.edit("modelParameters", "betaDark", [float(value) for value in range(1, 41)])
+        sweep_state = self.controller.param_actions_buffer.current()
+        self.controller.runSimulation()
+        self.wait_for(lambda: BACKGROUND in self.controller.runs)
+        sweep = self.controller.runs[BACKGROUND]
+
+        self.edit("modelParameters", "betaDark", 4.1)
+        self.controller.runSimulation()
+        self.wait_for(lambda: self.model.results is not None and len(self.model.results) == 1)
+        # The preview was shown while the sweep kept running
+        self.assertIs(self.controller.runs.get(BACKGROUND), sweep)
+        self.assertTrue(sweep.thread.isRunning())
+
+        self.wait_for(lambda: BACKGROUND not in self.controller.runs)
+        # The finished sweep does not replace the newer preview, it is cached with its parameters
+        self.assertEqual(len(self.model.results), 1)
+        cached = next(state for state in self.controller.param_actions_buffer if state.parameters is sweep_state.parameters)
+        self.assertEqual(len(cached.results), 40)
+
+    def test_same_class_request_supersedes(self):
+        self.edit("modelParameters", "betaDark", [float(value) for value in range(1, 41)])
+        self.controller.runSimulation()
+        self.wait_for(lambda: BACKGROUND in self.controller.runs)
+        first = self.controller.runs[BACKGROUND]
+        self.edit("modelParameters", "betaDark", [2.0, 4.0])
+        self.controller.runSimulation()
+        self.wait_for(lambda: self.model.results is not None and len(self.model.results) == 2)
+        # The outdated sweep was stopped, not left to finish
+        self.assertNotIn(first, self.controller.runs.values())
+        self.assertIsNone(first.snapshot.results)
+
+    def test_request_follows_class_switch(self):
+        with mock.patch.object(self.controller, 'initSimulation', wraps=self.controller.initSimulation) as initSimulation:
+            # A sweep request, then a single family within the debounce window
+            self.edit("modelParameters", "betaDark", [1.0, 2.0, 3.0])
+            self.controller.requestSimulation()
+            self.edit("modelParameters", "betaDark", 4.1)
+            self.controller.requestSimulation()
+            self.wait_for(lambda: self.model.results is not None and not self.controller.runs)
+            self.app.processEvents()
+        # The state was simulated once, in its own class
+        self.assertEqual([call.args for call in initSimulation.call_args_list], [(INTERACTIVE,)])
+        self.assertEqual(len(self.model.results), 1)
+
+    def test_restore_within_debounce_does_not_solve(self):
+        cached = self.simulate(2.0)
+        self.edit("modelParameters", "betaDark", [1.0, 2.0, 3.0])
+        with mock.patch.object(self.controller, 'initSimulation') as initSimulation:
+            self.controller.requestSimulation()
+            self.controller.undo()
+            # The sweep request left waiting finds the restored state already solved
+            self.controller.schedulers[BACKGROUND].dispatch()
+            self.app.processEvents()
+        initSimulation.assert_not_called()
+        self.assertIs(self.model.results, cached)
+        self.assertFalse(any(scheduler.active for scheduler in self.controller.schedulers.values()))
+
+    def simulate(self, value):
+        self.edit("modelParameters", "betaDark", value)
+        self.controller.runSimulation()
+        self.wait_for(lambda: self.controller.param_actions_buffer.current().results is not None and not self.controller.runs)
+        return self.controller.param_actions_buffer.current().results
+
+    def test_undo_redo_uses_cached_results(self):
+        stores = [self.simulate(value) for value in (1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0)]
+        with mock.patch.object(self.controller, 'initSimulation') as initSimulation:
+            for store in reversed(stores[:-1]):
+                self.controller.undo()
+                self.assertIs(self.model.results, store)
+            for store in stores[1:]:
+                self.controller.redo()
+                self.assertIs(self.model.results, store)
+            self.app.processEvents()
+        # Every state was redrawn from its results, nothing was simulated again
+        initSimulation.assert_not_called()
+        self.assertFalse(any(scheduler.pending for scheduler in self.controller.schedulers.values()))
+
+    def test_cached_results_memory_budget(self):
+        stores = [self.simulate(value) for value in (1.0, 2.0, 3.0)]
+        # Room for two result sets: the oldest state gives up its results
+        self.view.setConfig("simulation", "undoResultMemory", 2.5 * result_bytes(stores[0]) / 2**20)
+        stores.append(self.simulate(4.0))
+        cached = [state.results for state in self.controller.param_actions_buffer if state.results is not None]
+        self.assertEqual([id(store) for store in cached], [id(stores[3]), id(stores[2])])
+        # Restoring a state without results simulates it again
+        self.controller.undo()
+        self.controller.undo()
+        self.assertIsNone(self.controller.param_actions_buffer.current().results)
+        self.controller.runSimulation()
+        self.wait_for(lambda: self.controller.param_actions_buffer.current().results is not None and not self.controller.runs)
+        self.assertEqual(self.model.results[0]['modelParameters']['betaDark'], 2.0)
+
+if __name__ == '__main__':
+    unittest.main()
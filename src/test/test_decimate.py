@@ -0,0 +1,60 @@
+import unittest
+import numpy as np
+
+from src.main.utils import TracePyramid
+
+class TestTracePyramid(unittest.TestCase):
+
+    def setUp(self):
+        self.x = np.linspace(0, 10, 200001)
+        self.y = np.sin(self.x * 7) + 0.01 * np.cos(self.x * 900)
+        # Single sample spikes that naive striding would miss
+        self.y[12345] = 5.0
+        self.y[150001] = -4.0
+        self.pyramid = TracePyramid(self.x, self.y)
+
+    def test_short_trace_is_not_decimated(self):
+        x = np.arange(100)
+        pyramid = TracePyramid(x, x ** 2)
+        qx, qy = pyramid.query(0, 99, 10)
+        np.testing.assert_array_equal(qy, x ** 2)
+
+    def test_full_view_keeps_extrema(self):
+        qx, qy = self.pyramid.query(self.x[0], self.x[-1], 800)
+        self.assertLess(len(qy), 8 * 800)
+        self.assertEqual(qy.max(), 5.0)
+        self.assertEqual(qy.min(), -4.0)
+        self.assertEqual(qx[0], self.x[0])
+        self.assertEqual(qx[-1], self.x[-1])
+
+    def test_points_per_pixel(self):
+        # Two to four samples per pixel whatever the width or zoom
+        for xmin, xmax in ((self.x[0], self.x[-1]), (1.0, 6.0), (2.0, 2.9)):
+            for pixels in (300, 1000, 1200):
+                qx, qy = self.pyramid.query(xmin, xmax, pixels)
+                self.assertLessEqual(len(qx), 4 * pixels + 8)
+                self.assertGreaterEqual(len(qx), pixels)
+                self.assertTrue(np.all(np.diff(qx) > 0))
+
+    def test_zoom_serves_finer_level(self):
+        full_x, _ = self.pyramid.query(self.x[0], self.x[-1], 800)
+        zoom_x, zoom_y = self.pyramid.query(0.5, 0.7, 800)
+        # Zoomed range covers the spike and is served within the view only
+        self.assertEqual(zoom_y.max(), 5.0)
+        self.assertLessEqual(zoom_x[0], 0.5)
+        self.assertGreaterEqual(zoom_x[-1], 0.7)
+        self.assertLess(zoom_x[-1] - zoom_x[0], 0.3)
+        # Narrow ranges fall back to the raw samples
+        raw_x, _ = self.pyramid.query(0.6, 0.6001, 800)
+        np.testing.assert_array_equal(raw_x, self.x[(self.x >= 0.6 - 5e-5) & (self.x <= 0.6001 + 5e-5)])
+
+    def test_non_monotonic_x(self):
+        x = np.cos(np.linspace(0, 20, 50000))
+        pyramid = TracePyramid(x, np.sin(np.linspace(0, 20, 50000)))
+        self.assertFalse(pyramid.monotonic)
+        qx, qy = pyramid.query(-0.1, 0.1, 500)
+        self.assertLess(len(qx), 50000)
+        self.assertAlmostEqual(qy.max(), pyramid.y.max())
+
+if __name__ == '__main__':
+    unittest.main()
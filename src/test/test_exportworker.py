@@ -0,0 +1,58 @@
+import unittest
+import sys
+from PyQt6.QtWidgets import QApplication
+
+from src.main.model.exportworker import ExportWorker
+
+class TestExportWorker(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication(sys.argv)
+
+    def setUp(self):
+        self.worker = ExportWorker()
+        self.events = []
+        self.worker.started.connect(lambda name: self.events.append(('started', name)))
+        self.worker.finished.connect(lambda name: self.events.append(('finished', name)))
+        self.worker.cancelled.connect(lambda name: self.events.append(('cancelled', name)))
+        self.worker.error.connect(lambda name, message: self.events.append(('error', name)))
+        self.progress = []
+        self.worker.progress.connect(self.progress.append)
+
+    def run_jobs(self):
+        # Run the queue in this thread, stop() only ends the loop once the jobs are drained
+        self.worker._jobs.put(None)
+        self.worker.run()
+
+    def test_jobs_run_in_order_with_throttled_progress(self):
+        def job(steps, progress=None):
+            for step in range(steps):
+                progress((step + 1) / steps)
+        self.worker.submit("a", job, 1000)
+        self.worker.submit("b", job, 2)
+        self.run_jobs()
+        self.assertEqual(self.events, [('started', 'a'), ('finished', 'a'), ('started', 'b'), ('finished', 'b')])
+        # At most one emit per percent, capped below 100
+        self.assertLessEqual(len(self.progress), 102)
+        self.assertEqual(max(self.progress), 99)
+
+    def test_cancel_stops_running_and_drops_queued_jobs(self):
+        def job(progress=None):
+            self.worker.cancel()
+            progress(0.5)
+            self.events.append(('continued', None))
+        self.worker.submit("a", job)
+        self.worker.submit("b", job)
+        self.run_jobs()
+        self.assertEqual(self.events, [('started', 'a'), ('cancelled', 'a'), ('cancelled', 'b')])
+
+    def test_errors_do_not_stop_the_queue(self):
+        def failing(progress=None):
+            raise OSError("disk full")
+        self.worker.submit("a", failing)
+        self.worker.submit("b", lambda progress=None: None)
+        self.run_jobs()
+        self.assertEqual(self.events, [('started', 'a'), ('error', 'a'), ('started', 'b'), ('finished', 'b')])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import unittest
+import tempfile
+
+from src.main.model.phototransduction import Phototransduction
+import numpy as np
+
+from src.main.view.figureexport import result_snapshot, figure_jobs, render_figures, render_figure, output_traces
+
+class TestFigureExport(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.model = Phototransduction(responseDuration=0.5)
+        cls.model.setParam(betaDark=[2, 4, 8])
+        cls.model.simulate(stimulusIntensities=[100])
+
+    def test_snapshot_labels_and_condition_filters(self):
+        snapshot = result_snapshot(self.model, {'x': 'time', 'y': 'Ca'})
+        self.assertEqual(snapshot['ylabel'], 'Calcium (Ca)')
+        self.assertEqual(len(snapshot['traces']), 3)
+        labels = [trace['label'] for trace in snapshot['traces']]
+        by_label = result_snapshot(self.model, {'x': 'time', 'y': 'Ca', 'conditions': labels[:1]})
+        self.assertEqual([trace['label'] for trace in by_label['traces']], labels[:1])
+        by_meta = result_snapshot(self.model, {
+            'x': 'time', 'y': 'Ca', 'conditions': lambda result: result['meta']['betaDark'] > 3
+        })
+        self.assertEqual(len(by_meta['traces']), 2)
+
+    def test_render_in_process_pool(self):
+        with tempfile.TemporaryDirectory() as directory:
+            specs = [
+                {'x': 'time', 'y': y, 'path': os.path.join(directory, f"{y}.{extension}"), 'style': {'legend': True}}
+                for y, extension in (('Ca', 'png'), ('cGMP', 'svg'), ('PDEstar', 'pdf'))
+            ]
+            fractions = []
+            paths = render_figures(figure_jobs(self.model, specs), max_workers=2, progress=fractions.append)
+            self.assertEqual(paths, [spec['path'] for spec in specs])
+            for path in paths:
+                self.assertGreater(os.path.getsize(path), 0)
+            self.assertEqual(fractions[-1], 1)
+
+    def dense_snapshot(self, **options):
+        x = np.linspace(0, 1, 50001)
+        traces = [
+            {'x': x, 'y': np.sin(x * (5 + index)), 'label': str(index), 'color': '#1f77b4', 'linewidth': 1}
+            for index in range(5)
+        ]
+        traces[0]['y'][12345] = 4.0
+        return {
+            'size': (4, 3), 'dpi': 100, 'xlabel': 't', 'ylabel': 'y', 'xlim': None, 'ylim': None,
+            'xscale': 'linear', 'yscale': 'linear', 'hgrid': False, 'vgrid': False,
+            'traces': traces, 'options': options
+        }
+
+    def test_downsampled_traces_keep_extrema(self):
+        snapshot = self.dense_snapshot()
+        x, y = next(output_traces(snapshot, 400))
+        self.assertLess(len(y), 50001 // 10)
+        self.assertEqual(y.max(), 4.0)
+        x, y = next(output_traces(self.dense_snapshot(downsample=False), 400))
+        self.assertEqual(len(y), 50001)
+
+    def test_dense_vector_traces_are_rasterized(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "dense.svg")
+            render_figure(self.dense_snapshot(rasterizePoints=1000, rasterDpi=100), path)
+            with open(path) as file:
+                self.assertEqual(file.read().count('<image'), 1)
+            render_figure(self.dense_snapshot(rasterizePoints=0), path)
+            with open(path) as file:
+                self.assertEqual(file.read().count('<image'), 0)
+
+    def test_render_panels(self):
+        snapshot = self.dense_snapshot(rasterizePoints=0)
+        top = {'ylabel': 'top', 'ylim': None, 'yscale': 'linear', 'traces': snapshot['traces'][:2]}
+        bottom = {'ylabel': 'bottom', 'ylim': (-1, 1), 'yscale': 'linear', 'traces': snapshot['traces'][2:]}
+        snapshot['panels'] = [top, bottom]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "panels.svg")
+            render_figure(snapshot, path)
+            with open(path) as file:
+                content = file.read()
+            # One axes patch per panel
+            self.assertEqual(content.count('id="axes_'), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.main.model.jobqueue import run_conditions, chunk_size, ProgressTracker
+from src.main.model.phototransduction import Phototransduction
+
+class CountingExecutor(ThreadPoolExecutor):
+    def __init__(self, workers):
+        super().__init__(max_workers=workers)
+        self._count_lock = threading.Lock()
+        self.submitted = 0
+        self.in_flight = 0
+        self.peak = 0
+
+    def submit(self, fn, *args, **kwargs):
+        with self._count_lock:
+            self.submitted += 1
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        future = super().submit(fn, *args, **kwargs)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future):
+        with self._count_lock:
+            self.in_flight -= 1
+
+class TestJobQueue(unittest.TestCase):
+    def test_chunked_bounded_submission(self):
+        conditions = [(value, f"label {value}") for value in range(1000)]
+        collected = {}
+        with CountingExecutor(2) as executor:
+            finished = run_conditions(executor, lambda value, label: value * 2, conditions, lambda condition, result: collected.setdefault(condition[1], result), workers=2, chunk=10, max_in_flight=3)
+        self.assertTrue(finished)
+        self.assertEqual(collected, {label: value * 2 for value, label in conditions})
+        self.assertEqual(executor.submitted, 100)
+        self.assertLessEqual(executor.peak, 3)
+
+    def test_chunk_size(self):
+        self.assertEqual(chunk_size(10, 4), 1)
+        self.assertEqual(chunk_size(100000, 8), 1562)
+
+    def test_stop_cancels_remaining(self):
+        conditions = [(value,) for value in range(200)]
+        collected = []
+        with ThreadPoolExecutor(2) as executor:
+            finished = run_conditions(executor, lambda value: value, conditions, lambda condition, result: collected.append(result), workers=2, chunk=5, should_stop=lambda: len(collected) >= 20)
+        self.assertFalse(finished)
+        self.assertLess(len(collected), 200)
+
+    def test_progress_is_throttled(self):
+        reports = []
+        tracker = ProgressTracker(1000, lambda *report: reports.append(report), interval=60)
+        for completed in range(1, 1001):
+            tracker.update(completed)
+        # The first and last updates only
+        self.assertEqual([report[0] for report in reports], [1, 1000])
+        self.assertEqual(reports[-1][2], 0)
+
+    def test_model_conditions(self):
+        model = Phototransduction(responseDuration=0.3)
+        model.setParam(betaDark=[2, 4, 8])
+        conditions = model.buildConditions()
+        self.assertEqual(len(conditions), 3 * len(model.stimulusIntensities))
+        self.assertEqual(conditions[1][-1], f"{model.pigmentActivations[0]} (R*); 4 (betaDark)")
+        model.simulate()
+        self.assertEqual(len(model.results), len(conditions))
+        self.assertEqual(sorted(result['label'] for result in model.results), sorted(condition[-1] for condition in conditions))
+
+if __name__ == '__main__':
+    unittest.main()
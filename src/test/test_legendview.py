@@ -0,0 +1,40 @@
+import unittest
+import sys
+from PyQt6.QtWidgets import QApplication
+
+from src.main.view.components.legendview import LegendView
+
+class TestLegendView(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication(sys.argv)
+
+    def setUp(self):
+        self.legend = LegendView()
+        labels = [f"{index} R*" for index in range(1000)]
+        self.legend.setEntries(labels, ["#1f77b4"] * len(labels))
+
+    def test_entries(self):
+        self.assertEqual(self.legend.count(), 1000)
+        self.legend.addEntry("extra", "#ff7f0e")
+        self.assertEqual(self.legend.count(), 1001)
+        self.legend.clear()
+        self.assertEqual(self.legend.count(), 0)
+
+    def test_filter(self):
+        self.legend.filterEdit.setText("99")
+        # 99, 199, ..., 999 and 990-998
+        self.assertEqual(self.legend.visibleCount(), 19)
+        self.legend.filterEdit.clear()
+        self.assertEqual(self.legend.visibleCount(), 1000)
+
+    def test_hover_maps_to_source_row(self):
+        hovered = []
+        self.legend.traceHovered.connect(hovered.append)
+        self.legend.filterEdit.setText("500")
+        self.legend.on_entered(self.legend.proxy.index(0, 0))
+        self.legend.setHovered(-1)
+        self.assertEqual(hovered, [500, -1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import threading
+import time
+
+from src.main.utils import Metrics
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = Metrics()
+
+    def test_stage_and_counters(self):
+        with self.metrics.stage('integrate', 'cond1'):
+            pass
+        with self.metrics.stage('integrate', 'cond2'):
+            pass
+        self.metrics.count('retries', 2, 'cond1')
+        self.metrics.count('retries', 1, 'cond2')
+        summary = self.metrics.summary()
+        self.assertEqual(summary['stages']['integrate']['count'], 2)
+        self.assertEqual(summary['counters']['retries'], 3)
+        self.assertEqual(self.metrics.conditions()['cond1']['counters']['retries'], 2)
+
+    def test_cross_thread_stage(self):
+        self.metrics.begin('queueWait', 'cond1')
+        worker = threading.Thread(target=self.metrics.end, args=('queueWait', 'cond1'))
+        worker.start()
+        worker.join()
+        self.assertIn('queueWait', self.metrics.summary()['stages'])
+        # Ending a stage that never began is ignored
+        self.metrics.end('queueWait', 'missing')
+        self.assertEqual(self.metrics.summary()['stages']['queueWait']['count'], 1)
+
+    def test_chrome_trace(self):
+        with self.metrics.stage('simulate'):
+            pass
+        trace = self.metrics.to_chrome_trace()
+        complete = [event for event in trace['traceEvents'] if event['ph'] == 'X']
+        self.assertEqual(len(complete), 1)
+        self.assertEqual(complete[0]['name'], 'simulate')
+
+    def test_chrome_trace_condition_counters(self):
+        for index in range(20000):
+            condition = f"cond{index}"
+            self.metrics.record('integrate', 0, 1, condition)
+            self.metrics.count('retries', index % 3, condition)
+        start = time.perf_counter()
+        trace = self.metrics.to_chrome_trace()
+        # Counters are grouped once, not scanned per event
+        self.assertLess(time.perf_counter() - start, 5)
+        args = {event['args']['condition']: event['args'] for event in trace['traceEvents'] if event['ph'] == 'X'}
+        self.assertEqual(args['cond5'], {'condition': 'cond5', 'retries': 2})
+
+    def test_reset(self):
+        with self.metrics.stage('simulate'):
+            pass
+        self.metrics.reset()
+        self.assertEqual(self.metrics.summary()['stages'], {})
+        self.assertEqual(self.metrics.tooltip(), "")
+
+if __name__ == '__main__':
+    unittest.main()
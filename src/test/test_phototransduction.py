@@ -1,4 +1,5 @@
 import unittest
+import warnings
 import numpy as np
 from src.main.model.phototransduction import Phototransduction
 
@@ -26,5 +27,102 @@ class TestPhototransduction(unittest.TestCase):
         self.model.simulate(stimulusIntensities=[1, 2], stimulusDurations=[0.01, 0.02])
         self.assertEqual(len(self.model.results), 2)
 
+    def test_solver_stats(self):
+        result = self.model.simulate_once(1, (0, 0.01), 1)
+        for key in self.model.SOLVER_STATS:
+            self.assertIn(key, result)
+        self.assertGreater(result['nfev'], 0)
+        self.assertGreater(result['acceptedSteps'], 0)
+        self.assertEqual(result['solverStatus'], 0)
+
+    def test_step_limit_marks_condition(self):
+        self.model.conditionStepLimit = 20
+        with self.assertWarns(Warning):
+            result = self.model.simulate_once(1, (0, 0.01), 1)
+        self.assertEqual(result['solveOutcome'], 'stepLimit')
+        self.assertLessEqual(result['acceptedSteps'] + result['rejectedSteps'], 30)
+        self.assertEqual(result['solveRetries'], 0)
+        # Signals are NaN past the point the solver reached
+        self.assertLess(result['solvedUntil'], result['time'][-1])
+        self.assertTrue(np.isnan(result['Ca'][-1]))
+        self.assertFalse(np.isnan(result['Ca'][0]))
+        self.assertEqual(len(result['Ca']), len(result['time']))
+
+    def test_limits_leave_rest_of_sweep(self):
+        self.model.responseDuration = 0.3
+        self.model.conditionTimeLimit = 1e-9
+        self.model.setParam(betaDark=[2, 4])
+        with self.assertWarns(Warning):
+            self.model.simulate()
+        self.assertEqual([outcome for _, outcome, _ in self.model.getSolveFailures()], ['timedOut', 'timedOut'])
+        self.model.conditionTimeLimit = 0
+        self.model.simulate()
+        self.assertEqual(self.model.getSolveFailures(), [])
+        self.assertTrue(all(result['solveOutcome'] == 'ok' for result in self.model.results))
+
+    def test_solver_error_marks_condition(self):
+        self.model.responseDuration = 0.3
+        self.model.diff_eq = lambda *args: 1 / 0
+        with self.assertWarns(Warning):
+            result = self.model.simulate_once(1, (0, 0.01), 1)
+        self.assertEqual(result['solveOutcome'], 'failed')
+        self.assertIn('division by zero', result['solverMessage'])
+        self.assertTrue(np.isnan(result['cGMP'][-1]))
+
+    def test_solver_giving_up_marks_condition(self):
+        self.model.responseDuration = 0.3
+        self.model.diff_eq = lambda t, u, *args: np.where(t > 0.05, np.nan, 0 * u)
+        with self.assertWarns(Warning):
+            result = self.model.simulate_once(1, (0, 0.01), 1)
+        self.assertEqual(result['solveOutcome'], 'failed')
+        self.assertEqual(result['solverStatus'], -1)
+        self.assertIn('step size', result['solverMessage'])
+        self.assertTrue(np.isnan(result['Ca'][-1]))
+
+    def test_final_max_step_was_used(self):
+        def overflowing(t, u, *args):
+            warnings.warn("overflow", RuntimeWarning)
+            return 0 * u
+        self.model.responseDuration = 0.3
+        self.model.MAX_SOLVE_ATTEMPTS = 3
+        self.model.diff_eq = overflowing
+        with self.assertWarns(Warning):
+            result = self.model.simulate_once(1, (0, 0.01), 1)
+        # Attempts ran with no limit, 0.01 and 0.005
+        self.assertEqual(result['solveRetries'], 2)
+        self.assertEqual(result['finalMaxStep'], 0.005)
+        self.assertEqual(result['solveOutcome'], 'ok')
+
+    def test_solver_stats_sortable(self):
+        self.model.setParam(betaDark=[2, 4, 8])
+        self.model.simulate(stimulusIntensities=[100])
+        self.assertIn('nfev', self.model.getValidSortKeys())
+        stats = self.model.getSolverStats(sortKey='nfev', reverse=True)
+        self.assertEqual(len(stats), 3)
+        self.assertGreaterEqual(stats[0]['nfev'], stats[-1]['nfev'])
+        by_param = self.model.sortResults(self.model.results, 'betaDark')
+        self.assertEqual([float(r['modelParameters']['betaDark']) for r in by_param], [2, 4, 8])
+
+    def test_get_result_views(self):
+        self.model.simulate(stimulusIntensities=[1])
+        copies = self.model.getResult('time', 'Ca')['data']
+        views = self.model.getResult('time', 'Ca', copy=False)['data']
+        np.testing.assert_array_equal(copies[0]['y'], views[0]['y'])
+        self.assertFalse(views[0]['y'].flags.writeable)
+        copies[0]['y'][:] = 0
+        self.assertTrue(np.any(self.model.results[0]['Ca'] != 0))
+
+    def test_export_columns(self):
+        self.model.simulate(stimulusIntensities=[1, 2], stimulusDurations=[0.01])
+        headers, columns = self.model.getExportColumns('time', ['Ca'])
+        self.assertEqual(headers[0], 'time')
+        self.assertEqual(len(headers), 3)
+        self.assertIs(columns[1], self.model.results[0]['Ca'])
+        headers, _ = self.model.getExportColumns('time')
+        self.assertEqual(len(headers), 1 + 2 * (len(self.model.getLabels()) - 1))
+        # Phase plots have a different x per trace
+        headers, _ = self.model.getExportColumns('Ca', ['cGMP'])
+        self.assertEqual(len(headers), 4)
+
 if __name__ == '__main__':
     unittest.main()
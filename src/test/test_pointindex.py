@@ -0,0 +1,52 @@
+import unittest
+import numpy as np
+
+from src.main.utils import PointIndex
+
+class TestPointIndex(unittest.TestCase):
+
+    def setUp(self):
+        x = np.linspace(0, 100, 1001)
+        self.traces = [np.column_stack((x, np.full_like(x, 10.0 * offset))) for offset in range(50)]
+        self.traces[3][7] = np.nan
+        self.index = PointIndex(self.traces)
+
+    def test_nearest_trace_and_position(self):
+        trace, position, distance = self.index.nearest(50.02, 31)
+        self.assertEqual(trace, 3)
+        self.assertEqual(position, 500)
+        self.assertAlmostEqual(distance, np.hypot(0.02, 1))
+
+    def test_radius_and_non_finite_points(self):
+        self.assertEqual(len(self.index), 50 * 1001 - 1)
+        self.assertIsNone(self.index.nearest(50, 5, radius=2))
+        trace, position, _ = self.index.nearest(0.7, 30)
+        self.assertEqual(trace, 3)
+        self.assertNotEqual(position, 7)
+
+    def test_resolution_merges_runs(self):
+        x = np.linspace(0, 10, 1001)
+        index = PointIndex([np.column_stack((x, np.zeros_like(x)))], resolution=1)
+        self.assertEqual(len(index), 11)
+        # Lookups still see every point of the merged runs
+        self.assertEqual(index.nearest(5.04, 0)[1], 504)
+        self.assertEqual(index.nearest(5.04, 0.5, radius=0.6)[1], 504)
+
+    def test_weights_and_mask(self):
+        x = np.linspace(0, 1, 10001)
+        traces = [(x, np.full_like(x, 1000.0 * offset)) for offset in range(5)]
+        # Built once over the data extent, the pixel scale of each view is applied per lookup
+        index = PointIndex(traces, resolution=1 / 256, scale=(1, 1 / 4000))
+        self.assertLess(len(index), 5 * 300)
+        self.assertEqual(index.nearest(0.5, 1900, radius=8, weights=(1000, 0.01))[:2], (2, 5000))
+        self.assertIsNone(index.nearest(0.5, 1900, radius=8, weights=(1000, 0.1)))
+        # Zoomed into x: the exact sample under the pointer
+        self.assertEqual(index.nearest(0.500102, 2001, radius=8, weights=(1e6, 1))[:2], (2, 5001))
+        self.assertEqual(index.nearest(0.5, 1900, radius=8, weights=(1000, 0.005), mask=[True, True, False, True, True])[0], 1)
+
+    def test_empty(self):
+        self.assertIsNone(PointIndex([]).nearest(0, 0))
+        self.assertIsNone(PointIndex([np.full((3, 2), np.nan)]).nearest(0, 0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import os
+import unittest
+import tempfile
+import numpy as np
+
+from src.main.model.phototransduction import Phototransduction
+from src.main.model.resultstore import ResultStore, result_bytes
+from src.main.model.session import save_session, load_session
+
+def make_result(index, samples=1000):
+    return {
+        'time': np.arange(samples) * 1e-3,
+        'Ca': np.full(samples, float(index)),
+        'label': f"{index} R*",
+        'stimulusIntensity': float(-index),
+        'modelParameters': {'betaDark': np.asarray(float(index))}
+    }
+
+class TestResultStore(unittest.TestCase):
+    def test_spills_past_budget(self):
+        # Two results fit in memory (time is stored once), the rest go to disk
+        store = ResultStore(spill_bytes=3 * 8000)
+        store.extend(make_result(index) for index in range(5))
+        self.assertEqual(len(store), 5)
+        self.assertEqual([store.is_spilled(index) for index in range(5)], [False, False, True, True, True])
+        self.assertEqual(store.memory_bytes, 24000)
+        self.assertEqual(store.disk_bytes, 24000)
+        self.assertIs(store[4]['time'], store[0]['time'])
+        for index, result in enumerate(store):
+            np.testing.assert_array_equal(result['Ca'], make_result(index)['Ca'])
+            self.assertEqual(result['label'], f"{index} R*")
+            self.assertEqual(set(result), set(make_result(index)))
+        self.assertFalse(store[4]['Ca'].flags.writeable)
+        self.assertEqual(store.metadata(3)['modelParameters']['betaDark'], 3)
+
+    def test_sort_and_slices(self):
+        store = ResultStore(spill_bytes=0)
+        store.extend(make_result(index) for index in range(4))
+        store.sort(lambda result: result['stimulusIntensity'])
+        self.assertEqual([result['label'] for result in store], ["3 R*", "2 R*", "1 R*", "0 R*"])
+        self.assertEqual([result['Ca'][0] for result in store[1:3]], [2.0, 1.0])
+        # Appending after reads remaps the grown file
+        store.append(make_result(9))
+        self.assertEqual(store[-1]['Ca'][-1], 9.0)
+
+    def test_unbounded_store_keeps_arrays(self):
+        store = ResultStore()
+        result = make_result(1)
+        store.append(result)
+        self.assertIs(store[0]['Ca'], result['Ca'])
+        self.assertEqual(store.disk_bytes, 0)
+
+    def test_precision_and_derived_signals(self):
+        derived = {'CaScaled': ('Ca', lambda meta: meta['modelParameters']['betaDark'])}
+        store = ResultStore(precision='float32', derived=derived)
+        result = make_result(3)
+        result['CaScaled'] = result['Ca'] * 3
+        store.append(result)
+        self.assertEqual(store[0]['Ca'].dtype, np.float32)
+        self.assertEqual(store[0]['time'].dtype, np.float64)
+        np.testing.assert_array_equal(store[0]['CaScaled'], np.full(1000, 9.0))
+        self.assertEqual(set(store[0]), set(result))
+        self.assertEqual(store.memory_bytes, 8000 + 4000)
+        with self.assertRaises(ValueError):
+            ResultStore(precision='float16')
+
+    def test_compression(self):
+        signal = np.sin(np.linspace(0, 10, 10000)) * 5
+        for compression, exact in (('lossless', True), ('bounded', False)):
+            store = ResultStore(compression=compression, cache_bytes=0)
+            store.append({'time': np.arange(10000.0), 'y': signal})
+            self.assertLess(store.memory_bytes, 2 * signal.nbytes)
+            value = store[0]['y']
+            self.assertFalse(value.flags.writeable)
+            if exact:
+                np.testing.assert_array_equal(value, signal)
+            else:
+                self.assertLessEqual(np.abs(value - signal).max(), 1e-6 * 10)
+        # The shared time grid is never quantized
+        time = np.arange(-0.1, 1.4, 1e-5)
+        store = ResultStore(compression='bounded')
+        store.append({'time': time, 'y': signal})
+        np.testing.assert_array_equal(store[0]['time'], time)
+        # Non-finite values fall back to lossless
+        store = ResultStore(compression='bounded')
+        store.append({'y': np.array([1.0, np.nan, np.inf])})
+        np.testing.assert_array_equal(store[0]['y'], [1.0, np.nan, np.inf])
+
+    def test_result_bytes_counts_memory_only(self):
+        results = [make_result(index) for index in range(4)]
+        self.assertEqual(result_bytes(results), 4 * 2 * 8000)
+        # Views of one array count it once
+        block = np.zeros((4, 1000))
+        self.assertEqual(result_bytes([{'Ca': row} for row in block]), block.nbytes)
+        spilled = ResultStore(spill_bytes=0)
+        spilled.extend(results)
+        self.assertEqual(result_bytes(spilled), 0)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "session.ptsim")
+            save_session(path, results, {})
+            # Signals of an opened session stay in the file
+            self.assertEqual(result_bytes(load_session(path)[1]), 0)
+
+    def test_spilled_model_results(self):
+        model = Phototransduction(responseDuration=0.5)
+        model.setParam(betaDark=[2, 4, 8])
+        model.simulate(stimulusIntensities=[100])
+        expected = model.getResult('time', 'Ca')
+        model.spillBytes = 0
+        model.simulate(stimulusIntensities=[100])
+        self.assertTrue(all(model.results.is_spilled(index) for index in range(3)))
+        np.testing.assert_array_equal(model.results[0]['intracellularCurrentScaled'], model.results[0]['intracellularCurrentNorm'] * 15)
+        result = model.getResult('time', 'Ca', copy=False)
+        # Conditions with equal intensity complete in any order
+        by_label = {original['label']: original for original in expected['data']}
+        for spilled in result['data']:
+            original = by_label[spilled['label']]
+            np.testing.assert_array_equal(spilled['y'], original['y'])
+            self.assertEqual(spilled['meta'], original['meta'])
+        self.assertEqual(len(model.getSolverStats()), 3)
+        headers, columns = model.getExportColumns('time', ['Ca'])
+        self.assertEqual(len(columns), 4)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "session.ptsim")
+            save_session(path, model.results, {})
+            _, loaded = load_session(path)
+            np.testing.assert_array_equal(loaded[2]['Ca'], model.results[2]['Ca'])
+
+if __name__ == '__main__':
+    unittest.main()
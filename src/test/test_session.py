@@ -0,0 +1,101 @@
+import os
+import mmap
+import unittest
+import tempfile
+import numpy as np
+
+from src.main.model.phototransduction import Phototransduction
+from src.main.model.session import save_session, load_session, mapped_from, SessionError
+
+class TestSession(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.model = Phototransduction(responseDuration=0.5)
+        cls.model.setParam(betaDark=[2, 4, 8])
+        cls.model.simulate(stimulusIntensities=[100])
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "session.ptsim")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assertResultsEqual(self, loaded, results):
+        self.assertEqual(len(loaded), len(results))
+        for result, original in zip(loaded, results):
+            self.assertEqual(result.keys(), original.keys())
+            for key, value in original.items():
+                if key == 'modelParameters':
+                    for name, parameter in value.items():
+                        np.testing.assert_array_equal(result[key][name], parameter)
+                elif isinstance(value, np.ndarray):
+                    np.testing.assert_array_equal(result[key], value)
+                else:
+                    self.assertEqual(result[key], value)
+
+    def test_round_trip_is_memory_mapped(self):
+        fractions = []
+        save_session(self.path, self.model.results, self.model.getParameters(), {'axes': {'x': 'time'}}, progress=fractions.append)
+        self.assertEqual(fractions[-1], 1)
+        manifest, results = load_session(self.path)
+        self.assertEqual(manifest['settings'], {'axes': {'x': 'time'}})
+        self.assertEqual(manifest['parameters']['stimulusConfiguration']['dt'], self.model.dt)
+        self.assertResultsEqual(results, self.model.results)
+        # Signals are read-only views into the mapped file, not copies
+        self.assertFalse(results[0]['Ca'].flags.writeable)
+        base = results[0]['Ca']
+        while isinstance(base, np.ndarray):
+            base = base.base
+        self.assertIsInstance(base.obj, mmap.mmap)
+
+    def test_compressed_round_trip(self):
+        save_session(self.path, self.model.results, self.model.getParameters(), compress=True)
+        _, results = load_session(self.path)
+        self.assertResultsEqual(results, self.model.results)
+
+    def test_ragged_and_empty_results(self):
+        results = [dict(result) for result in self.model.results]
+        results[1] = {**results[1], 'Ca': results[1]['Ca'][:100]}
+        save_session(self.path, results, {})
+        _, loaded = load_session(self.path)
+        self.assertEqual(len(loaded[1]['Ca']), 100)
+        self.assertEqual(len(loaded[0]['Ca']), len(results[0]['Ca']))
+        save_session(self.path, [], {})
+        self.assertEqual(load_session(self.path)[1], [])
+
+    def test_save_over_open_session(self):
+        save_session(self.path, self.model.results, {})
+        _, results = load_session(self.path)
+        buffer = results[0]['Ca'].base
+        while isinstance(buffer, np.ndarray):
+            buffer = buffer.base
+        save_session(self.path, results, {'saved': 2})
+        # The open results were copied in before the file was replaced, not left mapped
+        self.assertFalse(any(mapped_from(value, buffer.obj) for result in results for value in result.values() if isinstance(value, np.ndarray)))
+        self.assertFalse(results[0]['Ca'].flags.writeable)
+        manifest, reloaded = load_session(self.path)
+        self.assertEqual(manifest['parameters'], {'saved': 2})
+        self.assertResultsEqual(reloaded, self.model.results)
+        self.assertResultsEqual(results, self.model.results)
+
+    def test_solver_settings_round_trip(self):
+        model = Phototransduction()
+        model.maxStep, model.rtol, model.atol = 0.005, 1e-7, 1e-10
+        model.conditionStepLimit, model.conditionTimeLimit = 5000, 2.5
+        save_session(self.path, [], {}, {'solver': model.solverSettings()})
+        manifest, _ = load_session(self.path)
+        restored = Phototransduction()
+        restored.setSolverSettings(manifest['settings']['solver'])
+        self.assertEqual(restored.solverSettings(), model.solverSettings())
+        spec = restored.spec()
+        self.assertEqual((spec.rtol, spec.atol, spec.stepLimit, spec.timeLimit), (1e-7, 1e-10, 5000, 2.5))
+
+    def test_invalid_file(self):
+        with open(self.path, 'w') as file:
+            file.write("not a session")
+        with self.assertRaises(SessionError):
+            load_session(self.path)
+
+if __name__ == '__main__':
+    unittest.main()
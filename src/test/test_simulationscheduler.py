@@ -0,0 +1,70 @@
+import unittest
+import sys
+import time
+from PyQt6.QtWidgets import QApplication
+
+from src.main.controller.simulationscheduler import SimulationScheduler
+
+class TestSimulationScheduler(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication(sys.argv)
+
+    def setUp(self):
+        self.starts = 0
+        self.stops = 0
+        self.scheduler = SimulationScheduler(self.start, self.stop, delay=20)
+
+    def start(self):
+        self.starts += 1
+
+    def stop(self):
+        self.stops += 1
+
+    def wait(self, seconds=0.1):
+        end = time.monotonic() + seconds
+        while time.monotonic() < end:
+            self.app.processEvents()
+
+    def test_rapid_requests_coalesce(self):
+        for _ in range(5):
+            self.scheduler.request()
+        self.wait()
+        self.assertEqual(self.starts, 1)
+        self.assertTrue(self.scheduler.active)
+
+    def test_stale_run_is_replaced(self):
+        self.scheduler.request(0)
+        self.wait()
+        self.scheduler.request()
+        self.scheduler.request()
+        self.wait()
+        # The running simulation is stopped, the new one waits for it to end
+        self.assertEqual((self.starts, self.stops), (1, 1))
+        self.scheduler.run_ended()
+        self.assertEqual(self.starts, 2)
+        self.scheduler.run_ended()
+        self.wait()
+        self.assertEqual(self.starts, 2)
+        self.assertFalse(self.scheduler.active)
+
+    def test_cancel_drops_pending(self):
+        self.scheduler.request(0)
+        self.wait()
+        self.scheduler.request()
+        self.scheduler.cancel()
+        self.scheduler.run_ended()
+        self.wait()
+        self.assertEqual((self.starts, self.stops), (1, 1))
+
+    def test_withdraw_keeps_active_run(self):
+        self.scheduler.request(0)
+        self.wait()
+        self.scheduler.request()
+        self.scheduler.withdraw()
+        self.wait()
+        self.assertEqual((self.starts, self.stops), (1, 0))
+        self.assertTrue(self.scheduler.active)
+
+if __name__ == '__main__':
+    unittest.main()
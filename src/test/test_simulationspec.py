@@ -0,0 +1,66 @@
+import unittest
+import dataclasses
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+from src.main.model.phototransduction import Phototransduction
+
+class TestSimulationSpec(unittest.TestCase):
+    def setUp(self):
+        self.model = Phototransduction(responseDuration=0.3)
+
+    def test_spec_is_frozen(self):
+        spec = self.model.spec()
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            spec.dt = 0.01
+        with self.assertRaises(ValueError):
+            spec.time[0] = 1
+        with self.assertRaises(TypeError):
+            spec.parameters['betaDark'] = 1
+        # The model can be edited freely afterwards
+        self.model.param['betaDark'] = 2.0
+        self.model.dt = 0.002
+        self.assertEqual(spec.parameters['betaDark'], 4.1)
+        self.assertEqual(len(spec.time), 300)
+
+    def test_edits_during_run_do_not_leak(self):
+        spec = self.model.spec()
+        intensity, activation = spec.stimulusIntensities[0], spec.pigmentActivations[0]
+        expected = self.model.simulate_once(intensity, (0, 0.01), activation, spec=spec)
+        self.model.dt = 0.002
+        self.model.stimulusOffset = 0.05
+        self.model.param['betaDark'] = 8.0
+        result = self.model.simulate_once(intensity, (0, 0.01), activation, spec=spec)
+        np.testing.assert_array_equal(result['time'], expected['time'])
+        np.testing.assert_allclose(result['Ca'], expected['Ca'])
+
+    def test_storage_settings_are_captured(self):
+        self.model.resultPrecision = 'float32'
+        self.model.spillBytes = 0
+        spec = self.model.spec()
+        # Changed while the run is queued, the run keeps the settings it was specified with
+        self.model.resultPrecision = 'float64'
+        self.model.spillBytes = None
+        store = self.model.run(spec)
+        self.assertEqual(store.precision, 'float32')
+        self.assertEqual(store[0]['Ca'].dtype, np.float32)
+        self.assertTrue(store.is_spilled(0))
+
+    def test_concurrent_runs(self):
+        first = self.model.spec()
+        self.model.param['betaDark'] = 8.0
+        second = self.model.spec()
+        with ThreadPoolExecutor(4) as executor, ThreadPoolExecutor(2) as runs:
+            stores = [future.result() for future in [runs.submit(self.model.run, spec, executor) for spec in (first, second)]]
+        betaDark = [store[0]['modelParameters']['betaDark'] for store in stores]
+        self.assertEqual(betaDark, [4.1, 8.0])
+        self.assertFalse(np.allclose(stores[0][0]['Ca'], stores[1][0]['Ca']))
+        # Each run kept its own timings, the model's results and metrics were not touched
+        self.assertIsNot(first.metrics, second.metrics)
+        self.assertEqual(first.metrics.summary()['stages']['simulate']['count'], 1)
+        self.assertEqual(second.metrics.summary()['stages']['integrate']['count'], len(stores[1]))
+        self.assertIsNone(self.model.results)
+        self.assertEqual(self.model.metrics.summary()['stages'], {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+import numpy as np
+
+from src.main.utils import StateBuffer, Snapshot, share_parameters
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.parameters = {
+            'stimulusConfiguration': {'dt': 0.001, 'pigmentActivations': np.array([1.0, 10.0])},
+            'modelParameters': {'betaDark': 4.1, 'iDark': 15.0}
+        }
+
+    def test_unchanged_sections_are_shared(self):
+        first = Snapshot(share_parameters(None, self.parameters))
+        edited = {
+            'stimulusConfiguration': {'dt': 0.001, 'pigmentActivations': np.array([1.0, 10.0])},
+            'modelParameters': {'betaDark': 2.0, 'iDark': 15.0}
+        }
+        second = Snapshot(share_parameters(first, edited))
+        self.assertIs(second.parameters['stimulusConfiguration'], first.parameters['stimulusConfiguration'])
+        self.assertIsNot(second.parameters['modelParameters'], first.parameters['modelParameters'])
+        self.assertTrue(first.matches(self.parameters))
+        self.assertFalse(first.matches(edited))
+
+    def test_results_handle(self):
+        results = [{'Ca': np.zeros(3)}]
+        snapshot = Snapshot(self.parameters).with_results(results)
+        self.assertIs(snapshot.results, results)
+        self.assertIs(snapshot.parameters, self.parameters)
+
+    def test_buffer_navigation(self):
+        buffer = StateBuffer(maxlen=3)
+        self.assertIsNone(buffer.current())
+        states = [Snapshot({'modelParameters': {'betaDark': value}}) for value in range(4)]
+        for state in states:
+            buffer.append(state)
+        self.assertIs(buffer.current(), states[3])
+        self.assertIs(buffer.previous(), states[2])
+        self.assertIs(buffer.previous(), states[1])
+        # The oldest state was dropped, non-tuple items report None at either end
+        self.assertIsNone(buffer.previous())
+        self.assertIs(buffer.next(), states[2])
+        cached = states[2].with_results([])
+        self.assertTrue(buffer.replace(states[2], cached))
+        self.assertIs(buffer.current(), cached)
+        self.assertFalse(buffer.replace(states[0], cached))
+
+    def test_tuple_items_report_empty_tuples(self):
+        buffer = StateBuffer(maxlen=2)
+        buffer.append(('modelParameters', 'betaDark', 4.1))
+        self.assertEqual(buffer.next(), (None, None, None))
+
+if __name__ == '__main__':
+    unittest.main()
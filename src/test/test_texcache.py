@@ -0,0 +1,43 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from src.main.utils import TexCache
+
+class TestTexCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.text = r"$\kappa$ $\mu m^2$/photon"
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_render_once_then_read_from_disk(self):
+        cache = TexCache(self.cache_dir, "1.0")
+        image = cache.get(self.text)
+        self.assertTrue(image.startswith(b"\x89PNG"))
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+        # A fresh cache (next launch) reads the file instead of rendering
+        fresh = TexCache(self.cache_dir, "1.0")
+        with mock.patch.object(TexCache, 'render', side_effect=AssertionError("rendered")):
+            self.assertEqual(fresh.get(self.text), image)
+
+    def test_key_changes_with_version_and_style(self):
+        cache = TexCache(self.cache_dir, "1.0")
+        key = cache.key(self.text)
+        self.assertNotEqual(key, TexCache(self.cache_dir, "1.1").key(self.text))
+        self.assertNotEqual(key, cache.key(self.text, fontsize=12))
+        self.assertNotEqual(key, cache.key(self.text, color="white"))
+
+    def test_clear(self):
+        cache = TexCache(self.cache_dir, "1.0")
+        cache.get(self.text)
+        cache.clear()
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+if __name__ == '__main__':
+    unittest.main()
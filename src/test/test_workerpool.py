@@ -0,0 +1,75 @@
+import unittest
+import threading
+
+from src.main.model.phototransduction import Phototransduction
+from src.main.model.simulationworker import SimulationWorker
+from src.main.model.workerpool import WorkerPool, INTERACTIVE, BACKGROUND
+
+class TestWorkerPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = WorkerPool(2)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_warm_and_reuse(self):
+        self.assertTrue(all(future.result() for future in self.pool.warm()))
+        first = self.pool.submit(threading.current_thread).result()
+        self.assertTrue(first.name.startswith("simulation"))
+        model = Phototransduction(responseDuration=0.3)
+        model.setParam(betaDark=[2, 4, 8])
+        model.simulate(executor=self.pool)
+        model.simulate(executor=self.pool)
+        self.assertEqual(len(model.results), 3)
+        # Still the same executor and threads after both runs
+        self.assertIn(self.pool.submit(threading.current_thread).result().name, {thread.name for thread in threading.enumerate()})
+
+    def test_resize(self):
+        self.pool.resize(3)
+        self.assertEqual(self.pool.workers, 3)
+        self.pool.resize(3)
+        self.assertEqual(self.pool.submit(sum, [1, 2]).result(), 3)
+
+    def test_interactive_tasks_go_first(self):
+        pool = WorkerPool(1)
+        self.addCleanup(pool.shutdown)
+        gate = threading.Event()
+        order = []
+        pool.submit(gate.wait)
+        background = [pool.schedule(BACKGROUND, order.append, f"sweep {i}") for i in range(3)]
+        interactive = pool.schedule(INTERACTIVE, order.append, "preview")
+        gate.set()
+        for future in background + [interactive]:
+            future.result()
+        self.assertEqual(order, ["preview", "sweep 0", "sweep 1", "sweep 2"])
+
+    def test_background_yields_between_steps(self):
+        pool = WorkerPool(1)
+        self.addCleanup(pool.shutdown)
+        order = []
+
+        def sweep():
+            order.append("sweep start")
+            pool.schedule(INTERACTIVE, order.append, "preview")
+            # Runs the preview inline instead of after the whole sweep
+            pool.yield_to(BACKGROUND)
+            order.append("sweep end")
+
+        pool.schedule(BACKGROUND, sweep).result()
+        self.assertEqual(order, ["sweep start", "preview", "sweep end"])
+        self.assertEqual(pool.submit(sum, [1, 2]).result(), 3)
+
+    def test_stopped_worker_leaves_pool_usable(self):
+        model = Phototransduction(responseDuration=0.3)
+        model.setParam(betaDark=[1, 2, 3, 4, 5, 6])
+        worker = SimulationWorker(model, {'x': 'time', 'y': 'Ca'}, self.pool)
+        cancelled = []
+        worker.cancelled.connect(lambda: cancelled.append(True))
+        worker.progress.connect(lambda value: worker.stop())
+        worker.run()
+        self.assertEqual(cancelled, [True])
+        self.assertIsNone(model.results)
+        self.assertEqual(self.pool.submit(sum, [1, 2]).result(), 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import unittest
+import tempfile
+import numpy as np
+
+from src.main.utils import write_csv
+
+class TestWriteCsv(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.file_name = os.path.join(self.tmpdir.name, "results.csv")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_full_precision_round_trip(self):
+        time = np.linspace(-0.1, 1.4, 1501)
+        signal = np.exp(-time) / 3
+        write_csv(self.file_name, ["time", "signal: 1 (R*); 4.1 (betaDark)"], [time, signal], chunk_rows=100)
+        data = np.loadtxt(self.file_name, delimiter=',', skiprows=1)
+        np.testing.assert_array_equal(data[:, 0], time)
+        np.testing.assert_array_equal(data[:, 1], signal)
+
+    def test_ragged_columns_are_blank_padded(self):
+        write_csv(self.file_name, ["a", "b"], [np.arange(5.0), np.arange(3.0)], chunk_rows=2)
+        with open(self.file_name) as file:
+            lines = file.read().splitlines()
+        self.assertEqual(lines[0], "a,b")
+        self.assertEqual(len(lines), 6)
+        self.assertEqual(lines[3], "2,2")
+        self.assertEqual(lines[5], "4,")
+
+    def test_float32_columns_are_not_padded_with_noise(self):
+        signal = np.array([0.1, 1 / 3, 2.5e-7], dtype=np.float32)
+        write_csv(self.file_name, ["a"], [signal])
+        with open(self.file_name) as file:
+            lines = file.read().splitlines()
+        self.assertEqual(lines[1], "0.100000001")
+        np.testing.assert_array_equal(np.loadtxt(self.file_name, delimiter=',', skiprows=1, dtype=np.float32), signal)
+
+    def test_nan_values_differ_from_padding(self):
+        # A failed solve leaves a NaN tail, a shorter trace leaves blank cells
+        failed = np.array([1.0, 2.0, np.nan, np.nan])
+        write_csv(self.file_name, ["a", "b", "c"], [np.arange(4.0), failed, np.arange(2)], chunk_rows=3)
+        with open(self.file_name) as file:
+            lines = file.read().splitlines()
+        self.assertEqual(lines[1:], ["0,1,0", "1,2,1", "2,nan,", "3,nan,"])
+
+if __name__ == '__main__':
+    unittest.main()